@@ -0,0 +1,264 @@
+"""
+Compact binary record store for the serverless job search.
+
+`job_data.json` maps every job title to four fields and has to be parsed in
+full on cold start. `job_data.bin` holds the same records as a sorted title
+table plus fixed-width columns, so the handler can memory-map it and decode
+only the rows a request asks for.
+
+Layout (little-endian):
+    header        magic, version, row count, category count, section offsets
+    title_offsets uint32[rows + 1]   byte offsets into title_blob (sorted by UTF-8 bytes)
+    title_blob    UTF-8 job titles
+    cat_offsets   uint32[cats + 1]   byte offsets into cat_blob
+    cat_blob      UTF-8 industry/location names
+    rows          rows x (uint16 industry, uint16 location, float64 risk, float64 growth)
+
+Usage:
+    python api/_job_store.py build     # job_data.json -> job_data.bin
+    python api/_job_store.py report    # cold-start time and RSS, JSON vs binary
+
+Files starting with an underscore are not deployed as Vercel functions.
+"""
+
+import json
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOURCE = os.path.join(API_DIR, 'job_data.json')
+DEFAULT_OUTPUT = os.path.join(API_DIR, 'job_data.bin')
+
+MAGIC = b'JOBS'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIIIII')
+OFFSET = struct.Struct('<I')
+ROW = struct.Struct('<HHdd')
+
+
+def build_store(source: str = DEFAULT_SOURCE, output: str = DEFAULT_OUTPUT) -> Dict[str, Any]:
+    """
+    Convert job_data.json into the binary record store.
+
+    Args:
+        source: Path to job_data.json
+        output: Path of the .bin file to write
+
+    Returns:
+        Dictionary with row/category counts and file sizes
+    """
+    with open(source, 'r') as f:
+        records = json.load(f)
+
+    titles = sorted(records, key=lambda t: t.encode('utf-8'))
+    categories: List[str] = []
+    category_codes: Dict[str, int] = {}
+
+    def code(value: Any) -> int:
+        value = str(value if value is not None else 'Unknown')
+        if value not in category_codes:
+            category_codes[value] = len(categories)
+            categories.append(value)
+        return category_codes[value]
+
+    rows = bytearray()
+    for title in titles:
+        info = records[title]
+        rows += ROW.pack(
+            code(info.get('industry', 'Unknown')),
+            code(info.get('location', 'Unknown')),
+            float(info.get('automation_risk', 0) or 0),
+            float(info.get('growth_projection', 0) or 0),
+        )
+    if len(categories) > 0xFFFF:
+        raise ValueError(f"Too many distinct categories for uint16 codes: {len(categories)}")
+
+    def string_table(values: List[str]):
+        offsets, blob = bytearray(), bytearray()
+        for value in values:
+            offsets += OFFSET.pack(len(blob))
+            blob += value.encode('utf-8')
+        offsets += OFFSET.pack(len(blob))
+        return bytes(offsets), bytes(blob)
+
+    title_offsets, title_blob = string_table(titles)
+    cat_offsets, cat_blob = string_table(categories)
+
+    sections = [title_offsets, title_blob, cat_offsets, cat_blob]
+    positions = []
+    position = HEADER.size
+    for section in sections:
+        positions.append(position)
+        position += len(section)
+    # Align the row section to 8 bytes for the float64 columns
+    padding = (-position) % 8
+    rows_position = position + padding
+
+    header = HEADER.pack(MAGIC, VERSION, 0, len(titles), len(categories),
+                         positions[0], positions[1], positions[2], positions[3], rows_position)
+    tmp_path = output + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for section in sections:
+            f.write(section)
+        f.write(b'\x00' * padding)
+        f.write(rows)
+    os.replace(tmp_path, output)
+
+    return {
+        'rows': len(titles),
+        'categories': len(categories),
+        'source_bytes': os.path.getsize(source),
+        'output_bytes': os.path.getsize(output),
+    }
+
+
+class JobStore:
+    """Read-only, memory-mapped view of job_data.bin with a dict-like interface"""
+
+    def __init__(self, path: str = DEFAULT_OUTPUT):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _flags, self._rows, self._cats,
+         self._title_offsets, self._title_blob, self._cat_offsets,
+         self._cat_blob, self._row_data) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} job store")
+        self._category_cache: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __contains__(self, title: str) -> bool:
+        return self._find(title) is not None
+
+    def _string(self, offsets_pos: int, blob_pos: int, index: int) -> bytes:
+        start, end = struct.unpack_from('<II', self._mm, offsets_pos + index * OFFSET.size)
+        return self._mm[blob_pos + start:blob_pos + end]
+
+    def _title_bytes(self, index: int) -> bytes:
+        return self._string(self._title_offsets, self._title_blob, index)
+
+    def _category(self, code: int) -> str:
+        value = self._category_cache.get(code)
+        if value is None:
+            value = self._string(self._cat_offsets, self._cat_blob, code).decode('utf-8')
+            self._category_cache[code] = value
+        return value
+
+    def _find(self, title: str) -> Optional[int]:
+        """Binary search over the sorted title table"""
+        key = title.encode('utf-8')
+        lo, hi = 0, self._rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._title_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._rows and self._title_bytes(lo) == key:
+            return lo
+        return None
+
+    def _decode_row(self, index: int) -> Dict[str, Any]:
+        industry, location, risk, growth = ROW.unpack_from(self._mm, self._row_data + index * ROW.size)
+        return {
+            'industry': self._category(industry),
+            'location': self._category(location),
+            'automation_risk': risk,
+            'growth_projection': growth,
+        }
+
+    def get(self, title: str, default: Any = None) -> Any:
+        """Decode the record for one title, like dict.get on the JSON data"""
+        index = self._find(title)
+        if index is None:
+            return default
+        return self._decode_row(index)
+
+    def __getitem__(self, title: str) -> Dict[str, Any]:
+        record = self.get(title)
+        if record is None:
+            raise KeyError(title)
+        return record
+
+    def titles(self) -> Iterator[str]:
+        for index in range(self._rows):
+            yield self._title_bytes(index).decode('utf-8')
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+
+def _rss_kb() -> int:
+    """Current resident set size in KB (Linux /proc, falls back to peak RSS)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(fmt: str):
+    """Cold-load one format and look up 15 titles; runs in a fresh interpreter"""
+    rss_before = _rss_kb()
+    start = time.perf_counter()
+    if fmt == 'json':
+        with open(DEFAULT_SOURCE, 'r') as f:
+            data = json.load(f)
+        titles = list(data)[:15]
+    else:
+        data = JobStore(DEFAULT_OUTPUT)
+        titles = [t for _, t in zip(range(15), data.titles())]
+    load_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for title in titles:
+        data.get(title, {})
+    lookup_us = (time.perf_counter() - start) * 1e6 / len(titles)
+
+    print(json.dumps({
+        'load_ms': round(load_ms, 3),
+        'lookup_us': round(lookup_us, 2),
+        'rss_delta_kb': _rss_kb() - rss_before,
+    }))
+
+
+def report():
+    """Compare cold-start time and resident memory of JSON vs the binary store"""
+    results = {}
+    for fmt in ('json', 'bin'):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), '_measure', fmt],
+                             capture_output=True, text=True, check=True)
+        results[fmt] = json.loads(out.stdout)
+
+    print("=== job_data cold start: JSON vs binary store ===")
+    print(f"   File size:   {os.path.getsize(DEFAULT_SOURCE) / 1024:8.1f} KB -> "
+          f"{os.path.getsize(DEFAULT_OUTPUT) / 1024:8.1f} KB")
+    print(f"   Load time:   {results['json']['load_ms']:8.2f} ms -> {results['bin']['load_ms']:8.2f} ms")
+    print(f"   RSS growth:  {results['json']['rss_delta_kb']:8d} KB -> {results['bin']['rss_delta_kb']:8d} KB")
+    print(f"   Lookup:      {results['json']['lookup_us']:8.2f} us -> {results['bin']['lookup_us']:8.2f} us")
+    return results
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'build'
+    if command == 'build':
+        stats = build_store(*sys.argv[2:4])
+        print(f"✓ Wrote {stats['rows']} rows ({stats['categories']} categories)")
+        print(f"  {stats['source_bytes'] / 1024:.1f} KB JSON -> {stats['output_bytes'] / 1024:.1f} KB binary")
+    elif command == 'report':
+        report()
+    elif command == '_measure':
+        _measure(sys.argv[2])
+    else:
+        print(f"Unknown command: {command} (expected 'build' or 'report')")
+        sys.exit(1)
@@ -6,9 +6,23 @@ from http.server import BaseHTTPRequestHandler
 import json
 import os
 import pickle
+import sys
+import threading
+import time
 import numpy as np
 from rapidfuzz import fuzz, process
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(__file__))
+from _job_store import JobStore
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
 
 class handler(BaseHTTPRequestHandler):
     """Vercel serverless function handler"""
@@ -18,13 +32,41 @@ class handler(BaseHTTPRequestHandler):
     _job_titles = None
     _job_data = None
     _model = None
+    _fragments: Dict[str, bytes] = {}  # title -> serialized static fields
+    _load_lock = threading.Lock()
+    _model_lock = threading.Lock()
+    _process_started = time.time()
+    _data_load_ms = None
+    _model_load_ms = None
+    # Per-request stage timings (Server-Timing); None outside a request, e.g. when
+    # the search methods are called from warm-up code or a script
+    _timings: Optional[Dict[str, float]] = None
+    
+    def setup(self):
+        super().setup()
+        self._timings = {}
     
     @classmethod
-    def load_data(cls):
-        """Load embeddings and job data (cached across invocations)"""
-        if cls._job_titles is not None:
-            return  # Already loaded
+    def load_data(cls) -> float:
+        """
+        Load embeddings and job data (cached across invocations)
         
+        Returns:
+            Milliseconds spent loading (0 when already loaded)
+        """
+        if cls._data_load_ms is not None:
+            return 0.0  # Already loaded
+        
+        with cls._load_lock:
+            if cls._data_load_ms is not None:
+                return 0.0
+            start = time.perf_counter()
+            cls._load_files()
+            cls._data_load_ms = (time.perf_counter() - start) * 1000
+            return cls._data_load_ms
+    
+    @classmethod
+    def _load_files(cls):
         # Load embeddings
         embeddings_path = os.path.join(os.path.dirname(__file__), 'job_embeddings.pkl')
         if os.path.exists(embeddings_path):
@@ -34,12 +76,49 @@ class handler(BaseHTTPRequestHandler):
                 cls._embeddings = data['embeddings']
         
         # Load job market data (simplified version for quick lookup)
-        # We'll use a pre-generated JSON file instead of the full CSV
+        # Prefer the memory-mapped binary store (built by _job_store.py) so only
+        # the requested rows are decoded; fall back to parsing the JSON file
+        store_path = os.path.join(os.path.dirname(__file__), 'job_data.bin')
         job_data_path = os.path.join(os.path.dirname(__file__), 'job_data.json')
-        if os.path.exists(job_data_path):
+        if os.path.exists(store_path):
+            cls._job_data = JobStore(store_path)
+        elif os.path.exists(job_data_path):
             with open(job_data_path, 'r') as f:
                 cls._job_data = json.load(f)
     
+    @classmethod
+    def get_model(cls):
+        """
+        Return the process-wide sentence encoder, loading it on first use.
+        
+        Stored on the class (not the instance) because BaseHTTPRequestHandler
+        creates a new handler instance for every request.
+        """
+        if cls._model is None:
+            with cls._model_lock:
+                if cls._model is None:
+                    start = time.perf_counter()
+                    from sentence_transformers import SentenceTransformer
+                    model = SentenceTransformer('all-MiniLM-L6-v2')
+                    model.encode(['warmup'])  # First encode pays one-off graph setup
+                    cls._model_load_ms = (time.perf_counter() - start) * 1000
+                    cls._model = model
+        return cls._model
+    
+    @classmethod
+    def warmup(cls) -> Dict:
+        """Preload data and the encoder so no user request pays for them"""
+        data_ms = cls.load_data()
+        model_ms = 0.0
+        if cls._embeddings is not None and cls._model is None:
+            cls.get_model()
+            model_ms = cls._model_load_ms
+        return {
+            'data_load_ms': round(data_ms, 1),
+            'model_load_ms': round(model_ms, 1),
+            'warm': cls._data_load_ms is not None and (cls._embeddings is None or cls._model is not None),
+        }
+    
     def fuzzy_search(self, query: str, top_k: int = 10) -> List[Tuple[str, float, str]]:
         """Perform fuzzy string matching"""
         matches = process.extract(
@@ -55,13 +134,14 @@ class handler(BaseHTTPRequestHandler):
         if self._embeddings is None:
             return []
         
-        # Lazy load the model only when needed
-        if self._model is None:
-            from sentence_transformers import SentenceTransformer
-            self._model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Loads once per process unless warmup() already ran
+        model_loaded = self._model is not None
+        model = self.get_model()
+        if not model_loaded and self._timings is not None:
+            self._timings['model'] = self._model_load_ms
         
         # Encode query
-        query_embedding = self._model.encode([query])[0]
+        query_embedding = model.encode([query])[0]
         
         # Compute cosine similarities
         similarities = np.dot(self._embeddings, query_embedding) / (
@@ -76,8 +156,8 @@ class handler(BaseHTTPRequestHandler):
             for idx in top_indices
         ]
     
-    def hybrid_search(self, query: str, top_k: int = 10, fuzzy_threshold: float = 85.0) -> List[Dict]:
-        """Perform hybrid search: fuzzy first, then vector if needed"""
+    def _rank(self, query: str, top_k: int = 10, fuzzy_threshold: float = 85.0) -> List[Tuple[str, float, str]]:
+        """Ranked (job_title, confidence, method) tuples: fuzzy first, then vector if needed"""
         if not query or len(query) < 2:
             return []
         
@@ -91,10 +171,13 @@ class handler(BaseHTTPRequestHandler):
         else:
             vector_results = self.vector_search(query, top_k=top_k)
             results = vector_results if vector_results else fuzzy_results
-        
+        return results
+    
+    def hybrid_search(self, query: str, top_k: int = 10, fuzzy_threshold: float = 85.0) -> List[Dict]:
+        """Perform hybrid search: fuzzy first, then vector if needed"""
         # Convert to output format
         output = []
-        for job_title, confidence, method in results:
+        for job_title, confidence, method in self._rank(query, top_k, fuzzy_threshold):
             # Get job data from pre-loaded dictionary
             job_info = self._job_data.get(job_title, {})
             
@@ -110,11 +193,83 @@ class handler(BaseHTTPRequestHandler):
         
         return output
     
+    @classmethod
+    def _fragment(cls, job_title: str) -> bytes:
+        """Static fields of a title, serialized once per process and cached"""
+        fragment = cls._fragments.get(job_title)
+        if fragment is None:
+            job_info = cls._job_data.get(job_title, {})
+            fragment = _dumps({
+                'job_title': job_title,
+                'industry': job_info.get('industry', 'Unknown'),
+                'location': job_info.get('location', 'Unknown'),
+                'automation_risk': job_info.get('automation_risk', 0),
+                'growth_projection': job_info.get('growth_projection', 0),
+            })[1:-1]
+            cls._fragments[job_title] = fragment
+        return fragment
+    
+    def _render(self, results: List[Tuple[str, float, str]]) -> bytes:
+        """Splice cached fragments and per-query confidence/method into a response body"""
+        items = [
+            b'{' + self._fragment(job_title) + b',"confidence":' + _dumps(float(confidence)) +
+            b',"match_method":' + _dumps(method) + b'}'
+            for job_title, confidence, method in results
+        ]
+        return (b'{"suggestions":[' + b','.join(items) +
+                b'],"total_matches":' + str(len(items)).encode('ascii') + b'}')
+    
+    def _send_timing_headers(self, started: float):
+        """Expose cold/warm state and per-stage timings to the caller"""
+        self._timings['total'] = (time.perf_counter() - started) * 1000
+        cold = 'data' in self._timings or 'model' in self._timings
+        self.send_header('Access-Control-Expose-Headers', 'X-Cold-Start, X-Instance-Age, Server-Timing')
+        self.send_header('X-Cold-Start', 'true' if cold else 'false')
+        self.send_header('X-Instance-Age', f"{time.time() - self._process_started:.0f}")
+        self.send_header('Server-Timing', ', '.join(
+            f"{stage};dur={ms:.1f}" for stage, ms in self._timings.items()
+        ))
+    
+    def do_GET(self):
+        """Report warm state; ?warmup=1 preloads data and the encoder"""
+        started = time.perf_counter()
+        self._timings = {}
+        params = parse_qs(urlparse(self.path).query)
+        try:
+            if params.get('warmup', ['0'])[0] in ('1', 'true'):
+                result = self.warmup()
+                if result['data_load_ms']:
+                    self._timings['data'] = result['data_load_ms']
+                if result['model_load_ms']:
+                    self._timings['model'] = result['model_load_ms']
+            else:
+                result = {'warm': self._data_load_ms is not None and
+                          (self._embeddings is None or self._model is not None)}
+            result['cold_data_load_ms'] = self._data_load_ms
+            result['cold_model_load_ms'] = self._model_load_ms
+            
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Cache-Control', 'no-store')
+            self._send_timing_headers(started)
+            self.end_headers()
+            self.wfile.write(json.dumps(result).encode())
+        except Exception as e:
+            self.send_response(500)
+            self.send_header('Content-type', 'application/json')
+            self.end_headers()
+            self.wfile.write(json.dumps({'error': str(e)}).encode())
+    
     def do_POST(self):
         """Handle POST request"""
+        started = time.perf_counter()
+        self._timings = {}
         try:
             # Load data (cached across invocations)
-            self.load_data()
+            data_ms = self.load_data()
+            if data_ms:
+                self._timings['data'] = data_ms
             
             # Read request body
             content_length = int(self.headers['Content-Length'])
@@ -127,25 +282,28 @@ class handler(BaseHTTPRequestHandler):
                 self.send_response(200)
                 self.send_header('Content-type', 'application/json')
                 self.send_header('Access-Control-Allow-Origin', '*')
+                self._send_timing_headers(started)
                 self.end_headers()
                 self.wfile.write(json.dumps({'suggestions': []}).encode())
                 return
             
             # Perform hybrid search
-            results = self.hybrid_search(query, top_k=15)
+            search_started = time.perf_counter()
+            results = self._rank(query, top_k=15)
+            self._timings['search'] = (time.perf_counter() - search_started) * 1000 - self._timings.get('model', 0)
+            
+            serialize_started = time.perf_counter()
+            body = self._render(results)
+            self._timings['serialize'] = (time.perf_counter() - serialize_started) * 1000
             
             # Send response
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
+            self._send_timing_headers(started)
             self.end_headers()
             
-            response = {
-                'suggestions': results,
-                'total_matches': len(results)
-            }
-            
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(body)
             
         except Exception as e:
             self.send_response(500)
@@ -157,7 +315,13 @@ class handler(BaseHTTPRequestHandler):
         """Handle CORS preflight"""
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         self.end_headers()
 
+
+# Vercel runs module-level code during the function's init phase, so preloading
+# here moves the data and model load off the first request entirely.
+if os.environ.get('JOB_SEARCH_PRELOAD', '').lower() in ('1', 'true'):
+    handler.warmup()
+
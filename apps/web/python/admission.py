@@ -0,0 +1,231 @@
+"""
+Admission control for the Flask API.
+
+Two mechanisms, combined per endpoint by the `admit` decorator:
+- TokenBucketLimiter: per-client request rate with a burst allowance;
+  over-limit requests get 429 with Retry-After.
+- Bulkhead: a bounded pool of concurrent slots with a bounded wait queue.
+  When every slot is busy and the queue is full, or a queued request waits
+  longer than max_wait, the request gets 503 with Retry-After immediately
+  instead of parking another thread.
+
+LLM endpoints and search endpoints use separate bulkheads, so a burst of slow
+upstream LLM calls can never take the threads that typeahead needs.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+
+from flask import jsonify, request
+
+
+class Rejected(Exception):
+    """Raised when a request is not admitted"""
+
+    def __init__(self, status: int, retry_after: float, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class TokenBucketLimiter:
+    """Per-client token buckets (rate tokens/second, up to burst tokens)"""
+
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        """
+        Args:
+            rate: Tokens added per second, i.e. the sustained request rate
+            burst: Bucket size, i.e. requests allowed back to back
+            max_clients: Buckets kept; the least recently seen client is evicted first
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def acquire(self, client: str):
+        """Take one token for client, or raise Rejected(429)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                self.allowed += 1
+                retry_after = None
+            else:
+                self.limited += 1
+                retry_after = (1 - tokens) / self.rate
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        if retry_after is not None:
+            raise Rejected(429, retry_after, 'Rate limit exceeded')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'rate_per_sec': self.rate,
+                'burst': self.burst,
+                'clients': len(self._buckets),
+                'allowed': self.allowed,
+                'limited': self.limited,
+            }
+
+
+class Bulkhead:
+    """Bounded concurrency with a bounded, time-limited wait queue"""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        """
+        Args:
+            name: Pool name, for stats
+            max_concurrent: Requests running at once
+            max_queue: Requests allowed to wait for a slot; beyond this, reject at once
+            max_wait: Seconds a queued request waits before it is rejected
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._service_seconds = 0.0  # EWMA of slot hold time, for Retry-After
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+
+    def _retry_after(self) -> float:
+        # Roughly how long until the current backlog drains
+        backlog = self._waiting + self._active
+        return max(1.0, self._service_seconds * backlog / self.max_concurrent)
+
+    def _acquire(self):
+        with self._cond:
+            if self._active < self.max_concurrent and self._waiting == 0:
+                self._active += 1
+                self.admitted += 1
+                return
+            if self._waiting >= self.max_queue:
+                self.rejected_full += 1
+                raise Rejected(503, self._retry_after(), f'{self.name} pool saturated')
+
+            self._waiting += 1
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while self._active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected_timeout += 1
+                        raise Rejected(503, self._retry_after(), f'{self.name} pool wait timed out')
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._active += 1
+            self.admitted += 1
+
+    def _release(self, held: float):
+        with self._cond:
+            self._active -= 1
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * held
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        """Hold one slot for the duration of the block, or raise Rejected(503)"""
+        self._acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'max_wait_sec': self.max_wait,
+                'active': self._active,
+                'waiting': self._waiting,
+                'admitted': self.admitted,
+                'rejected_full': self.rejected_full,
+                'rejected_timeout': self.rejected_timeout,
+                'avg_service_sec': round(self._service_seconds, 3),
+            }
+
+
+# Proxies in front of the API that append to X-Forwarded-For. Hops before
+# theirs were written by the client and can't be trusted.
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+
+log = logging.getLogger(__name__)
+_warned_untrusted_proxy = False
+
+
+def client_id() -> str:
+    """
+    Address of the client as seen by the outermost trusted proxy, else the peer address.
+
+    Each trusted proxy appends the address it received the request from, so
+    with N proxies the client is the Nth hop from the right. Anything further
+    left is client-supplied; keying on it would let callers mint a fresh token
+    bucket per request.
+
+    Behind a proxy with TRUSTED_PROXY_HOPS unset, every client shares the
+    proxy's address and bucket; the first forwarded request logs a warning.
+    """
+    global _warned_untrusted_proxy
+    if TRUSTED_PROXY_HOPS <= 0 and not _warned_untrusted_proxy and 'X-Forwarded-For' in request.headers:
+        _warned_untrusted_proxy = True
+        log.warning("Got X-Forwarded-For with TRUSTED_PROXY_HOPS=0: rate limits are keyed on the "
+                    "peer address %s, so clients behind that proxy share one bucket. Set "
+                    "TRUSTED_PROXY_HOPS to the number of proxies in front of the API.", request.remote_addr)
+    if TRUSTED_PROXY_HOPS > 0:
+        hops = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+        if hops:
+            return hops[-min(TRUSTED_PROXY_HOPS, len(hops))]
+    return request.remote_addr or 'unknown'
+
+
+def _rejection(error: Rejected):
+    response = jsonify({'error': error.reason, 'retry_after': math.ceil(error.retry_after)})
+    response.status_code = error.status
+    response.headers['Retry-After'] = str(math.ceil(error.retry_after))
+    return response
+
+
+def admit(pool: Optional[Bulkhead], limiter: Optional[TokenBucketLimiter] = None):
+    """
+    Decorate a view so it runs only when admitted by limiter and pool.
+
+    Args:
+        pool: Bulkhead whose slot the view holds while it runs (None = rate limit only)
+        limiter: Optional per-client rate limit, checked before queueing
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                if limiter is not None:
+                    limiter.acquire(client_id())
+                if pool is None:
+                    return view(*args, **kwargs)
+                with pool.slot():
+                    return view(*args, **kwargs)
+            except Rejected as e:
+                return _rejection(e)
+        return wrapper
+    return decorator
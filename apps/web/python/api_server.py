@@ -3,15 +3,29 @@ Python API server for AI Fortune Teller
 Provides endpoints for Kaggle data and LLM generation
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
+import hashlib
+import logging
 import os
+import threading
+import time
 from typing import Dict, Any
 from pathlib import Path
 
-from kaggle_data_loader import get_loader
 from llm_generator import FortuneLLMGenerator
-from hybrid_job_search import HybridJobSearch
+from dataset_aggregates import DIMENSIONS
+from dataset_snapshot import SnapshotManager
+from kaggle_data_loader import SALARY_RANGES
+from http_caching import conditional
+from admission import Bulkhead, TokenBucketLimiter, admit
+from singleflight import SingleFlight, flight_key
+from request_profiler import RequestProfiler
+from fortune_jobs import FortuneJobQueue, check_webhook_url
+from lru import LRUCache
+from query_log import QueryLog
+import log_config
+from log_config import stage
 
 # Load environment variables from .env.local if it exists
 from dotenv import load_dotenv
@@ -28,25 +42,106 @@ else:
         print(f"Loading environment from {env_file}")
         load_dotenv(env_file)
 
+# Log records go through a queue drained by a background thread (LOG_LEVEL, LOG_LEVELS, LOG_FORMAT)
+log_config.configure_logging()
+log = logging.getLogger('api_server')
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Next.js frontend
+# Request IDs (X-Request-ID) and one access record per request with stage timings
+log_config.init_app(app)
+
+
+def is_admin_request() -> bool:
+    """True when X-Admin-Token matches ADMIN_TOKEN (never when ADMIN_TOKEN is unset)"""
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    return bool(admin_token) and request.headers.get('X-Admin-Token') == admin_token
+
+
+# Opt-in profiling: admins send X-Profile: cprofile|sampling, and
+# PROFILE_SAMPLE_RATE profiles a fraction of live traffic
+profiler = RequestProfiler.from_env()
+profiler.init_app(app, is_admin_request)
 
 # Initialize services
-data_loader = get_loader()
-hybrid_search = HybridJobSearch(data_loader)  # Initialize hybrid search
+# Dataset, aggregates and search indexes live in one snapshot that can be
+# rebuilt and swapped at runtime; handlers read it through current_snapshot(),
+# which pins one snapshot per request.
+snapshots = SnapshotManager(search_mode=os.environ.get('HYBRID_SEARCH_MODE', 'cascade'))
+if float(os.environ.get('DATASET_WATCH_INTERVAL', '0')) > 0:
+    snapshots.watch(float(os.environ['DATASET_WATCH_INTERVAL']))
 llm_generator = None  # Initialize lazily when needed
+_llm_generator_lock = threading.Lock()
+
+# Admission control: LLM calls and search run in separate bulkheads so slow
+# upstream LLM responses can't starve typeahead; each has its own rate limit.
+llm_pool = Bulkhead(
+    'llm',
+    max_concurrent=int(os.environ.get('LLM_MAX_CONCURRENT', '4')),
+    max_queue=int(os.environ.get('LLM_MAX_QUEUE', '8')),
+    max_wait=float(os.environ.get('LLM_MAX_WAIT', '5')),
+)
+llm_limiter = TokenBucketLimiter(
+    rate=float(os.environ.get('LLM_RATE_PER_MIN', '6')) / 60,
+    burst=float(os.environ.get('LLM_BURST', '3')),
+)
+search_pool = Bulkhead(
+    'search',
+    max_concurrent=int(os.environ.get('SEARCH_MAX_CONCURRENT', '16')),
+    max_queue=int(os.environ.get('SEARCH_MAX_QUEUE', '64')),
+    max_wait=float(os.environ.get('SEARCH_MAX_WAIT', '0.5')),
+)
+search_limiter = TokenBucketLimiter(
+    rate=float(os.environ.get('SEARCH_RATE_PER_SEC', '20')),
+    burst=float(os.environ.get('SEARCH_BURST', '40')),
+)
+
+# Concurrent identical requests share one computation (keys include the snapshot version)
+suggestion_flights = SingleFlight()
+free_fortune_flights = SingleFlight()
+# Free fortunes are a pure function of answers and snapshot, so they are kept
+free_fortune_cache = LRUCache(int(os.environ.get('FREE_FORTUNE_CACHE_SIZE', '2048')))
+
+# Sampled query log, replayed to warm the caches of each new snapshot
+query_log = QueryLog.from_env()
+WARMUP_TOP_N = int(os.environ.get('WARMUP_TOP_N', '200'))
+
+
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', '60'))
+
+PREMIUM_REQUIRED_FIELDS = ['role', 'experience', 'skills', 'industry', 'age', 'address']
+
+
+def current_snapshot():
+    """
+    The snapshot this request reads, taken on first use and pinned in flask.g,
+    so the ETag and the body always come from the same snapshot
+    """
+    if 'snapshot' not in g:
+        g.snapshot = snapshots.current()
+    return g.snapshot
+
+
+def dataset_version() -> str:
+    """Version tag of the request's snapshot (dataset + search index); the basis of every ETag"""
+    return current_snapshot().etag_version
+
 
 def get_llm_generator():
     """Lazy initialization of LLM generator"""
     global llm_generator
     if llm_generator is None:
-        try:
-            llm_generator = FortuneLLMGenerator()
-            print(f"LLM generator initialized: {llm_generator.provider}")
-        except ValueError as e:
-            print(f"Warning: LLM generator not available: {e}")
-            print("    Premium features will be unavailable.")
-            llm_generator = None
+        with _llm_generator_lock:
+            if llm_generator is None:
+                try:
+                    # The premium job queue owns retries; a request must also end
+                    # well inside the job lease (see premium_jobs below)
+                    llm_generator = FortuneLLMGenerator(timeout=LLM_TIMEOUT, max_retries=0)
+                    log.info("LLM generator initialized: %s", llm_generator.provider)
+                except ValueError as e:
+                    # Retried on every call (e.g. each /health); rate limited
+                    log.warning("LLM generator not available, premium features disabled: %s", e)
+                    llm_generator = None
     return llm_generator
 
 
@@ -56,30 +151,203 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'services': {
-            'kaggle_data': data_loader is not None,
+            'kaggle_data': snapshots.current().data_loader.df is not None,
             'llm': get_llm_generator() is not None
-        }
+        },
+        'dataset_version': snapshots.current().version,
+        'admission': {
+            'llm': {**llm_pool.stats(), 'rate_limit': llm_limiter.stats()},
+            'search': {**search_pool.stats(), 'rate_limit': search_limiter.stats()},
+        },
+        'coalescing': {
+            'suggestions': suggestion_flights.stats(),
+            'free_fortune': free_fortune_flights.stats(),
+        },
+        'caches': {
+            'search': snapshots.current().hybrid_search.stats()['caches'],
+            'free_fortune': free_fortune_cache.stats(),
+        },
+        'query_log': query_log.stats(),
+        'logging': log_config.stats(),
+        'premium_jobs': premium_jobs.stats(),
+        'llm_prompts': llm_generator.prompt_stats.summary() if llm_generator else None
     })
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 503 until the live snapshot's caches have been warmed"""
+    ready = snapshots.ready()
+    return jsonify({
+        'ready': ready,
+        'dataset_version': snapshots.current().version,
+    }), 200 if ready else 503
+
+
+@app.route('/api/admin/reload', methods=['POST'])
+def reload_dataset():
+    """
+    Rebuild the dataset snapshot in the background and swap it in atomically
+    
+    Requires the X-Admin-Token header to match ADMIN_TOKEN (disabled if unset).
+    
+    Request body (optional):
+    {
+        "force_refresh": false,  # re-download from Kaggle instead of the cache
+        "wait": false            # respond only after the new snapshot is live
+    }
+    """
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    started = snapshots.reload(
+        force_refresh=bool(data.get('force_refresh', False)),
+        wait=bool(data.get('wait', False))
+    )
+    status = snapshots.status()
+    status['accepted'] = started
+    return jsonify(status), 202 if started else 409
+
+
+@app.route('/api/admin/dataset', methods=['GET'])
+def get_dataset_status():
+    """Current snapshot version, fingerprint and reload state"""
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({**snapshots.status(), 'profiler': profiler.stats()})
+
+
 @app.route('/api/dataset/summary', methods=['GET'])
+@conditional(dataset_version)
 def get_dataset_summary():
     """Get summary statistics of the Kaggle dataset"""
     try:
-        summary = data_loader.get_dataset_summary()
+        summary = current_snapshot().data_loader.get_dataset_summary()
         return jsonify(summary)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/dataset/drilldown', methods=['GET'])
+@conditional(dataset_version)
+def get_dataset_drilldown():
+    """
+    Aggregates for one industry/location/AI impact cell of the dataset
+    
+    Query parameters (all optional; omitted dimensions are rolled up):
+        industry, location, ai_impact_level
+        by: industry | location | ai_impact_level - also return child cells
+    """
+    try:
+        by = request.args.get('by')
+        if by and by not in DIMENSIONS:
+            return jsonify({'error': f'Invalid dimension: {by}'}), 400
+        
+        cell = current_snapshot().data_loader.get_aggregate(
+            industry=request.args.get('industry'),
+            location=request.args.get('location'),
+            ai_impact_level=request.args.get('ai_impact_level'),
+            by=by
+        )
+        if cell is None:
+            return jsonify({'error': 'No data for the requested filters'}), 404
+        return jsonify(cell)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/search/stats', methods=['GET'])
+def get_search_stats():
+    """Alias hit rates and search index sizes"""
+    return jsonify(snapshots.current().hybrid_search.stats())
+
+
+@app.route('/api/jobs/<path:job_title>/related', methods=['GET'])
+def get_related_jobs(job_title: str):
+    """
+    Most similar careers to a job title, from the precomputed neighbor index
+    
+    Query parameters:
+        k: number of related jobs (default 5, at most the index's k)
+    """
+    # Built with each snapshot (from its embeddings file), so a reload refreshes it
+    related_jobs = current_snapshot().related_jobs
+    if related_jobs is None:
+        return jsonify({'error': 'Related jobs unavailable'}), 503
+    try:
+        k = int(request.args.get('k', 5))
+    except ValueError:
+        return jsonify({'error': 'k must be an integer'}), 400
+    if k < 1:
+        return jsonify({'error': 'k must be at least 1'}), 400
+    
+    related = related_jobs.related(job_title, k)
+    if related is None:
+        return jsonify({'error': f'Unknown job title: {job_title}'}), 404
+    return jsonify({
+        'job_title': related_jobs.canonical_title(job_title),
+        'related': related
+    })
+
+
+@app.route('/api/careers/alternatives', methods=['POST'])
+def get_career_alternatives():
+    """
+    Careers that are Pareto-better than the current one: no riskier, no slower
+    growing, no lower paid, and strictly better somewhere
+
+    Body:
+        job_title: current job title (required)
+        industry: current industry (optional)
+        same_industry: only suggest careers in that industry (default true)
+        max_extra_experience: extra years of experience allowed (default 0)
+        min_salary: minimum median salary (optional)
+        limit: maximum alternatives (default 10, at most 50)
+    """
+    skyline = current_snapshot().data_loader.skyline
+    if skyline is None:
+        return jsonify({'error': 'Career alternatives unavailable'}), 503
+
+    data = request.get_json(silent=True) or {}
+    job_title = str(data.get('job_title', '')).strip()
+    if not job_title:
+        return jsonify({'error': 'Missing required field: job_title'}), 400
+    try:
+        max_extra_experience = float(data.get('max_extra_experience', 0))
+        min_salary = data.get('min_salary')
+        min_salary = None if min_salary is None else float(min_salary)
+        limit = max(1, min(int(data.get('limit', 10)), 50))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'max_extra_experience, min_salary and limit must be numbers'}), 400
+
+    try:
+        result = skyline.alternatives(
+            job_title,
+            industry=data.get('industry'),
+            same_industry=bool(data.get('same_industry', True)),
+            max_extra_experience=max_extra_experience,
+            min_salary=min_salary,
+            limit=limit
+        )
+    except ValueError as e:  # Unknown industry with same_industry
+        return jsonify({'error': str(e)}), 400
+    if result is None:
+        return jsonify({'error': f'Unknown job title: {job_title}'}), 404
+    return jsonify(result)
+
+
 @app.route('/api/job-suggestions', methods=['POST'])
+@admit(search_pool, search_limiter)
 def get_job_suggestions():
     """
     Get job title suggestions using hybrid fuzzy + vector search
     
     Request body:
     {
-        "query": "software enginer"  # typos handled!
+        "query": "software enginer",  # typos handled!
+        "industry": "IT",             # optional facet filter
+        "location": "USA"             # optional facet filter
     }
     
     Returns:
@@ -96,25 +364,49 @@ def get_job_suggestions():
         ]
     }
     """
+    data = request.get_json(silent=True) or {}
+    return _job_suggestions(data.get('query', ''), data.get('industry'), data.get('location'))
+
+
+@app.route('/api/job-suggestions', methods=['GET'])
+@conditional(dataset_version)
+@admit(search_pool, search_limiter)
+def get_job_suggestions_cacheable():
+    """
+    Cacheable form of job suggestions for typeahead: browsers and CDNs can
+    store and revalidate it by URL.
+    
+    Query parameters:
+        q: search text
+        industry, location: optional facet filters
+    """
+    return _job_suggestions(request.args.get('q', ''), request.args.get('industry'),
+                            request.args.get('location'))
+
+
+def _job_suggestions(query: str, industry: str = None, location: str = None):
     try:
-        data = request.get_json()
-        query = data.get('query', '').strip()
+        query = query.strip()
         
         if len(query) < 2:
             return jsonify({'suggestions': []})
         
-        # Use hybrid search (fuzzy + vector)
-        results = hybrid_search.hybrid_search(query, top_k=6)
+        # Use hybrid search (fuzzy + vector), scoring only titles passing the filters.
+        # The body is spliced from pre-serialized per-title fragments; identical
+        # queries already in flight wait for that search instead of repeating it.
+        snapshot = current_snapshot()
+        with stage('search'):
+            body, _ = suggestion_flights.do(
+                flight_key(snapshot.version, query, industry, location),
+                snapshot.hybrid_search.hybrid_search_json,
+                query, top_k=6, industry=industry, location=location,
+            )
+        query_log.record('suggestions', {'query': query, 'industry': industry, 'location': location})
         
-        return jsonify({
-            'suggestions': results,
-            'total_matches': len(results)
-        })
+        return Response(body, mimetype='application/json')
         
-    except Exception as e:
-        print(f"Error getting job suggestions: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("Error getting job suggestions")
         return jsonify({'error': 'Failed to get job suggestions'}), 500
 
 
@@ -141,51 +433,71 @@ def get_free_fortune():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Get job data from Kaggle dataset (location is optional)
-        job_data = data_loader.get_job_data(data['job_title'], None)
-        
-        # Calculate salary comparison
-        salary_comparison = _calculate_salary_comparison(data['current_salary'], job_data)
-        
-        # Calculate enhanced resilience score
-        score_data = data_loader.calculate_resilience_score(
-            job_data,
-            data['experience'],
-            [data['ai_skills']]  # Convert to list format
-        )
-        
-        # Add salary analysis to score data
-        score_data['salary_analysis']['user_comparison'] = salary_comparison
-        
-        # Generate narrative (basic template for free tier)
-        narrative = _generate_free_narrative(data, job_data, score_data)
+        # One snapshot for the whole request, even if a reload lands mid-way
+        # Identical answers already being scored share that computation
+        snapshot = current_snapshot()
+        answers = {field: data[field] for field in required_fields}
+        key = flight_key(snapshot.version, answers)
+        fortune = free_fortune_cache.get(key)
+        if fortune is None:
+            with stage('fortune'):
+                fortune, _ = free_fortune_flights.do(key, _free_fortune, snapshot.data_loader, answers)
+            free_fortune_cache.put(key, fortune)
+        query_log.record('fortune', answers)
+        return jsonify(fortune)
         
-        return jsonify({
-            'score': score_data['score'],
-            'narrative': narrative,
-            'riskLevel': score_data['risk_level'],
-            'outlook': score_data['outlook'],
-            'factors': score_data['factors'],
-            'salary_analysis': score_data['salary_analysis'],
-            'job_data': {
-                'automation_risk': job_data['ai_automation_risk'],
-                'growth_projection': job_data['job_growth_projection'],
-                'skills_needed': job_data['required_skills_adaptation'],
-                'industry': job_data.get('industry', 'Unknown'),
-                'location': job_data.get('location', 'Unknown'),
-                'ai_impact_level': job_data.get('ai_impact_level', 'Unknown')
-            },
-            'data_source': job_data['data_source'],
-            'tier': 'free'
-        })
-        
-    except Exception as e:
-        print(f"Error generating free fortune: {e}")
+    except Exception:
+        log.exception("Error generating free fortune")
         return jsonify({'error': 'Failed to generate fortune'}), 500
 
 
+def _free_fortune(data_loader, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Free-tier fortune for validated quiz answers (pure function of data and dataset)"""
+    # Get job data from Kaggle dataset (location is optional)
+    job_data = data_loader.get_job_data(data['job_title'], None)
+    
+    # Calculate salary comparison
+    salary_comparison = _calculate_salary_comparison(data['current_salary'], job_data)
+    
+    # Calculate enhanced resilience score
+    score_data = data_loader.calculate_resilience_score(
+        job_data,
+        data['experience'],
+        [data['ai_skills']]  # Convert to list format
+    )
+    
+    # Add salary analysis to score data
+    score_data['salary_analysis']['user_comparison'] = salary_comparison
+    
+    # Generate narrative (basic template for free tier)
+    narrative = _generate_free_narrative(data, job_data, score_data)
+    
+    return {
+        'score': score_data['score'],
+        'narrative': narrative,
+        'riskLevel': score_data['risk_level'],
+        'outlook': score_data['outlook'],
+        'factors': score_data['factors'],
+        'salary_analysis': score_data['salary_analysis'],
+        'job_data': {
+            'automation_risk': job_data['ai_automation_risk'],
+            'growth_projection': job_data['job_growth_projection'],
+            'skills_needed': job_data['required_skills_adaptation'],
+            'industry': job_data.get('industry', 'Unknown'),
+            'location': job_data.get('location', 'Unknown'),
+            'ai_impact_level': job_data.get('ai_impact_level', 'Unknown')
+        },
+        'data_source': job_data['data_source'],
+        'tier': 'free'
+    }
+
+
 # Premium endpoint disabled - no longer used
 # @app.route('/api/fortune/premium', methods=['POST'])
+# Unrouted, so this admission only applies if the route is restored. Live LLM
+# traffic is admitted by POST /api/fortune/premium/jobs (llm_limiter) and the
+# queue workers, which hold an llm_pool slot per generation.
+@admit(llm_pool, llm_limiter)
 def get_premium_fortune_disabled():
     """
     Generate premium fortune with LLM-powered insights
@@ -211,94 +523,153 @@ def get_premium_fortune_disabled():
             }), 503
         
         # Validate input
-        required_fields = ['role', 'experience', 'skills', 'industry', 'age', 'address']
-        for field in required_fields:
+        for field in PREMIUM_REQUIRED_FIELDS:
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Get job data from Kaggle dataset
-        job_data = data_loader.get_job_data(data['role'], data['industry'])
+        return jsonify(_premium_fortune(llm, current_snapshot().data_loader, data))
         
-        # Calculate resilience score
-        score_data = data_loader.calculate_resilience_score(
-            job_data,
-            data['experience'],
-            data['skills']
-        )
-        
-        # Generate premium fortune with LLM
-        user_profile = {
-            'role': data['role'],
-            'experience': data['experience'],
-            'skills': data['skills'],
-            'industry': data['industry'],
-            'age': data['age']
-        }
-        
-        premium_fortune = llm.generate_premium_fortune(
-            user_profile,
-            job_data,
-            score_data
-        )
-        
-        # Generate NFT image prompt
-        nft_prompt = llm.generate_nft_image_prompt(user_profile, {
-            **score_data,
-            **premium_fortune
-        })
-        
-        return jsonify({
-            'score': score_data['score'],
-            'narrative': premium_fortune['narrative'],
-            'riskLevel': score_data['risk_level'],
-            'outlook': score_data['outlook'],
-            'strategies': premium_fortune['strategies'],
-            'keyInsights': premium_fortune['key_insights'],
-            'timeline': premium_fortune['timeline'],
-            'resources': premium_fortune['resources'],
-            'warnings': premium_fortune['warnings'],
-            'opportunities': premium_fortune['opportunities'],
-            'nftMetadata': {
-                'name': f"Prophecy #{data['address'][-6:]}",
-                'description': premium_fortune['nft_description'],
-                'imagePrompt': nft_prompt,
-                'attributes': [
-                    {'trait_type': 'Occupation', 'value': data['role']},
-                    {'trait_type': 'AI Resilience Score', 'value': score_data['score']},
-                    {'trait_type': 'Risk Level', 'value': score_data['risk_level']},
-                    {'trait_type': 'Automation Risk', 'value': f"{job_data['ai_automation_risk']}%"},
-                    {'trait_type': 'Growth Projection', 'value': f"{job_data['job_growth_projection']}%"},
-                    {'trait_type': 'Generated By', 'value': premium_fortune['generated_by']}
-                ]
-            },
-            'fateMap': _generate_fate_map(data, score_data, premium_fortune),
-            'factors': score_data['factors'],
-            'salary_analysis': score_data['salary_analysis'],
-            'tier': 'premium'
-        })
-        
-    except Exception as e:
-        print(f"Error generating premium fortune: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        log.exception("Error generating premium fortune")
         return jsonify({'error': 'Failed to generate premium fortune'}), 500
 
 
-def _calculate_salary_comparison(user_salary_range: str, job_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Calculate how user's salary compares to market data"""
+@app.route('/api/fortune/premium/jobs', methods=['POST'])
+@admit(None, llm_limiter)
+def submit_premium_fortune():
+    """
+    Queue a premium fortune; poll GET /api/fortune/premium/jobs/<job_id> for it
+    
+    Request body: as for the premium fortune, plus an optional
+    "webhook_url" that receives the finished job as a JSON POST.
+    
+    The job is keyed by wallet address and the Idempotency-Key header (or,
+    without one, the answers), so retried submissions return the existing
+    job instead of paying for another generation.
+    """
+    if get_llm_generator() is None:
+        return jsonify({
+            'error': 'Premium features unavailable. GROK_API_KEY or OPENAI_API_KEY required.'
+        }), 503
+    
+    data = request.get_json(silent=True) or {}
+    for field in PREMIUM_REQUIRED_FIELDS:
+        if field not in data:
+            return jsonify({'error': f'Missing required field: {field}'}), 400
+    webhook_url = data.get('webhook_url')
+    if webhook_url is not None:
+        refused = check_webhook_url(str(webhook_url), premium_jobs.webhook_hosts)
+        if refused:
+            return jsonify({'error': refused}), 400
+    
+    payload = {field: data[field] for field in PREMIUM_REQUIRED_FIELDS}
+    answers = {field: value for field, value in payload.items() if field != 'address'}
+    key = flight_key(
+        str(data['address']).lower(),
+        request.headers.get('Idempotency-Key') or answers
+    )
+    job, created = premium_jobs.submit(
+        payload, hashlib.sha256(key.encode()).hexdigest(), webhook_url
+    )
+    response = jsonify(job)
+    response.status_code = 202 if created else 200
+    response.headers['Location'] = f"/api/fortune/premium/jobs/{job['job_id']}"
+    return response
+
+
+@app.route('/api/fortune/premium/jobs/<job_id>', methods=['GET'])
+def get_premium_fortune_job(job_id: str):
+    """Status of a queued premium fortune; includes 'result' once succeeded"""
+    job = premium_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+
+def _run_premium_job(payload: Dict[str, Any], last_attempt: bool) -> Dict[str, Any]:
+    """
+    Queue handler: one premium generation
     
-    # Map salary ranges to numeric values
-    salary_ranges = {
-        'under-30k': {'min': 0, 'max': 30000, 'mid': 15000},
-        '30k-50k': {'min': 30000, 'max': 50000, 'mid': 40000},
-        '50k-75k': {'min': 50000, 'max': 75000, 'mid': 62500},
-        '75k-100k': {'min': 75000, 'max': 100000, 'mid': 87500},
-        '100k-150k': {'min': 100000, 'max': 150000, 'mid': 125000},
-        '150k-200k': {'min': 150000, 'max': 200000, 'mid': 175000},
-        'over-200k': {'min': 200000, 'max': 1000000, 'mid': 300000},
+    Holds an LLM bulkhead slot like the synchronous endpoint did. LLM errors
+    raise so the queue retries; the last attempt falls back to the template
+    fortune rather than failing a paid request.
+    """
+    llm = get_llm_generator()
+    if llm is None:
+        raise RuntimeError('LLM generator unavailable')
+    with llm_pool.slot():
+        return _premium_fortune(llm, snapshots.current().data_loader, payload, fallback=last_attempt)
+
+
+def _premium_fortune(llm, data_loader, data: Dict[str, Any], fallback: bool = True) -> Dict[str, Any]:
+    """Premium fortune for validated answers (see PREMIUM_REQUIRED_FIELDS)"""
+    # Get job data from Kaggle dataset
+    job_data = data_loader.get_job_data(data['role'], data['industry'])
+    
+    # Calculate resilience score
+    score_data = data_loader.calculate_resilience_score(
+        job_data,
+        data['experience'],
+        data['skills']
+    )
+    
+    # Generate premium fortune with LLM
+    user_profile = {
+        'role': data['role'],
+        'experience': data['experience'],
+        'skills': data['skills'],
+        'industry': data['industry'],
+        'age': data['age']
     }
     
-    user_range = salary_ranges.get(user_salary_range, {'min': 0, 'max': 0, 'mid': 0})
+    premium_fortune = llm.generate_premium_fortune(
+        user_profile,
+        job_data,
+        score_data,
+        fallback=fallback
+    )
+    
+    # Generate NFT image prompt
+    nft_prompt = llm.generate_nft_image_prompt(user_profile, {
+        **score_data,
+        **premium_fortune
+    })
+    
+    return {
+        'score': score_data['score'],
+        'narrative': premium_fortune['narrative'],
+        'riskLevel': score_data['risk_level'],
+        'outlook': score_data['outlook'],
+        'strategies': premium_fortune['strategies'],
+        'keyInsights': premium_fortune['key_insights'],
+        'timeline': premium_fortune['timeline'],
+        'resources': premium_fortune['resources'],
+        'warnings': premium_fortune['warnings'],
+        'opportunities': premium_fortune['opportunities'],
+        'nftMetadata': {
+            'name': f"Prophecy #{data['address'][-6:]}",
+            'description': premium_fortune['nft_description'],
+            'imagePrompt': nft_prompt,
+            'attributes': [
+                {'trait_type': 'Occupation', 'value': data['role']},
+                {'trait_type': 'AI Resilience Score', 'value': score_data['score']},
+                {'trait_type': 'Risk Level', 'value': score_data['risk_level']},
+                {'trait_type': 'Automation Risk', 'value': f"{job_data['ai_automation_risk']}%"},
+                {'trait_type': 'Growth Projection', 'value': f"{job_data['job_growth_projection']}%"},
+                {'trait_type': 'Generated By', 'value': premium_fortune['generated_by']}
+            ]
+        },
+        'fateMap': _generate_fate_map(data, score_data, premium_fortune),
+        'factors': score_data['factors'],
+        'salary_analysis': score_data['salary_analysis'],
+        'tier': 'premium'
+    }
+
+
+def _calculate_salary_comparison(user_salary_range: str, job_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Calculate how user's salary compares to market data"""
+    
+    user_range = SALARY_RANGES.get(user_salary_range, {'min': 0, 'max': 0, 'mid': 0})
     market_median = job_data.get('avg_salary_2024', 60000)
     
     # Calculate percentile (rough estimate)
@@ -436,6 +807,55 @@ def _generate_fate_map(user_data: Dict[str, Any],
         ]
 
 
+# Premium generations run in a durable background queue (SQLite), so slow LLM
+# calls don't hold HTTP requests open
+premium_jobs = FortuneJobQueue(
+    os.environ.get('PREMIUM_JOBS_DB', str(Path(__file__).parent / 'data' / 'premium_jobs.sqlite3')),
+    _run_premium_job,
+    workers=int(os.environ.get('PREMIUM_JOB_WORKERS', '2')),
+    max_attempts=int(os.environ.get('PREMIUM_JOB_MAX_ATTEMPTS', '3')),
+    # Results are signed when a secret is set; webhook hosts may be allowlisted
+    webhook_secret=os.environ.get('PREMIUM_WEBHOOK_SECRET') or None,
+    webhook_hosts=[h.strip() for h in os.environ.get('PREMIUM_WEBHOOK_HOSTS', '').split(',') if h.strip()],
+    # Worst case for one attempt is the wait for an LLM slot plus one request
+    # timeout (the client doesn't retry); the lease must outlast it or the job
+    # would be claimed and paid for twice
+    lease=float(os.environ.get('PREMIUM_JOB_LEASE', str(llm_pool.max_wait + LLM_TIMEOUT + 60))),
+)
+if premium_jobs.lease <= llm_pool.max_wait + LLM_TIMEOUT:
+    log.warning("PREMIUM_JOB_LEASE (%.0fs) is shorter than LLM_MAX_WAIT + LLM_TIMEOUT (%.0fs); "
+                "slow jobs may run twice", premium_jobs.lease, llm_pool.max_wait + LLM_TIMEOUT)
+premium_jobs.start()
+
+
+def _warm_up(snapshot):
+    """Replay the most frequent logged queries against a snapshot to fill its caches"""
+    start = time.time()
+    search = snapshot.hybrid_search
+    search.warm()
+    suggestions = query_log.top('suggestions', WARMUP_TOP_N)
+    for params in suggestions:
+        try:
+            # Same arguments as /api/job-suggestions, so the cache keys match
+            search.hybrid_search(params['query'], top_k=6, industry=params.get('industry'),
+                                 location=params.get('location'))
+        except Exception as e:
+            log.warning("Warm-up query %r failed: %s", params.get('query'), e)
+    fortunes = query_log.top('fortune', WARMUP_TOP_N)
+    for answers in fortunes:
+        try:
+            free_fortune_cache.put(flight_key(snapshot.version, answers),
+                                   _free_fortune(snapshot.data_loader, answers))
+        except Exception as e:
+            log.warning("Warm-up fortune for %r failed: %s", answers.get('job_title'), e)
+    log.info("Warmed snapshot v%d: %d queries, %d fortunes in %.1fs",
+             snapshot.version, len(suggestions), len(fortunes), time.time() - start)
+
+
+# /ready reports 503 until this finishes; reloads are warmed before they go live
+snapshots.set_warm_up(_warm_up)
+
+
 if __name__ == '__main__':
     # Get port from environment or default to 5000
     port = int(os.environ.get('PORT', 5000))
@@ -445,9 +865,15 @@ if __name__ == '__main__':
     
     Endpoints:
     - GET  /health                  - Health check
+    - GET  /ready                   - Readiness (503 until caches are warm)
     - GET  /api/dataset/summary     - Dataset statistics
+    - GET  /api/dataset/drilldown   - Industry/location/AI impact aggregates
     - POST /api/fortune/free        - Fortune (Kaggle job market data)
     - GET  /api/job-suggestions     - Job title suggestions
+    - GET  /api/jobs/<title>/related - Similar careers
+    - POST /api/careers/alternatives - Lower-risk Pareto-better careers
+    - POST /api/fortune/premium/jobs - Queue a premium fortune (poll GET .../jobs/<id>)
+    - POST /api/admin/reload        - Hot-reload the dataset (X-Admin-Token)
     
     Starting on http://localhost:{port}
     """)
@@ -0,0 +1,169 @@
+"""
+Benchmark the premium fortune pipeline against the mock LLM server.
+
+Starts mock_llm_server.py in-process, points the generator at it
+(LLM_BASE_URL) and runs premium fortunes end to end, reporting throughput and
+tail latency. No Grok/OpenAI key or network access is needed.
+
+Modes:
+- direct: worker threads call the pipeline (job data, resilience score, LLM,
+  NFT prompt) as the synchronous endpoint did
+- queue: jobs go through POST /api/fortune/premium/jobs and are polled until
+  done, so latency includes queueing, retries and the worker pool
+
+Usage:
+    python bench_premium.py --requests 200 --concurrency 16
+    python bench_premium.py --mode queue --requests 100 --error-rate 0.05
+    python bench_premium.py --latency fixed --latency-ms 300 --tokens-per-sec 0 --json
+    python bench_premium.py --prompt-variant compact --prefill-tokens-per-sec 2000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from load_test import EXPERIENCE_LEVELS, percentile
+from mock_llm_server import MockLLMServer, config_from_args, parse_args as mock_args
+
+ROLES = ['Data Scientist', 'Accountant', 'Graphic Designer', 'Registered Nurse',
+         'Software Engineer', 'Teacher', 'Electrician', 'Paralegal']
+
+
+def make_answers(i: int) -> Dict[str, Any]:
+    """Premium quiz answers; the address is unique so no job is deduplicated"""
+    return {
+        'role': ROLES[i % len(ROLES)],
+        'experience': EXPERIENCE_LEVELS[i % 4],
+        'skills': ['programming', 'ml'] if i % 2 else ['communication'],
+        'industry': 'IT',
+        'age': '26-35',
+        'address': f"0x{i:040x}",
+    }
+
+
+def load_api(mock: MockLLMServer, concurrency: int):
+    """Import api_server wired to the mock, with admission limits out of the way"""
+    os.environ['LLM_BASE_URL'] = mock.base_url
+    os.environ.setdefault('PREMIUM_JOBS_DB', os.path.join(tempfile.mkdtemp(), 'bench_jobs.sqlite3'))
+    os.environ.setdefault('PREMIUM_JOB_WORKERS', str(concurrency))
+    os.environ.setdefault('LLM_MAX_CONCURRENT', str(concurrency))
+    os.environ.setdefault('LLM_MAX_QUEUE', '100000')
+    os.environ.setdefault('LLM_MAX_WAIT', '600')
+    os.environ.setdefault('LLM_RATE_PER_MIN', '1000000000')
+    os.environ.setdefault('LLM_BURST', '1000000000')
+    import api_server
+    if api_server.get_llm_generator() is None:
+        raise RuntimeError('LLM generator did not initialize')
+    return api_server
+
+
+def run_direct(api, requests: int, concurrency: int) -> List[Dict[str, Any]]:
+    llm = api.get_llm_generator()
+
+    def one(i: int) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            with api.llm_pool.slot():
+                result = api._premium_fortune(llm, api.snapshots.current().data_loader, make_answers(i))
+            outcome = result['nftMetadata']['attributes'][-1]['value']
+        except Exception as e:
+            outcome = f"error: {type(e).__name__}"
+        return {'latency': time.perf_counter() - start, 'outcome': outcome}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(requests)))
+
+
+def run_queue(api, requests: int, poll_interval: float = 0.05) -> List[Dict[str, Any]]:
+    client = api.app.test_client()
+    submitted = {}
+    for i in range(requests):
+        response = client.post('/api/fortune/premium/jobs', json=make_answers(i))
+        if response.status_code != 202:
+            raise RuntimeError(f"Submit failed ({response.status_code}): {response.get_json()}")
+        submitted[response.get_json()['job_id']] = time.perf_counter()
+
+    samples = []
+    while submitted:
+        for job_id in list(submitted):
+            job = api.premium_jobs.get(job_id)
+            if job['status'] in ('succeeded', 'failed'):
+                outcome = (job['result']['nftMetadata']['attributes'][-1]['value']
+                           if job['status'] == 'succeeded' else 'failed')
+                samples.append({'latency': time.perf_counter() - submitted.pop(job_id),
+                                'outcome': outcome, 'attempts': job['attempts']})
+        time.sleep(poll_interval)
+    return samples
+
+
+def summarize(samples: List[Dict[str, Any]], elapsed: float, mock: MockLLMServer,
+              prompts: Dict[str, Any]) -> Dict[str, Any]:
+    latencies = sorted(s['latency'] for s in samples)
+    total = len(latencies)
+    summary = {
+        'requests': total,
+        'elapsed_s': round(elapsed, 3),
+        'fortunes_per_sec': round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / total * 1000, 1) if total else 0.0,
+            'p50': round(percentile(latencies, 50) * 1000, 1),
+            'p95': round(percentile(latencies, 95) * 1000, 1),
+            'p99': round(percentile(latencies, 99) * 1000, 1),
+            'max': round(latencies[-1] * 1000, 1) if total else 0.0,
+        },
+        'outcomes': dict(Counter(s['outcome'] for s in samples)),
+        'mock_llm': mock.stats(),
+        'prompts': prompts,
+    }
+    if any('attempts' in s for s in samples):
+        summary['attempts'] = dict(Counter(s['attempts'] for s in samples))
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['direct', 'queue'], default='direct')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8, help='Threads (direct) or queue workers')
+    parser.add_argument('--prompt-variant', choices=['full', 'compact'], default='full')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args, rest = parser.parse_known_args(argv)
+    # Latency, token speed and failure options are the mock server's
+    mock_options = mock_args(['--port', '0', *rest])
+
+    os.environ['LLM_PROMPT_VARIANT'] = args.prompt_variant
+    mock = MockLLMServer(config_from_args(mock_options), port=0).start()
+    api = load_api(mock, args.concurrency)
+
+    start = time.perf_counter()
+    if args.mode == 'direct':
+        samples = run_direct(api, args.requests, args.concurrency)
+    else:
+        samples = run_queue(api, args.requests)
+    summary = summarize(samples, time.perf_counter() - start, mock,
+                        api.get_llm_generator().prompt_stats.summary())
+    mock.stop()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    latency = summary['latency_ms']
+    print(f"\nPremium pipeline ({args.mode}, {args.concurrency} workers, mock {mock_options.latency} "
+          f"{mock_options.latency_ms:.0f} ms + {mock_options.tokens_per_sec:.0f} tok/s)")
+    print(f"  {summary['requests']} fortunes in {summary['elapsed_s']:.1f}s "
+          f"({summary['fortunes_per_sec']:.1f}/s)")
+    print(f"  latency ms: p50 {latency['p50']:.0f}  p95 {latency['p95']:.0f}  "
+          f"p99 {latency['p99']:.0f}  max {latency['max']:.0f}")
+    prompts = summary['prompts']
+    print(f"  prompt: {args.prompt_variant}, {prompts['avg_prompt_tokens']:.0f} tokens avg "
+          f"({prompts['cached_token_share']:.0%} cached)")
+    print(f"  outcomes: {summary['outcomes']}  mock: {summary['mock_llm']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Skyline (Pareto frontier) queries for lower-risk career alternatives.
+
+Each career is a (industry, job title) pair summarized over its rows:
+automation risk (lower is better), growth from 2024 -> 2030 openings (higher),
+median salary (higher) and experience required (lower). Dominance checks are
+blocked and vectorized.
+
+A query first applies every constraint to the careers in scope: at least as
+safe, fast growing and well paid as the current job, bounded extra
+experience, minimum salary, and not the current title in any industry. It
+then takes the skyline of what is left. The title exclusion is not monotone:
+the same title in another industry can dominate valid alternatives. So the
+skyline has to come after the filter, not before. The filter leaves only
+careers at least as good as the current job, usually a small set.
+
+Industry skylines are still precomputed at load for stats.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from dataset_aggregates import ALL, COLUMNS
+
+EXPERIENCE_COLUMNS = ('Experience Required (Years)', 'Experience_Required')
+
+# Objective columns of the metrics matrix and whether larger values are better
+OBJECTIVES = ('automation_risk', 'growth_projection', 'median_salary', 'experience_required')
+MAXIMIZE = np.array([False, True, True, False])
+
+
+def _column(df: pd.DataFrame, names) -> Optional[str]:
+    for name in names:
+        if name in df.columns:
+            return name
+    return None
+
+
+def skyline_mask(metrics: np.ndarray, block_size: int = 512) -> np.ndarray:
+    """
+    Rows of metrics not dominated by any other row.
+
+    Args:
+        metrics: (n, len(OBJECTIVES)) matrix in OBJECTIVES order
+        block_size: Rows checked per broadcast; bounds memory to block x n x objectives
+
+    Returns:
+        Boolean mask of skyline rows
+    """
+    # Flip minimized objectives so larger is better everywhere
+    values = np.where(MAXIMIZE, metrics, -metrics)
+    n = len(values)
+    on_skyline = np.ones(n, dtype=bool)
+    for start in range(0, n, block_size):
+        block = values[start:start + block_size, None, :]       # (b, 1, d)
+        at_least = (values[None, :, :] >= block).all(axis=2)    # other row >= this row everywhere
+        better = (values[None, :, :] > block).any(axis=2)       # and > somewhere
+        on_skyline[start:start + block_size] = ~(at_least & better).any(axis=1)
+    return on_skyline
+
+
+class CareerSkyline:
+    """Per-industry Pareto frontiers over careers"""
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Summarize careers and precompute every skyline.
+
+        Args:
+            df: Job market DataFrame (current or legacy column names)
+        """
+        start = time.perf_counter()
+        title_col = _column(df, COLUMNS['job_title'])
+        industry_col = _column(df, COLUMNS['industry'])
+        columns = {
+            'automation_risk': _column(df, COLUMNS['automation_risk']),
+            'median_salary': _column(df, COLUMNS['median_salary']),
+            'openings_2024': _column(df, COLUMNS['openings_2024']),
+            'openings_2030': _column(df, COLUMNS['openings_2030']),
+            'experience_required': _column(df, EXPERIENCE_COLUMNS),
+        }
+        missing = [field for field, col in columns.items() if col is None]
+        if title_col is None or industry_col is None or missing:
+            raise ValueError(f"Dataset lacks columns needed for career skylines: {missing or 'title/industry'}")
+
+        frame = pd.DataFrame({
+            'industry': df[industry_col].astype(str).to_numpy(),
+            'job_title': df[title_col].astype(str).to_numpy(),
+            **{field: pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+               for field, col in columns.items()},
+        })
+
+        # (industry, title) careers plus one all-industries career per title
+        careers = self._summarize(frame.groupby(['industry', 'job_title'], sort=True))
+        overall = self._summarize(frame.groupby('job_title', sort=True))
+        overall.insert(0, 'industry', ALL)
+        self.careers = pd.concat([careers, overall], ignore_index=True)
+
+        self._metrics = self.careers[list(OBJECTIVES)].to_numpy(dtype=np.float64)
+        self._titles = self.careers['job_title'].to_numpy(dtype=object)
+        self._industries = self.careers['industry'].to_numpy(dtype=object)
+        self._rows = {
+            (industry.lower(), title.lower()): i
+            for i, (industry, title) in enumerate(zip(self._industries, self._titles))
+        }
+        self.industries = sorted(i for i in set(self._industries) if i != ALL)
+        self._canonical_industry = {i.lower(): i for i in self.industries}
+
+        # Industry -> row numbers of its careers with complete metrics, and of its skyline
+        self._scope_rows: Dict[str, np.ndarray] = {}
+        self.skylines: Dict[str, np.ndarray] = {}
+        for industry, rows in self.careers.groupby('industry').indices.items():
+            if industry == ALL:
+                continue
+            valid = rows[~np.isnan(self._metrics[rows]).any(axis=1)]
+            self._scope_rows[industry] = valid
+            self.skylines[industry] = valid[skyline_mask(self._metrics[valid])]
+        self._scope_rows[ALL] = (np.concatenate(list(self._scope_rows.values()))
+                                 if self._scope_rows else np.empty(0, dtype=np.intp))
+        # The cross-industry skyline ranges over every (industry, title) career
+        # (the all-industries summaries only stand in for a current job whose
+        # industry is unknown). A career dominated within its industry is
+        # dominated overall, so only the industry skylines need comparing.
+        union = np.concatenate(list(self.skylines.values())) if self.skylines else np.empty(0, dtype=np.intp)
+        self.skylines[ALL] = union[skyline_mask(self._metrics[union])]
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def _summarize(groups) -> pd.DataFrame:
+        summary = groups.agg(
+            automation_risk=('automation_risk', 'mean'),
+            median_salary=('median_salary', 'median'),
+            experience_required=('experience_required', 'mean'),
+            openings_2024=('openings_2024', 'sum'),
+            openings_2030=('openings_2030', 'sum'),
+            rows=('automation_risk', 'size'),
+        ).reset_index()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = (summary['openings_2030'] - summary['openings_2024']) / summary['openings_2024'] * 100
+        summary['growth_projection'] = growth.where(summary['openings_2024'] > 0)
+        return summary.drop(columns=['openings_2024', 'openings_2030'])
+
+    def _career(self, row: int) -> Dict[str, Any]:
+        career = {'job_title': self._titles[row], 'industry': self._industries[row]}
+        for field, value in zip(OBJECTIVES, self._metrics[row]):
+            career[field] = round(float(value), 2)
+        return career
+
+    def current(self, job_title: str, industry: Optional[str] = None) -> Optional[int]:
+        """Row of a career; falls back to the all-industries summary of the title"""
+        title = job_title.strip().lower()
+        if industry:
+            row = self._rows.get((industry.strip().lower(), title))
+            if row is not None:
+                return row
+        return self._rows.get((ALL.lower(), title))
+
+    def alternatives(self, job_title: str, industry: Optional[str] = None,
+                     same_industry: bool = True, max_extra_experience: float = 0.0,
+                     min_salary: Optional[float] = None, limit: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        Pareto-better careers than the current one.
+
+        Args:
+            job_title: Current job title (case-insensitive)
+            industry: Current industry; selects the (industry, title) summary
+            same_industry: Only suggest careers in that industry
+            max_extra_experience: Years of experience an alternative may require
+                beyond the current job (0 = no more than now)
+            min_salary: Minimum median salary of an alternative
+            limit: Maximum alternatives returned, lowest automation risk first
+
+        Returns:
+            {'current': career, 'scope', 'candidates', 'skyline_size',
+            'alternatives': [career + deltas]}, or None if the job title is unknown
+
+        Raises:
+            ValueError: same_industry with an industry not in the dataset
+        """
+        row = self.current(job_title, industry)
+        if row is None:
+            return None
+        current = self._metrics[row]
+
+        scope = ALL
+        if same_industry and industry:
+            scope = self._canonical_industry.get(industry.strip().lower())
+            if scope is None:
+                raise ValueError(f"Unknown industry: {industry} (expected one of {self.industries})")
+        candidates = self._scope_rows.get(scope, np.empty(0, dtype=np.intp))
+        metrics = self._metrics[candidates]
+
+        risk, growth, salary, experience = (metrics[:, i] for i in range(len(OBJECTIVES)))
+        keep = ((risk <= current[0]) & (growth >= current[1]) & (salary >= current[2]) &
+                (experience <= current[3] + max(0.0, max_extra_experience)))
+        # Strictly better somewhere (extra experience doesn't count as better)
+        keep &= (risk < current[0]) | (growth > current[1]) | (salary > current[2]) | (experience < current[3])
+        if min_salary is not None:
+            keep &= salary >= min_salary
+        # Same title (this row or another industry) isn't a career switch
+        keep &= self._titles[candidates] != self._titles[row]
+
+        # Skyline of the constrained set, never the other way around (see module docstring)
+        eligible = candidates[keep]
+        frontier = eligible[skyline_mask(self._metrics[eligible])]
+        chosen = frontier[np.lexsort((-self._metrics[frontier, 2], self._metrics[frontier, 0]))][:limit]
+
+        alternatives = []
+        for alt in chosen:
+            career = self._career(alt)
+            career['deltas'] = {
+                field: round(float(self._metrics[alt, i] - current[i]), 2)
+                for i, field in enumerate(OBJECTIVES)
+            }
+            alternatives.append(career)
+        return {
+            'current': self._career(row),
+            'scope': scope,
+            'candidates': int(len(eligible)),
+            'skyline_size': int(len(frontier)),
+            'alternatives': alternatives,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'careers': len(self.careers),
+            'skyline_sizes': {industry: int(len(rows)) for industry, rows in self.skylines.items()},
+            'build_ms': round(self.build_ms, 1),
+        }
@@ -0,0 +1,210 @@
+"""
+Pre-aggregated industry x location x AI-impact cube for the job market dataset.
+
+Built once when the dataset loads: a single groupby over the three dimensions
+yields the row positions of every fine-grained cell, and every roll-up ('*'
+for "all values") is materialized from those positions. Summary and
+drill-down requests are then dictionary lookups with no pandas work.
+"""
+
+import time
+from itertools import product
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ('industry', 'location', 'ai_impact_level')
+ALL = '*'
+
+# Cube field -> candidate dataset columns (current Kaggle names first)
+COLUMNS = {
+    'job_title': ('Job Title', 'Job_Title'),
+    'industry': ('Industry',),
+    'location': ('Location',),
+    'ai_impact_level': ('AI Impact Level', 'AI_Impact_Level'),
+    'automation_risk': ('Automation Risk (%)', 'AI_Automation_Risk'),
+    'median_salary': ('Median Salary (USD)', 'Average_Salary_2024'),
+    'openings_2024': ('Job Openings (2024)', 'Job_Openings_2024'),
+    'openings_2030': ('Projected Openings (2030)', 'Projected_Openings_2030'),
+}
+
+QUANTILES = (0.25, 0.5, 0.75, 0.9)
+
+CellKey = Tuple[str, str, str]
+
+
+def _column(df: pd.DataFrame, field: str) -> Optional[str]:
+    for name in COLUMNS[field]:
+        if name in df.columns:
+            return name
+    return None
+
+
+def _numeric(df: pd.DataFrame, field: str) -> Optional[np.ndarray]:
+    name = _column(df, field)
+    if name is None:
+        return None
+    return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _round(value: float, digits: int = 2) -> Optional[float]:
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+
+class JobMarketCube:
+    """Materialized aggregates over industry, location and AI impact level"""
+
+    def __init__(self, df: pd.DataFrame, top_k: int = 5):
+        """
+        Build every cell and roll-up of the cube.
+
+        Args:
+            df: Job market DataFrame (current or legacy column names)
+            top_k: Number of highest/lowest risk jobs kept per cell
+        """
+        start = time.perf_counter()
+        self.top_k = top_k
+        self.total_rows = len(df)
+
+        title_col = _column(df, 'job_title')
+        self._titles = df[title_col].astype(str).to_numpy() if title_col else np.array(['Unknown'] * len(df))
+        self._risk = _numeric(df, 'automation_risk')
+        self._salary = _numeric(df, 'median_salary')
+        openings_2024 = _numeric(df, 'openings_2024')
+        openings_2030 = _numeric(df, 'openings_2030')
+        self._growth = None
+        if openings_2024 is not None and openings_2030 is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                growth = (openings_2030 - openings_2024) / openings_2024 * 100
+            self._growth = np.where(openings_2024 > 0, growth, np.nan)
+
+        keys = pd.DataFrame({
+            dim: (df[_column(df, dim)].astype(str) if _column(df, dim) else 'Unknown')
+            for dim in DIMENSIONS
+        }, index=df.index)
+
+        # The one groupby pass: row positions for each fine-grained cell
+        fine_cells: Dict[CellKey, np.ndarray] = {
+            tuple(str(k) for k in key): positions
+            for key, positions in keys.groupby(list(DIMENSIONS), sort=True).indices.items()
+        }
+
+        self.dimension_values: Dict[str, List[str]] = {
+            dim: sorted({key[i] for key in fine_cells}) for i, dim in enumerate(DIMENSIONS)
+        }
+        self._canonical = {
+            dim: {value.lower(): value for value in values}
+            for dim, values in self.dimension_values.items()
+        }
+
+        # Roll up every fine cell into its 8 grouping sets ('*' = all values)
+        grouped: Dict[CellKey, List[np.ndarray]] = {}
+        for key, positions in fine_cells.items():
+            for mask in product((False, True), repeat=len(DIMENSIONS)):
+                rolled = tuple(ALL if rolled_up else value for value, rolled_up in zip(key, mask))
+                grouped.setdefault(rolled, []).append(positions)
+
+        self.cells: Dict[CellKey, Dict[str, Any]] = {
+            key: self._aggregate(key, np.concatenate(parts))
+            for key, parts in grouped.items()
+        }
+        self._summary = self._build_summary()
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    def _top_jobs(self, positions: np.ndarray, highest: bool) -> List[Dict[str, Any]]:
+        """Distinct job titles with the highest (or lowest) automation risk"""
+        risk = self._risk[positions]
+        valid = positions[~np.isnan(risk)]
+        if len(valid) == 0:
+            return []
+        order = np.argsort(self._risk[valid], kind='stable')
+        if highest:
+            order = order[::-1]
+        jobs, seen = [], set()
+        for position in valid[order]:
+            title = self._titles[position]
+            if title in seen:
+                continue
+            seen.add(title)
+            jobs.append({'job_title': title, 'automation_risk': _round(self._risk[position])})
+            if len(jobs) == self.top_k:
+                break
+        return jobs
+
+    def _aggregate(self, key: CellKey, positions: np.ndarray) -> Dict[str, Any]:
+        cell: Dict[str, Any] = dict(zip(DIMENSIONS, key))
+        cell['count'] = int(len(positions))
+        cell['distinct_jobs'] = int(len(np.unique(self._titles[positions])))
+
+        if self._risk is not None:
+            risk = self._risk[positions]
+            risk = risk[~np.isnan(risk)]
+            cell['avg_automation_risk'] = _round(risk.mean()) if len(risk) else None
+            cell['automation_risk_quantiles'] = {
+                f"p{int(q * 100)}": _round(v) for q, v in zip(QUANTILES, np.quantile(risk, QUANTILES))
+            } if len(risk) else {}
+            cell['highest_risk_jobs'] = self._top_jobs(positions, highest=True)
+            cell['lowest_risk_jobs'] = self._top_jobs(positions, highest=False)
+        for field, values in (('avg_median_salary', self._salary), ('avg_growth_projection', self._growth)):
+            if values is not None:
+                selected = values[positions]
+                selected = selected[~np.isnan(selected)]
+                cell[field] = _round(selected.mean()) if len(selected) else None
+        return cell
+
+    def _normalize(self, dim: str, value: Optional[str]) -> Optional[str]:
+        """Map a user-supplied value to its canonical spelling; None if unknown"""
+        if value is None or value == '' or value == ALL:
+            return ALL
+        return self._canonical[dim].get(str(value).strip().lower())
+
+    def cell(self, industry: Optional[str] = None, location: Optional[str] = None,
+             ai_impact_level: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up one cell; omitted dimensions are rolled up.
+
+        Returns:
+            Aggregate dict, or None if a value is unknown or the cell is empty
+        """
+        key = tuple(self._normalize(dim, value) for dim, value in
+                    zip(DIMENSIONS, (industry, location, ai_impact_level)))
+        if None in key:
+            return None
+        return self.cells.get(key)
+
+    def breakdown(self, by: str, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """Child cells along one dimension, with the other dimensions filtered"""
+        if by not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension: {by} (expected one of {DIMENSIONS})")
+        fixed = {dim: self._normalize(dim, filters.get(dim)) for dim in DIMENSIONS if dim != by}
+        if None in fixed.values():
+            return []
+        children = []
+        for value in self.dimension_values[by]:
+            key = tuple(value if dim == by else fixed[dim] for dim in DIMENSIONS)
+            if key in self.cells:
+                children.append(self.cells[key])
+        return children
+
+    def summary(self) -> Dict[str, Any]:
+        """Whole-dataset aggregates in the /api/dataset/summary format"""
+        return self._summary
+
+    def _build_summary(self) -> Dict[str, Any]:
+        total = self.cells.get((ALL, ALL, ALL), {})
+        return {
+            'total_jobs': self.total_rows,
+            'distinct_jobs': total.get('distinct_jobs', 0),
+            'industries': len(self.dimension_values['industry']),
+            'locations': len(self.dimension_values['location']),
+            'avg_automation_risk': total.get('avg_automation_risk') or 0,
+            'automation_risk_quantiles': total.get('automation_risk_quantiles', {}),
+            'avg_median_salary': total.get('avg_median_salary'),
+            'avg_growth_projection': total.get('avg_growth_projection'),
+            'highest_risk_jobs': total.get('highest_risk_jobs', []),
+            'lowest_risk_jobs': total.get('lowest_risk_jobs', []),
+            'by_industry': self.breakdown('industry'),
+            'by_ai_impact_level': self.breakdown('ai_impact_level'),
+            'dimensions': self.dimension_values,
+        }
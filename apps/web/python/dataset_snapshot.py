@@ -0,0 +1,209 @@
+"""
+Versioned dataset snapshots with zero-downtime reload.
+
+Everything derived from the dataset (loader, aggregate cube, fuzzy/alias/spell
+structures, embedding index) is bundled into one immutable DatasetSnapshot.
+Requests read `manager.current()` once and use that snapshot to the end, while
+a reload builds the next snapshot on a background thread and publishes it with
+a single reference assignment. In-flight requests finish on the old snapshot.
+
+An optional warm-up hook runs against each new snapshot before it is
+published (and once against the initial snapshot, in the background);
+`ready()` stays False until the live snapshot has been warmed.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from kaggle_data_loader import JobMarketDataLoader
+from hybrid_job_search import HybridJobSearch
+from related_jobs import RelatedJobs, load_related_jobs
+
+
+def file_fingerprint(path: str) -> str:
+    """Short content hash of a file, stable across processes and replicas"""
+    digest = hashlib.sha1()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    except OSError:
+        return 'unknown'
+    return digest.hexdigest()[:12]
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """One consistent generation of the dataset and every index built from it"""
+    version: int
+    fingerprint: str
+    data_loader: JobMarketDataLoader
+    hybrid_search: HybridJobSearch
+    loaded_at: float = field(default_factory=time.time)
+    build_seconds: float = 0.0
+    # Everything a cached response depends on besides its inputs: the dataset,
+    # the embedding index (incl. any PCA) and the search mode
+    etag_version: str = ''
+    # Neighbor lists over the same embeddings file (None without embeddings)
+    related_jobs: Optional[RelatedJobs] = None
+
+
+class SnapshotManager:
+    """Owns the current snapshot and rebuilds it off the request path"""
+
+    def __init__(self, search_mode: str = 'cascade'):
+        """
+        Build the initial snapshot synchronously.
+
+        Args:
+            search_mode: Default HybridJobSearch mode for every snapshot
+        """
+        self.search_mode = search_mode
+        self._reload_lock = threading.Lock()
+        self._reloading = False
+        self._last_error: Optional[str] = None
+        self._watch_thread: Optional[threading.Thread] = None
+        self._warm_up: Optional[Callable[['DatasetSnapshot'], Any]] = None
+        self._warmed_version = 0  # Highest snapshot version warmed so far
+        self._warm_lock = threading.Lock()
+        self._current = self._build(version=1, force_refresh=False)
+
+    def current(self) -> DatasetSnapshot:
+        """The live snapshot; a plain attribute read, so always a whole snapshot"""
+        return self._current
+
+    def set_warm_up(self, warm_up: Callable[[DatasetSnapshot], Any], background: bool = True):
+        """
+        Install the warm-up hook and warm the live snapshot with it.
+
+        Args:
+            warm_up: warm_up(snapshot), called before each reload is published
+            background: Warm the live snapshot on a thread instead of blocking
+        """
+        self._warm_up = warm_up
+        if background:
+            threading.Thread(target=self._warm, args=(self._current,),
+                             name='dataset-warm-up', daemon=True).start()
+        else:
+            self._warm(self._current)
+
+    def _warm(self, snapshot: DatasetSnapshot):
+        """
+        Run the warm-up hook; a failing warm-up leaves the caches cold, not the snapshot unusable.
+
+        Warm-ups can overlap (the startup one on a thread while a reload warms
+        the next snapshot), so the warmed version only ever moves forward: a
+        slow warm-up of an old snapshot can't undo a newer one.
+        """
+        if self._warm_up is not None:
+            try:
+                self._warm_up(snapshot)
+            except Exception as e:
+                print(f"⚠ Warm-up of snapshot v{snapshot.version} failed: {e}")
+        with self._warm_lock:
+            self._warmed_version = max(self._warmed_version, snapshot.version)
+
+    def ready(self) -> bool:
+        """True once the live snapshot (or a newer one) has been warmed (always, without a hook)"""
+        return self._warm_up is None or self._warmed_version >= self._current.version
+
+    def _build(self, version: int, force_refresh: bool) -> DatasetSnapshot:
+        start = time.time()
+        loader = JobMarketDataLoader()
+        loader.load_dataset(force_refresh=force_refresh)
+        search = HybridJobSearch(loader, mode=self.search_mode)
+        fingerprint = file_fingerprint(loader.cache_file)
+        search_config = hashlib.sha1(
+            f"{self.search_mode}:{file_fingerprint(search.embeddings_file)}".encode()
+        ).hexdigest()[:8]
+        return DatasetSnapshot(
+            version=version,
+            fingerprint=fingerprint,
+            etag_version=f"{fingerprint}-{search_config}",
+            related_jobs=load_related_jobs(search.embeddings_file),
+            data_loader=loader,
+            hybrid_search=search,
+            build_seconds=round(time.time() - start, 3),
+        )
+
+    def _reload(self, force_refresh: bool):
+        try:
+            snapshot = self._build(self._current.version + 1, force_refresh)
+            self._warm(snapshot)  # Before the swap, so readiness never drops
+            self._current = snapshot  # Atomic publish
+            self._last_error = None
+            print(f"✓ Dataset snapshot v{snapshot.version} ({snapshot.fingerprint}) "
+                  f"live after {snapshot.build_seconds:.1f}s")
+        except Exception as e:
+            self._last_error = f"{type(e).__name__}: {e}"
+            print(f"⚠ Dataset reload failed, keeping v{self._current.version}: {e}")
+        finally:
+            with self._reload_lock:
+                self._reloading = False
+
+    def reload(self, force_refresh: bool = False, wait: bool = False) -> bool:
+        """
+        Build a new snapshot in the background and swap it in.
+
+        Args:
+            force_refresh: Re-download the dataset instead of reading the cache
+            wait: Block until the new snapshot is live (or the build failed)
+
+        Returns:
+            False if a reload was already running, True otherwise
+        """
+        with self._reload_lock:
+            if self._reloading:
+                return False
+            self._reloading = True
+        thread = threading.Thread(target=self._reload, args=(force_refresh,),
+                                  name='dataset-reload', daemon=True)
+        thread.start()
+        if wait:
+            thread.join()
+        return True
+
+    def watch(self, interval: float = 30.0):
+        """Poll the dataset cache file and reload when it changes"""
+        if self._watch_thread is not None:
+            return
+
+        def signature():
+            try:
+                stat = os.stat(self._current.data_loader.cache_file)
+                return stat.st_mtime_ns, stat.st_size
+            except OSError:
+                return None
+
+        def poll():
+            last = signature()
+            while True:
+                time.sleep(interval)
+                seen = signature()
+                if seen is not None and seen != last:
+                    print("Dataset cache changed on disk, reloading...")
+                    if self.reload():
+                        last = seen
+
+        self._watch_thread = threading.Thread(target=poll, name='dataset-watch', daemon=True)
+        self._watch_thread.start()
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self._current
+        return {
+            'version': snapshot.version,
+            'fingerprint': snapshot.fingerprint,
+            'loaded_at': snapshot.loaded_at,
+            'build_seconds': snapshot.build_seconds,
+            'rows': len(snapshot.data_loader.df),
+            'memory_bytes': snapshot.data_loader.memory_report()['total_bytes_after'],
+            'reloading': self._reloading,
+            'watching': self._watch_thread is not None,
+            'warmed_version': self._warmed_version,
+            'ready': self.ready(),
+            'last_error': self._last_error,
+        }
@@ -0,0 +1,141 @@
+"""
+Bitmap indexes over the industry, location and AI impact facets.
+
+One boolean row mask per facet value, plus a per-title mask for single-facet
+filters, is built when the dataset loads. A filtered search ANDs the row masks
+and projects them onto job titles, so fuzzy and vector retrieval only score
+titles that actually have a row matching every filter.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from dataset_aggregates import COLUMNS, DIMENSIONS
+
+
+def _first_column(df: pd.DataFrame, field: str) -> Optional[str]:
+    for name in COLUMNS[field]:
+        if name in df.columns:
+            return name
+    return None
+
+
+class FacetIndex:
+    """Boolean row and title masks for each industry, location and AI impact level"""
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Build every facet mask.
+
+        Args:
+            df: Job market DataFrame (current or legacy column names)
+        """
+        start = time.perf_counter()
+        self.rows = len(df)
+
+        title_col = _first_column(df, 'job_title')
+        titles = df[title_col].astype(str) if title_col else pd.Series(['Unknown'] * len(df))
+        # Title order matches df['Job Title'].unique(), which HybridJobSearch indexes by
+        title_codes, title_uniques = pd.factorize(titles, sort=False)
+        self.job_titles: List[str] = [str(t) for t in title_uniques]
+        self.title_codes = title_codes
+
+        # Lowercased title -> row positions, replacing per-request column scans
+        self._title_rows: Dict[str, np.ndarray] = {}
+        for code, positions in pd.Series(title_codes).groupby(title_codes).indices.items():
+            self._title_rows.setdefault(self.job_titles[code].lower(), positions)
+
+        self.row_masks: Dict[str, Dict[str, np.ndarray]] = {}
+        self.title_masks: Dict[str, Dict[str, np.ndarray]] = {}
+        self._canonical: Dict[str, Dict[str, str]] = {}
+        for dim in DIMENSIONS:
+            col = _first_column(df, dim)
+            if col is None:
+                continue
+            codes, uniques = pd.factorize(df[col].astype(str), sort=True)
+            self.row_masks[dim] = {}
+            self.title_masks[dim] = {}
+            for code, value in enumerate(uniques):
+                row_mask = codes == code
+                self.row_masks[dim][str(value)] = row_mask
+                self.title_masks[dim][str(value)] = self.titles_in(row_mask)
+            self._canonical[dim] = {value.lower(): value for value in self.row_masks[dim]}
+
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    def values(self, dim: str) -> List[str]:
+        """Known values of one facet"""
+        return list(self.row_masks.get(dim, {}))
+
+    def _active(self, filters: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
+        """Non-empty filters mapped to canonical values (None for unknown values)"""
+        active = {}
+        for dim, value in filters.items():
+            if dim not in DIMENSIONS:
+                raise ValueError(f"Unknown facet: {dim} (expected one of {DIMENSIONS})")
+            if value is None or str(value).strip() == '':
+                continue
+            active[dim] = self._canonical.get(dim, {}).get(str(value).strip().lower())
+        return active
+
+    def row_mask(self, **filters: Optional[str]) -> Optional[np.ndarray]:
+        """
+        AND the masks of every given facet value.
+
+        Returns:
+            Boolean array over rows, or None when no filter is set. An unknown
+            value yields an all-False mask. Treat the result as read-only: a
+            single filter returns the stored mask itself.
+        """
+        active = self._active(filters)
+        if not active:
+            return None
+        if None in active.values():
+            return np.zeros(self.rows, dtype=bool)
+        masks = [self.row_masks[dim][value] for dim, value in active.items()]
+        if len(masks) == 1:
+            return masks[0]
+        return np.logical_and.reduce(masks)
+
+    def title_mask(self, **filters: Optional[str]) -> Optional[np.ndarray]:
+        """
+        Titles with at least one row passing every filter.
+
+        Returns:
+            Boolean array aligned with job_titles, or None when no filter is set
+        """
+        active = self._active(filters)
+        if len(active) == 1:
+            dim, value = next(iter(active.items()))
+            if value is None:
+                return np.zeros(len(self.job_titles), dtype=bool)
+            return self.title_masks[dim][value]
+        mask = self.row_mask(**filters)
+        return None if mask is None else self.titles_in(mask)
+
+    def titles_in(self, row_mask: np.ndarray) -> np.ndarray:
+        """Project a row mask onto job titles"""
+        mask = np.zeros(len(self.job_titles), dtype=bool)
+        mask[self.title_codes[row_mask]] = True
+        return mask
+
+    def title_rows(self, job_title: str, row_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Row positions of a title (case-insensitive), optionally restricted to a row mask"""
+        positions = self._title_rows.get(job_title.lower(), np.empty(0, dtype=np.intp))
+        if row_mask is not None:
+            positions = positions[row_mask[positions]]
+        return positions
+
+    def stats(self) -> Dict[str, float]:
+        """Mask counts, memory and build cost"""
+        masks = [m for by_value in (*self.row_masks.values(), *self.title_masks.values())
+                 for m in by_value.values()]
+        return {
+            'facets': {dim: len(values) for dim, values in self.row_masks.items()},
+            'masks': len(masks),
+            'memory_kb': round(sum(m.nbytes for m in masks) / 1024, 1),
+            'build_ms': round(self.build_ms, 1),
+        }
@@ -0,0 +1,358 @@
+"""
+Durable background queue for premium fortune generation.
+
+Jobs live in a local SQLite database, so a slow LLM call no longer holds the
+HTTP request open and a client that disconnects can poll for the result
+later. A small pool of worker threads (LLM calls are network-bound) claims
+queued jobs, retries failures with exponential backoff and jitter, and
+optionally POSTs the outcome to a webhook.
+
+Webhook URLs must be http(s) and either resolve only to public addresses or
+name a host on the configured allowlist. This is checked at submit and again
+before sending. The delivery connects to the address that was checked (no
+second lookup a rebinding DNS server could answer differently), and redirects
+are not followed. With a secret configured, each delivery carries
+X-Fortune-Timestamp and X-Fortune-Signature: sha256=HMAC(secret, "<ts>.<body>").
+
+Every job has an idempotency key (derived from the wallet address); submitting
+the same key again returns the existing job instead of paying for another
+generation. Only a job that failed every attempt can be resubmitted.
+
+A claimed job holds a lease; if its process dies, the job is claimed again
+once the lease runs out (counting as an attempt). Claims are single-row
+conditional updates, so several processes can share the database file.
+"""
+
+import hashlib
+import hmac
+import http.client
+import ipaddress
+import json
+import logging
+import os
+import random
+import socket
+import sqlite3
+import ssl
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+JOB_STATES = ('queued', 'running', 'succeeded', 'failed')
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    webhook_url TEXT,
+    webhook_status TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after);
+"""
+
+
+def _webhook_address(url: str, allowed_hosts: Iterable[str] = ()) -> Tuple[Optional[str], Optional[str]]:
+    """(reason the URL is refused, None) or (None, the checked address to connect to)"""
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        return 'webhook_url must be an http(s) URL', None
+    allowed_hosts = set(allowed_hosts)
+    if allowed_hosts and parsed.hostname.lower() not in allowed_hosts:
+        return f"webhook host {parsed.hostname} is not allowed", None
+    try:
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        addresses = [info[4][0] for info in socket.getaddrinfo(parsed.hostname, port, type=socket.SOCK_STREAM)]
+    except (socket.gaierror, UnicodeError, ValueError):
+        return f"webhook host {parsed.hostname} does not resolve", None
+    if not allowed_hosts:
+        for address in addresses:
+            if not ipaddress.ip_address(address.split('%')[0]).is_global:
+                return f"webhook host {parsed.hostname} resolves to a non-public address", None
+    return None, addresses[0]
+
+
+def check_webhook_url(url: str, allowed_hosts: Iterable[str] = ()) -> Optional[str]:
+    """
+    Why a webhook URL may not be called, or None if it may.
+
+    Args:
+        url: Candidate webhook URL
+        allowed_hosts: If given, the only host names accepted; these are trusted
+            configuration, so they skip the public-address check (e.g. an internal receiver)
+    """
+    return _webhook_address(url, allowed_hosts)[0]
+
+
+def _post_pinned(url: str, address: str, body: bytes, headers: Dict[str, str], timeout: float) -> int:
+    """
+    POST to url over a connection to address (already checked), without
+    resolving the host again. Host header, SNI and certificate checks still use
+    the URL's host name. Redirects are not followed. Returns the HTTP status.
+    """
+    parsed = urlparse(url)
+    https = parsed.scheme == 'https'
+    port = parsed.port or (443 if https else 80)
+    sock = socket.create_connection((address, port), timeout)
+    if https:
+        sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parsed.hostname)
+    connection = (http.client.HTTPSConnection if https else http.client.HTTPConnection)(
+        parsed.hostname, port, timeout=timeout)
+    connection.sock = sock  # Already connected: http.client won't look the host up
+    try:
+        path = (parsed.path or '/') + (f'?{parsed.query}' if parsed.query else '')
+        connection.request('POST', path, body=body, headers=headers)
+        status = connection.getresponse().status
+    finally:
+        connection.close()
+    if status >= 400:
+        raise OSError(f"HTTP {status}")
+    return status
+
+
+class FortuneJobQueue:
+    """SQLite-backed job queue with a worker pool, retries and webhooks"""
+
+    def __init__(self, db_path: str, handler: Callable[[Dict[str, Any], bool], Dict[str, Any]],
+                 workers: int = 2, max_attempts: int = 3, backoff_base: float = 2.0,
+                 backoff_max: float = 60.0, poll_interval: float = 1.0,
+                 lease: float = 600.0, webhook_timeout: float = 5.0,
+                 webhook_secret: Optional[str] = None, webhook_hosts: Iterable[str] = ()):
+        """
+        Args:
+            db_path: SQLite file (created if missing)
+            handler: handler(payload, last_attempt) -> result dict; raise to retry
+            workers: Worker threads, i.e. concurrent generations
+            max_attempts: Attempts before a job is marked failed
+            backoff_base: Seconds before the first retry; doubles per attempt
+            backoff_max: Upper bound on a retry delay
+            poll_interval: Seconds an idle worker sleeps between checks for due retries
+            lease: Seconds a running job may take before another worker reclaims it
+            webhook_timeout: Seconds to wait for a webhook endpoint
+            webhook_secret: HMAC key for the X-Fortune-Signature header (unsigned if None)
+            webhook_hosts: Host allowlist for webhook URLs (any public host if empty)
+        """
+        self.db_path = db_path
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.webhook_timeout = webhook_timeout
+        self.webhook_secret = webhook_secret
+        self.webhook_hosts = {host.lower() for host in webhook_hosts}
+        self._expired: List[Tuple[str, str]] = []  # (job id, webhook) failed by _claim, to notify
+        # One connection shared by every thread; sqlite3 calls are serialized by the lock
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        self._threads = []
+        self._stopping = False
+        self.generated = 0
+        self.retried = 0
+        self.deduplicated = 0
+
+    def start(self):
+        """Start the worker threads"""
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'fortune-job-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Let workers finish their current job and exit"""
+        with self._wake:
+            self._stopping = True
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, payload: Dict[str, Any], idempotency_key: str,
+               webhook_url: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue a generation unless one with this idempotency key exists.
+
+        Returns:
+            (job, created): created is False when an existing job was returned
+        """
+        now = time.time()
+        with self._wake:
+            row = self._db.execute('SELECT * FROM jobs WHERE idempotency_key = ?', (idempotency_key,)).fetchone()
+            if row is not None and row['status'] != 'failed':
+                self.deduplicated += 1
+                return self._view(row), False
+            if row is not None:
+                # Every attempt failed: the caller may try again under the same key
+                self._db.execute(
+                    "UPDATE jobs SET status = 'queued', payload = ?, error = NULL, attempts = 0, "
+                    "run_after = ?, webhook_url = ?, webhook_status = NULL, updated_at = ? WHERE id = ?",
+                    (json.dumps(payload), now, webhook_url, now, row['id']))
+                job_id = row['id']
+            else:
+                job_id = uuid.uuid4().hex
+                self._db.execute(
+                    "INSERT INTO jobs (id, idempotency_key, status, payload, max_attempts, run_after, "
+                    "webhook_url, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?)",
+                    (job_id, idempotency_key, json.dumps(payload), self.max_attempts, now,
+                     webhook_url, now, now))
+            self._wake.notify()
+            return self._view(self._get(job_id)), True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Public view of a job, or None"""
+        with self._lock:
+            row = self._get(job_id)
+        return None if row is None else self._view(row)
+
+    def _get(self, job_id: str) -> Optional[sqlite3.Row]:
+        return self._db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+
+    @staticmethod
+    def _view(row: sqlite3.Row) -> Dict[str, Any]:
+        job = {
+            'job_id': row['id'],
+            'status': row['status'],
+            'attempts': row['attempts'],
+            'max_attempts': row['max_attempts'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+        if row['status'] == 'queued' and row['attempts']:
+            job['retry_at'] = row['run_after']
+        if row['result'] is not None:
+            job['result'] = json.loads(row['result'])
+        if row['error'] is not None:
+            job['error'] = row['error']
+        if row['webhook_url']:
+            job['webhook_status'] = row['webhook_status'] or 'pending'
+        return job
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Lease the oldest due job (queued, or running past its lease); caller holds the lock"""
+        now = time.time()
+        while True:
+            row = self._db.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') AND run_after <= ? "
+                "ORDER BY run_after LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+            if row['status'] == 'running':
+                log.warning("Premium fortune job %s outlived its lease (attempt %d)", row['id'], row['attempts'])
+                if row['attempts'] >= row['max_attempts']:
+                    failed = self._db.execute(
+                        "UPDATE jobs SET status = 'failed', error = 'Worker lease expired', "
+                        "updated_at = ? WHERE id = ? AND status = 'running' AND attempts = ?",
+                        (now, row['id'], row['attempts'])).rowcount
+                    if failed and row['webhook_url']:
+                        self._expired.append((row['id'], row['webhook_url']))
+                    continue
+            # Conditional update: another process may have claimed it since the SELECT
+            claimed = self._db.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, run_after = ?, "
+                "updated_at = ? WHERE id = ? AND status = ? AND run_after = ?",
+                (now + self.lease, now, row['id'], row['status'], row['run_after'])).rowcount
+            if claimed:
+                return self._get(row['id'])
+
+    def _work(self):
+        while True:
+            with self._wake:
+                row = None
+                while not self._stopping and (row := self._claim()) is None and not self._expired:
+                    self._wake.wait(self.poll_interval)
+                expired, self._expired = self._expired, []
+                if self._stopping:
+                    return
+            # Webhooks go out without the lock held
+            for job_id, url in expired:
+                self._notify(job_id, url)
+            if row is not None:
+                self._run(row)
+
+    def _run(self, row: sqlite3.Row):
+        last_attempt = row['attempts'] >= row['max_attempts']
+        # Writes only land while this worker still holds the lease: if it expired
+        # and another worker reclaimed the job, attempts has moved on
+        held = "WHERE id = ? AND status = 'running' AND attempts = ?"
+        try:
+            result = self.handler(json.loads(row['payload']), last_attempt)
+        except Exception as e:
+            now = time.time()
+            with self._lock:
+                if last_attempt:
+                    updated = self._db.execute(
+                        f"UPDATE jobs SET status = 'failed', error = ?, updated_at = ? {held}",
+                        (str(e), now, row['id'], row['attempts'])).rowcount
+                else:
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** (row['attempts'] - 1))
+                    delay *= random.uniform(0.5, 1.0)  # jitter so retries don't arrive together
+                    updated = self._db.execute(
+                        f"UPDATE jobs SET status = 'queued', error = ?, run_after = ?, updated_at = ? {held}",
+                        (str(e), now + delay, now, row['id'], row['attempts'])).rowcount
+                    self.retried += updated
+            log.warning("Premium fortune job %s attempt %d failed: %s", row['id'], row['attempts'], e)
+            if not last_attempt:
+                return
+        else:
+            with self._lock:
+                updated = self._db.execute(
+                    f"UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, updated_at = ? {held}",
+                    (json.dumps(result), time.time(), row['id'], row['attempts'])).rowcount
+                self.generated += updated
+        if not updated:
+            log.warning("Premium fortune job %s attempt %d lost its lease; result discarded",
+                        row['id'], row['attempts'])
+            return
+        if row['webhook_url']:
+            self._notify(row['id'], row['webhook_url'])
+
+    def _notify(self, job_id: str, url: str):
+        """POST the finished job to its webhook; delivery is attempted once"""
+        body = json.dumps(self.get(job_id)).encode()
+        headers = {'Content-Type': 'application/json'}
+        if self.webhook_secret:
+            timestamp = str(int(time.time()))
+            signature = hmac.new(self.webhook_secret.encode(), timestamp.encode() + b'.' + body,
+                                 hashlib.sha256).hexdigest()
+            headers.update({'X-Fortune-Timestamp': timestamp, 'X-Fortune-Signature': f'sha256={signature}'})
+        # Checked again here (DNS may have changed since the job was submitted),
+        # and the connection goes to the address that passed the check
+        refused, address = _webhook_address(url, self.webhook_hosts)
+        try:
+            if refused:
+                raise ValueError(refused)
+            status = f'delivered ({_post_pinned(url, address, body, headers, self.webhook_timeout)})'
+        except Exception as e:
+            status = f'failed ({e})'
+            log.warning("Webhook for premium fortune job %s failed: %s", job_id, e)
+        with self._lock:
+            self._db.execute('UPDATE jobs SET webhook_status = ? WHERE id = ?', (status, job_id))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._db.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+        return {
+            'workers': self.workers,
+            'jobs': {state: counts.get(state, 0) for state in JOB_STATES},
+            'generated': self.generated,
+            'retried': self.retried,
+            'deduplicated': self.deduplicated,
+        }
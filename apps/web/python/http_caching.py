@@ -0,0 +1,100 @@
+"""
+ETag and conditional-request support for dataset-derived endpoints.
+
+GET responses that depend only on the request inputs and the dataset snapshot
+get an ETag built from the snapshot's version tag plus a hash of those inputs. A
+request whose If-None-Match already carries that tag is answered with 304
+before the view runs, so neither the search nor the serialization happens.
+The tag also carries the application version (APP_VERSION, else a hash of
+this directory's Python source), so a deploy that changes aliases, ranking or
+response shape invalidates tags even when the dataset is unchanged. The tag is
+made of content hashes, so every replica serving the same code and files
+issues the same tags and a CDN can revalidate against any of them.
+"""
+
+import glob
+import hashlib
+import json
+import os
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from flask import Response, make_response, request
+
+# Seconds browsers/CDNs may reuse a response before revalidating with If-None-Match
+DEFAULT_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', '300'))
+
+
+def _source_version() -> str:
+    """Short hash of the API's Python source, for deploys that don't set APP_VERSION"""
+    digest = hashlib.sha1()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:8]
+
+
+# Code version in every tag: the same dataset served by new code is a new response
+APP_VERSION = os.environ.get('APP_VERSION') or _source_version()
+
+
+def make_etag(version: str, *parts: Any) -> str:
+    """
+    Build an (unquoted) ETag value.
+
+    Args:
+        version: Snapshot version tag (dataset and search index fingerprints)
+        parts: JSON-serializable request inputs that determine the response
+    """
+    digest = hashlib.sha1(json.dumps([APP_VERSION, parts], sort_keys=True, default=str).encode('utf-8'))
+    return f"{version}-{digest.hexdigest()[:16]}"
+
+
+def request_inputs() -> Any:
+    """Query string of the request"""
+    return sorted(request.args.items(multi=True))
+
+
+def conditional(version: Callable[[], str], key: Callable[[], Any] = request_inputs,
+                max_age: Optional[int] = None, public: bool = True):
+    """
+    Decorate a deterministic GET view with ETag, Cache-Control and If-None-Match handling.
+
+    Args:
+        version: Returns the version tag of the snapshot the view will render
+            (read it from the same per-request snapshot the view uses)
+        key: Returns the request inputs the response depends on
+        max_age: Cache-Control max-age in seconds (defaults to HTTP_CACHE_MAX_AGE).
+            0 sends no-cache, so clients always revalidate.
+        public: Allow shared caches (CDNs) to store the response
+
+    Other methods pass straight through: 304 is only defined for GET and HEAD.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+            etag = make_etag(version(), request.path, key())
+            seconds = DEFAULT_MAX_AGE if max_age is None else max_age
+
+            def add_headers(response: Response) -> Response:
+                response.set_etag(etag)
+                response.cache_control.public = public
+                response.cache_control.private = not public
+                if seconds > 0:
+                    response.cache_control.max_age = seconds
+                else:
+                    response.cache_control.no_cache = True
+                return response
+
+            if request.if_none_match.contains_weak(etag):
+                return add_headers(Response(status=304))
+
+            response = make_response(view(*args, **kwargs))
+            # Errors are never tagged; the next request must run the view again
+            if response.status_code == 200:
+                add_headers(response)
+            return response
+        return wrapper
+    return decorator
@@ -1,28 +1,89 @@
 """
 Hybrid job search using fuzzy matching + vector similarity.
+
+Two modes:
+- cascade: fuzzy first, vector search only if the best fuzzy score is low
+- fusion: both retrievers run concurrently and are merged with reciprocal-rank
+  (or score) fusion; the vector leg is abandoned when fuzzy is decisive
 """
 
+import logging
 import os
 import pickle
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from rapidfuzz import fuzz, process
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
+
+from facet_index import FacetIndex
+from job_aliases import AliasTable
+from log_config import stage
+from lru import LRUCache
+from response_fragments import SuggestionFragments
+from spell_correction import SymSpellIndex, tokenize, title_key
+
+SEARCH_MODES = ('cascade', 'fusion')
+
+log = logging.getLogger(__name__)
+
+# Shared by all instances; fuzzy scoring and the encoder/BLAS calls run in native
+# code, so the vector leg makes progress while the request thread does fuzzy.
+_retrieval_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('HYBRID_SEARCH_WORKERS', '4')),
+    thread_name_prefix='hybrid-search'
+)
 
 class HybridJobSearch:
-    def __init__(self, data_loader):
+    def __init__(self, data_loader, mode: str = 'cascade'):
         """
         Initialize hybrid search with fuzzy + vector capabilities.
         
         Args:
             data_loader: JobMarketDataLoader instance with the dataset
+            mode: Default search mode, 'cascade' or 'fusion'
         """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode} (expected one of {SEARCH_MODES})")
         self.data_loader = data_loader
-        self.job_titles = data_loader.df['Job Title'].unique().tolist()
+        self.mode = mode
+        # Facet bitmaps come with the loader; titles are indexed in the same order
+        self.facets = getattr(data_loader, 'facets', None) or FacetIndex(data_loader.df)
+        self.job_titles = self.facets.job_titles
+        self._title_array = np.array(self.job_titles, dtype=object)
+        self.title_index = {title: i for i, title in enumerate(self.job_titles)}
+        self._model_lock = threading.Lock()
+        
+        # Per-snapshot caches: a reload builds a new instance, so entries never go stale
+        self.query_embeddings = LRUCache(int(os.environ.get('QUERY_EMBEDDING_CACHE_SIZE', '4096')))
+        self.ranked = LRUCache(int(os.environ.get('SEARCH_RESULT_CACHE_SIZE', '4096')))
+        
+        # Static suggestion fields, serialized once per title
+        self.fragments = SuggestionFragments(data_loader.df, self.facets)
+        
+        # Curated + data-derived aliases resolve shorthand without any scan
+        self.aliases = AliasTable(self.job_titles)
+        print(f"✓ Compiled {len(self.aliases.aliases)} aliases "
+              f"({self.aliases.curated_count} curated, {self.aliases.derived_count} acronyms)")
+        
+        # Spelling correction over title tokens, plus an order-insensitive
+        # title lookup so a corrected query can hit a title directly
+        self.title_by_key = {title_key(title): title for title in self.job_titles}
+        self.title_by_lower = {title.lower(): title for title in self.job_titles}
+        self.spell_index = SymSpellIndex(
+            token for title in self.job_titles for token in tokenize(title)
+        )
+        spell_stats = self.spell_index.stats()
+        print(f"✓ Built spell index: {spell_stats['words']} words, "
+              f"{spell_stats['delete_entries']} deletes, {spell_stats['memory_kb']:.0f} KB "
+              f"in {spell_stats['build_ms']:.0f} ms")
         
         # Try to load precomputed embeddings
         embeddings_file = os.path.join(os.path.dirname(__file__), 'job_embeddings.pkl')
+        self.embeddings_file = embeddings_file
         self.embeddings = None
+        self.pca_components = None
         self.model = None
         
         if os.path.exists(embeddings_file):
@@ -30,10 +91,17 @@ class HybridJobSearch:
                 print("Loading precomputed job title embeddings...")
                 with open(embeddings_file, 'rb') as f:
                     data = pickle.load(f)
-                    self.embeddings = data['embeddings']
-                    # Verify the embeddings match our job titles
-                    if len(data['job_titles']) == len(self.job_titles):
-                        print(f"✓ Loaded {len(self.job_titles)} job embeddings")
+                    # Align rows by title: a reloaded dataset may list titles in a different order
+                    row_by_title = {title: i for i, title in enumerate(data['job_titles'])}
+                    if all(title in row_by_title for title in self.job_titles):
+                        embeddings = data['embeddings'][[row_by_title[t] for t in self.job_titles]]
+                        # Optional PCA from precompute_embeddings.py --pca-dim; queries get the same projection
+                        if data.get('pca') is not None:
+                            self.pca_components = data['pca']['components']
+                        # Unit rows, so a scan is one matrix-vector product
+                        self.embeddings = self._project(embeddings)
+                        print(f"✓ Loaded {len(self.job_titles)} job embeddings "
+                              f"({self.embeddings.shape[1]} dimensions)")
                     else:
                         print("⚠ Embeddings don't match current dataset, will use fuzzy-only")
                         self.embeddings = None
@@ -44,17 +112,25 @@ class HybridJobSearch:
             print("⚠ No precomputed embeddings found. Run precompute_embeddings.py")
             print("  Will use fuzzy matching only")
     
-    def fuzzy_search(self, query: str, top_k: int = 10) -> List[Tuple[str, float, str]]:
+    def fuzzy_search(self, query: str, top_k: int = 10,
+                     mask: Optional[np.ndarray] = None) -> List[Tuple[str, float, str]]:
         """
         Perform fuzzy string matching.
         
+        Args:
+            query: User's search query
+            top_k: Number of results to return
+            mask: Optional boolean array over job_titles; only True titles are scored
+        
         Returns:
             List of (job_title, confidence_score, method) tuples
         """
+        choices = self.job_titles if mask is None else self._title_array[mask].tolist()
+        
         # Use token_sort_ratio for better handling of word order
         matches = process.extract(
             query,
-            self.job_titles,
+            choices,
             scorer=fuzz.token_sort_ratio,
             limit=top_k
         )
@@ -63,57 +139,323 @@ class HybridJobSearch:
         results = [(match[0], match[1], 'fuzzy') for match in matches]
         return results
     
-    def vector_search(self, query: str, top_k: int = 10) -> List[Tuple[str, float, str]]:
+    def vector_search(self, query: str, top_k: int = 10,
+                      cancel: Optional[threading.Event] = None,
+                      mask: Optional[np.ndarray] = None) -> List[Tuple[str, float, str]]:
         """
         Perform vector similarity search.
         
+        Args:
+            query: User's search query
+            top_k: Number of results to return
+            cancel: Optional event; when set, the search stops at the next stage
+            mask: Optional boolean array over job_titles; only True titles are scored
+        
         Returns:
             List of (job_title, confidence_score, method) tuples
         """
         if self.embeddings is None:
             return []
         
-        # Load model if not already loaded
-        if self.model is None:
-            print("Loading sentence transformer model...")
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self._load_model()
         
-        # Encode query
-        query_embedding = self.model.encode([query])[0]
+        if cancel is not None and cancel.is_set():
+            return []
         
-        # Compute cosine similarities
-        similarities = np.dot(self.embeddings, query_embedding) / (
-            np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding)
-        )
+        # Encode query (repeat queries reuse the cached, projected vector)
+        query_embedding = self.query_embeddings.get(query)
+        if query_embedding is None:
+            with stage('encode'):
+                query_embedding = self._project(self.model.encode([query])[0])
+            self.query_embeddings.put(query, query_embedding)
+        
+        if cancel is not None and cancel.is_set():
+            return []
+        
+        # Only score the titles passing the facet mask
+        candidates = np.arange(len(self.job_titles)) if mask is None else np.flatnonzero(mask)
+        embeddings = self.embeddings if mask is None else self.embeddings[candidates]
+        
+        # Cosine similarities (both sides are unit vectors)
+        similarities = embeddings @ query_embedding
         
         # Get top k indices
         top_indices = np.argsort(similarities)[::-1][:top_k]
         
         # Convert to our format: (job_title, confidence 0-100, method)
         results = [
-            (self.job_titles[idx], float(similarities[idx]) * 100, 'vector')
+            (self.job_titles[candidates[idx]], float(similarities[idx]) * 100, 'vector')
             for idx in top_indices
         ]
         
         return results
     
-    def hybrid_search(self, query: str, top_k: int = 10, fuzzy_threshold: float = 85.0) -> List[Dict]:
+    def _project(self, vectors: np.ndarray) -> np.ndarray:
+        """Model vectors -> index space (PCA if the index has one), L2-normalized"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.pca_components is not None:
+            vectors = vectors @ self.pca_components
+        return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+    
+    def _load_model(self):
+        """Load the sentence transformer on first use (the fusion pool may race here)"""
+        if self.model is None:
+            with self._model_lock:
+                if self.model is None:
+                    print("Loading sentence transformer model...")
+                    self.model = SentenceTransformer('all-MiniLM-L6-v2')
+    
+    def warm(self):
+        """Load the query model ahead of the first vector search (no-op without embeddings)"""
+        if self.embeddings is not None:
+            self._load_model()
+    
+    def resolve_titles(self, queries: List[str],
+                       fuzzy_threshold: float = 85.0) -> List[Optional[Tuple[str, float, str]]]:
+        """
+        Best dataset title for each of many queries (cascade mode, no filters).
+        
+        Verbatim titles, aliases, spelling correction and fuzzy matching run
+        per query; the queries left for vector search are encoded in one model
+        call and scored with one matrix multiply.
+        
+        Args:
+            queries: Raw job titles
+            fuzzy_threshold: Fuzzy score below which vector search is tried
+        
+        Returns:
+            (job_title, confidence, method) per query, None for blank queries
+        """
+        resolved: List[Optional[Tuple[str, float, str]]] = [None] * len(queries)
+        pending = []  # (position, query) left for vector search
+        for i, raw in enumerate(queries):
+            query = (raw or '').strip()
+            if len(query) < 2:
+                continue
+            # Verbatim titles first: title_key() is order-insensitive, so
+            # "Doctor, general practice" would otherwise become "General practice doctor"
+            exact_title = self.title_by_lower.get(query.lower())
+            if exact_title is not None:
+                resolved[i] = (exact_title, 100.0, 'exact')
+                continue
+            alias_titles, query = self.aliases.resolve(query)
+            if alias_titles:
+                resolved[i] = (alias_titles[0], 100.0, 'alias')
+                continue
+            corrected, changed = self.spell_index.correct(query)
+            exact_title = self.title_by_key.get(title_key(corrected))
+            if exact_title is not None:
+                confidence = 100.0 if not changed else fuzz.token_sort_ratio(query.lower(), exact_title.lower())
+                resolved[i] = (exact_title, confidence, 'spell' if changed else 'exact')
+                continue
+            if changed:
+                query = corrected
+            match = process.extractOne(query, self.job_titles, scorer=fuzz.token_sort_ratio)
+            if match is not None:
+                resolved[i] = (match[0], match[1], 'fuzzy')
+            if match is None or match[1] < fuzzy_threshold:
+                pending.append((i, query))
+        
+        if pending and self.embeddings is not None:
+            self._load_model()
+            query_embeddings = self._project(self.model.encode([q for _, q in pending]))
+            similarities = query_embeddings @ self.embeddings.T
+            best = similarities.argmax(axis=1)
+            for (i, _), idx, row in zip(pending, best, similarities):
+                resolved[i] = (self.job_titles[idx], float(row[idx]) * 100, 'vector')
+        return resolved
+    
+    def stats(self) -> Dict:
+        """Alias hit rates and spell index size, for monitoring"""
+        return {
+            'mode': self.mode,
+            'job_titles': len(self.job_titles),
+            'vector_search': self.embeddings is not None,
+            'vector_dimensions': None if self.embeddings is None else self.embeddings.shape[1],
+            'aliases': self.aliases.stats(),
+            'spell_index': self.spell_index.stats(),
+            'facets': self.facets.stats(),
+            'fragments': self.fragments.stats(),
+            'caches': {
+                'query_embeddings': self.query_embeddings.stats(),
+                'ranked': self.ranked.stats(),
+            },
+        }
+    
+    @staticmethod
+    def fuse_results(fuzzy_results: List[Tuple[str, float, str]],
+                     vector_results: List[Tuple[str, float, str]],
+                     top_k: int = 10,
+                     method: str = 'rrf',
+                     rrf_k: int = 60) -> List[Tuple[str, float, str]]:
+        """
+        Merge fuzzy and vector rankings into one list.
+        
+        Args:
+            fuzzy_results: Output of fuzzy_search
+            vector_results: Output of vector_search
+            top_k: Number of results to return
+            method: 'rrf' (reciprocal-rank fusion) or 'score' (best confidence wins)
+            rrf_k: RRF damping constant; larger values flatten rank differences
+        
+        Returns:
+            List of (job_title, confidence_score, method) tuples. Each title keeps
+            the confidence and match method of the leg that ranked it highest.
+        """
+        fused: Dict[str, float] = {}
+        best: Dict[str, Tuple[float, float, str]] = {}  # title -> (leg rank score, confidence, method)
+        
+        for results in (fuzzy_results, vector_results):
+            for rank, (job_title, confidence, leg) in enumerate(results):
+                if method == 'rrf':
+                    contribution = 1.0 / (rrf_k + rank + 1)
+                    fused[job_title] = fused.get(job_title, 0.0) + contribution
+                else:
+                    contribution = confidence
+                    fused[job_title] = max(fused.get(job_title, 0.0), confidence)
+                if job_title not in best or contribution > best[job_title][0]:
+                    best[job_title] = (contribution, confidence, leg)
+        
+        ranked = sorted(fused, key=lambda title: fused[title], reverse=True)[:top_k]
+        return [(title, best[title][1], best[title][2]) for title in ranked]
+    
+    def _fusion_retrieve(self, query: str, top_k: int, decisive_score: float,
+                         fusion: str, mask: Optional[np.ndarray] = None) -> List[Tuple[str, float, str]]:
+        """Run fuzzy and vector retrieval concurrently and fuse the rankings"""
+        cancel = threading.Event()
+        vector_future = _retrieval_pool.submit(self.vector_search, query, top_k, cancel, mask)
+        fuzzy_results = self.fuzzy_search(query, top_k=top_k, mask=mask)
+        best_fuzzy_score = fuzzy_results[0][1] if fuzzy_results else 0
+        
+        if best_fuzzy_score >= decisive_score:
+            # Fuzzy is decisive: stop the vector leg at its next checkpoint
+            cancel.set()
+            vector_future.cancel()
+            log.debug("Using fuzzy match (decisive score: %.1f)", best_fuzzy_score)
+            return fuzzy_results
+        
+        vector_results = vector_future.result()
+        if not vector_results:
+            return fuzzy_results
+        log.debug("Using %s fusion (fuzzy score %.1f)", fusion, best_fuzzy_score)
+        return self.fuse_results(fuzzy_results, vector_results, top_k=top_k, method=fusion)
+    
+    def hybrid_search(self, query: str, top_k: int = 10, fuzzy_threshold: float = 85.0,
+                      mode: Optional[str] = None, decisive_score: float = 95.0,
+                      fusion: str = 'rrf', industry: Optional[str] = None,
+                      location: Optional[str] = None,
+                      ai_impact_level: Optional[str] = None) -> List[Dict]:
         """
         Perform hybrid search: fuzzy first, then vector if needed.
         
         Args:
             query: User's search query
             top_k: Number of results to return
-            fuzzy_threshold: If best fuzzy match < this, use vector search
+            fuzzy_threshold: If best fuzzy match < this, use vector search (cascade mode)
+            mode: 'cascade' or 'fusion' (defaults to the instance mode)
+            decisive_score: Fuzzy score at which fusion mode skips the vector leg
+            fusion: Fusion method for fusion mode, 'rrf' or 'score'
+            industry: Only suggest titles with a row in this industry
+            location: Only suggest titles with a row in this location
+            ai_impact_level: Only suggest titles with a row at this AI impact level
         
         Returns:
             List of dicts with job data + metadata
         """
+        return self._hydrate(*self._rank(
+            query, top_k, fuzzy_threshold, mode, decisive_score, fusion,
+            industry, location, ai_impact_level
+        ))
+    
+    def hybrid_search_json(self, query: str, top_k: int = 10, fuzzy_threshold: float = 85.0,
+                           mode: Optional[str] = None, decisive_score: float = 95.0,
+                           fusion: str = 'rrf', industry: Optional[str] = None,
+                           location: Optional[str] = None,
+                           ai_impact_level: Optional[str] = None) -> bytes:
+        """
+        Same search as hybrid_search, returned as a serialized response body.
+        
+        Returns:
+            UTF-8 JSON {"suggestions": [...], "total_matches": N} assembled
+            from pre-serialized fragments
+        """
+        results, row_mask = self._rank(
+            query, top_k, fuzzy_threshold, mode, decisive_score, fusion,
+            industry, location, ai_impact_level
+        )
+        return self.fragments.render([
+            (self.fragments.position(job_title, row_mask), confidence, method)
+            for job_title, confidence, method in results
+        ])
+    
+    def _rank(self, query: str, top_k: int, fuzzy_threshold: float, mode: Optional[str],
+              decisive_score: float, fusion: str, industry: Optional[str],
+              location: Optional[str], ai_impact_level: Optional[str]
+              ) -> Tuple[List[Tuple[str, float, str]], Optional[np.ndarray]]:
+        """Ranked (job_title, confidence, method) tuples plus the facet row mask"""
         if not query or len(query) < 2:
-            return []
+            return [], None
+        key = (query, top_k, fuzzy_threshold, mode or self.mode, decisive_score, fusion,
+               industry, location, ai_impact_level)
+        ranked = self.ranked.get(key)
+        if ranked is None:
+            with stage('retrieve'):
+                ranked = self._retrieve(*key)
+            self.ranked.put(key, ranked)
+        return ranked
+    
+    def _retrieve(self, query: str, top_k: int, fuzzy_threshold: float, mode: str,
+                  decisive_score: float, fusion: str, industry: Optional[str],
+                  location: Optional[str], ai_impact_level: Optional[str]
+                  ) -> Tuple[List[Tuple[str, float, str]], Optional[np.ndarray]]:
+        """Uncached _rank: aliases, spelling, then fuzzy/vector retrieval"""
         
-        # Step 1: Try fuzzy matching
-        fuzzy_results = self.fuzzy_search(query, top_k=top_k)
+        # Facet filters become one row mask (for hydration) and one title mask (for retrieval)
+        filters = {'industry': industry, 'location': location, 'ai_impact_level': ai_impact_level}
+        row_mask = self.facets.row_mask(**filters)
+        title_mask = self.facets.title_mask(**filters)
+        if title_mask is not None and not title_mask.any():
+            return [], None
+        
+        def allowed(title: str) -> bool:
+            return title_mask is None or bool(title_mask[self.title_index[title]])
+        
+        # Step 0: A verbatim title (any case) is always the first suggestion.
+        # title_key() is order-insensitive, so the steps below could otherwise
+        # turn "Doctor, general practice" into "General practice doctor"
+        verbatim = self.title_by_lower.get(query.strip().lower())
+        if verbatim is not None and not allowed(verbatim):
+            verbatim = None
+        
+        # Aliases and abbreviations ("rn", "ml engineer") map straight to
+        # canonical titles; otherwise the query may come back expanded
+        alias_titles, query = self.aliases.resolve(query)
+        titles = [verbatim] if verbatim is not None else []
+        titles += [title for title in alias_titles if allowed(title) and title != verbatim]
+        if titles:
+            log.debug("Using %s match (%r -> %r)", 'exact' if verbatim else 'alias', query, titles[0])
+            return [
+                (title, 100.0 - 5 * rank, 'exact' if title == verbatim else 'alias')
+                for rank, title in enumerate(titles[:top_k])
+            ], row_mask
+        
+        # Step 1: Correct typos token by token; a corrected exact title skips
+        # both the fuzzy scan and the vector fallback
+        corrected, changed = self.spell_index.correct(query)
+        exact_title = self.title_by_key.get(title_key(corrected))
+        if exact_title is not None and allowed(exact_title):
+            method = 'spell' if changed else 'exact'
+            confidence = 100.0 if not changed else fuzz.token_sort_ratio(query.lower(), exact_title.lower())
+            log.debug("Using %s match (%r -> %r)", method, query, exact_title)
+            return [(exact_title, confidence, method)], row_mask
+        if changed:
+            query = corrected
+        
+        if mode == 'fusion':
+            return self._fusion_retrieve(query, top_k, decisive_score, fusion, title_mask), row_mask
+        
+        # Step 2: Try fuzzy matching
+        fuzzy_results = self.fuzzy_search(query, top_k=top_k, mask=title_mask)
         
         # Check if we have a confident fuzzy match
         best_fuzzy_score = fuzzy_results[0][1] if fuzzy_results else 0
@@ -121,36 +463,30 @@ class HybridJobSearch:
         if best_fuzzy_score >= fuzzy_threshold:
             # Use fuzzy results
             results = fuzzy_results
-            print(f"Using fuzzy match (score: {best_fuzzy_score:.1f})")
+            log.debug("Using fuzzy match (score: %.1f)", best_fuzzy_score)
         else:
             # Fall back to vector search
-            vector_results = self.vector_search(query, top_k=top_k)
+            vector_results = self.vector_search(query, top_k=top_k, mask=title_mask)
             
             if vector_results:
-                print(f"Using vector search (fuzzy score {best_fuzzy_score:.1f} < {fuzzy_threshold})")
+                log.debug("Using vector search (fuzzy score %.1f < %s)", best_fuzzy_score, fuzzy_threshold)
                 results = vector_results
             else:
                 # No vector search available, use fuzzy anyway
-                print(f"Vector search unavailable, using fuzzy results")
+                log.debug("Vector search unavailable, using fuzzy results")
                 results = fuzzy_results
         
-        # Convert to full job data
+        return results, row_mask
+    
+    def _hydrate(self, results: List[Tuple[str, float, str]],
+                 row_mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Convert (job_title, confidence, method) tuples to full job data"""
         output = []
         for job_title, confidence, method in results:
-            # Get the full row from dataset
-            job_row = self.data_loader.df[
-                self.data_loader.df['Job Title'] == job_title
-            ].iloc[0]
-            
-            output.append({
-                'job_title': job_title,
-                'industry': str(job_row.get('Industry', 'Unknown')),
-                'location': str(job_row.get('Location', 'Unknown')),
-                'automation_risk': float(job_row.get('AI Automation Risk', 0)),
-                'growth_projection': float(job_row.get('Job Growth Projection (%)', 0)),
-                'confidence': float(confidence),
-                'match_method': method
-            })
+            # Static fields of the first row of this title that passes the facet filters
+            job = self.fragments.fields(self.fragments.position(job_title, row_mask))
+            job['confidence'] = float(confidence)
+            job['match_method'] = method
+            output.append(job)
         
         return output
-
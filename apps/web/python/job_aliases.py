@@ -0,0 +1,251 @@
+"""
+Alias and abbreviation table for job title search.
+
+Abbreviations such as "dev", "eng" or "rn" score poorly against full titles
+and always fell through to the sentence encoder. This module compiles a
+curated alias list plus aliases derived from the titles themselves into hash
+tables, so the most common shorthand resolves to canonical titles with a
+couple of dictionary lookups.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from spell_correction import tokenize, title_key
+
+# Token (or token sequence) -> expansion used to rewrite a query
+ABBREVIATIONS: Dict[str, str] = {
+    'dev': 'developer',
+    'devs': 'developer',
+    'eng': 'engineer',
+    'engr': 'engineer',
+    'mgr': 'manager',
+    'mgmt': 'management',
+    'admin': 'administrator',
+    'asst': 'assistant',
+    'exec': 'executive',
+    'rep': 'representative',
+    'coord': 'coordinator',
+    'tech': 'technician',
+    'sci': 'scientist',
+    'sw': 'software',
+    'ml': 'machine learning',
+    'ai': 'artificial intelligence',
+    'hr': 'human resources',
+    'qa': 'quality',
+    'ux': 'user experience',
+    'rn': 'nurse',
+    'gp': 'general practice doctor',
+    'psych': 'psychologist',
+    'physio': 'physiotherapist',
+    'pharm': 'pharmacist',
+    'acct': 'accountant',
+    'front end': 'frontend',
+    'back end': 'backend',
+}
+
+# Seniority words that never appear in the dataset titles
+DROPPED_TOKENS = {'sr', 'jr', 'senior', 'junior', 'snr', 'jnr'}
+
+# Phrase -> canonical titles, most likely first. Titles missing from the
+# loaded dataset are dropped when the table is compiled.
+CURATED_ALIASES: Dict[str, List[str]] = {
+    'software developer': ['Software engineer', 'Applications developer', 'Systems developer'],
+    'developer': ['Software engineer', 'Applications developer', 'Systems developer'],
+    'programmer': ['Programmer, applications', 'Programmer, systems', 'Software engineer'],
+    'coder': ['Software engineer', 'Programmer, applications'],
+    'swe': ['Software engineer'],
+    'sde': ['Software engineer'],
+    'web developer': ['Web designer', 'Applications developer'],
+    'frontend developer': ['Web designer', 'Applications developer'],
+    'backend developer': ['Software engineer', 'Systems developer'],
+    'full stack developer': ['Software engineer', 'Web designer'],
+    'game developer': ['Computer games developer', 'Games developer'],
+    'machine learning engineer': ['Data scientist', 'Software engineer'],
+    'machine learning': ['Data scientist'],
+    'artificial intelligence engineer': ['Data scientist', 'Software engineer'],
+    'data analyst': ['Data scientist', 'Statistician', 'Systems analyst'],
+    'dba': ['Database administrator'],
+    'sysadmin': ['IT technical support officer', 'Database administrator'],
+    'it support': ['IT technical support officer'],
+    'helpdesk': ['IT technical support officer'],
+    'help desk': ['IT technical support officer'],
+    'user experience designer': ['Web designer', 'Designer, multimedia'],
+    'ui designer': ['Web designer', 'Designer, multimedia'],
+    'pm': ['Product manager', 'Production manager'],
+    'quality': ['Quality manager'],
+    'nurse': ['Adult nurse', 'Nurse, adult', 'Mental health nurse', 'Paediatric nurse'],
+    'registered nurse': ['Adult nurse', 'Nurse, adult'],
+    'doctor': ['Hospital doctor', 'General practice doctor'],
+    'physician': ['Hospital doctor', 'General practice doctor'],
+    'general practice doctor': ['General practice doctor', 'Doctor, general practice'],
+    'emt': ['Paramedic'],
+    'vet': ['Veterinary surgeon'],
+    'pharmacist': ['Community pharmacist', 'Hospital pharmacist'],
+    'physiotherapist': ['Physiotherapist'],
+    'ot': ['Occupational therapist'],
+    'slt': ['Speech and language therapist'],
+    'teacher': ['Primary school teacher', 'Secondary school teacher'],
+    'professor': ['Associate Professor', 'Lecturer, higher education'],
+    'accountant': ['Chartered accountant', 'Accountant, chartered', 'Chartered certified accountant'],
+    'cpa': ['Chartered accountant', 'Chartered certified accountant'],
+    'attorney': ['Lawyer', 'Solicitor', 'Barrister'],
+    'human resources': ['Human resources officer', 'Personnel officer'],
+    'human resources manager': ['Human resources officer', 'Personnel officer'],
+    'recruiter': ['Recruitment consultant'],
+    'pa': ['Personal assistant'],
+    'pilot': ['Airline pilot', 'Pilot, airline'],
+    'flight attendant': ['Air cabin crew', 'Cabin crew'],
+    'police': ['Police officer'],
+    'cop': ['Police officer'],
+    'realtor': ['Estate agent'],
+    'real estate agent': ['Estate agent'],
+    'quant': ['Financial risk analyst', 'Investment analyst'],
+    'trader': ['Financial trader', 'Equities trader'],
+    'civil engineer': ['Civil engineer, consulting', 'Civil engineer, contracting'],
+    'ceo': ['Chief Executive Officer'],
+    'cfo': ['Chief Financial Officer'],
+    'cto': ['Chief Technology Officer'],
+    'coo': ['Chief Operating Officer'],
+    'cmo': ['Chief Marketing Officer'],
+    'psychologist': ['Clinical psychologist', 'Psychologist, clinical'],
+}
+
+# Words ignored when deriving acronyms from multi-word titles
+_ACRONYM_STOPWORDS = {'of', 'and', 'the', 'a', 'an', 'for', 'as', 'in'}
+
+
+def _acronym(title: str) -> Optional[str]:
+    words = [w for w in tokenize(title) if w not in _ACRONYM_STOPWORDS]
+    if len(words) < 3:
+        return None
+    return ''.join(w[0] for w in words)
+
+
+class AliasTable:
+    """Compiled alias hash tables with longest-match phrase rewriting"""
+
+    def __init__(self, job_titles: Iterable[str],
+                 curated: Optional[Dict[str, List[str]]] = None,
+                 abbreviations: Optional[Dict[str, str]] = None):
+        """
+        Compile the alias table.
+
+        Args:
+            job_titles: Canonical titles in the loaded dataset
+            curated: Phrase -> titles map (defaults to CURATED_ALIASES)
+            abbreviations: Token rewrite map (defaults to ABBREVIATIONS)
+        """
+        titles = list(dict.fromkeys(job_titles))
+        known = set(titles)
+        vocabulary = {token for title in titles for token in tokenize(title)}
+
+        # Order-insensitive phrase key -> canonical titles
+        self.aliases: Dict[str, List[str]] = {}
+
+        def add(phrase: str, targets: List[str]):
+            key = title_key(phrase)
+            existing = self.aliases.setdefault(key, [])
+            for target in targets:
+                if target in known and target not in existing:
+                    existing.append(target)
+            if not existing:
+                del self.aliases[key]
+
+        # Data-derived: every title under its own key, then unambiguous acronyms
+        # ("Chief Executive Officer" -> "ceo") that aren't ordinary words
+        for title in titles:
+            add(title, [title])
+        acronyms: Dict[str, List[str]] = {}
+        for title in titles:
+            acronym = _acronym(title)
+            if acronym and acronym not in vocabulary:
+                acronyms.setdefault(acronym, []).append(title)
+        self.derived_count = 0
+        for acronym, targets in acronyms.items():
+            if len(targets) == 1 and title_key(acronym) not in self.aliases:
+                add(acronym, targets)
+                self.derived_count += 1
+
+        self.curated_count = 0
+        for phrase, targets in (curated if curated is not None else CURATED_ALIASES).items():
+            before = len(self.aliases)
+            add(phrase, targets)
+            self.curated_count += len(self.aliases) - before
+
+        # Token tuple -> replacement tokens, for longest-match rewriting
+        self.rewrites: Dict[Tuple[str, ...], Tuple[str, ...]] = {
+            tuple(tokenize(source)): tuple(tokenize(target))
+            for source, target in (abbreviations if abbreviations is not None else ABBREVIATIONS).items()
+        }
+        self.max_phrase_tokens = max((len(k) for k in self.rewrites), default=1)
+
+        self._lock = threading.Lock()
+        self._lookups = 0
+        self._direct_hits = 0
+        self._expanded_hits = 0
+        self._rewrites_only = 0
+
+    def expand(self, query: str) -> Tuple[str, bool]:
+        """
+        Rewrite abbreviations using longest-match over token n-grams.
+
+        Returns:
+            (expanded_query, changed)
+        """
+        tokens = [t for t in tokenize(query) if t not in DROPPED_TOKENS]
+        output: List[str] = []
+        changed = len(tokens) != len(tokenize(query))
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self.max_phrase_tokens, len(tokens) - i), 0, -1):
+                replacement = self.rewrites.get(tuple(tokens[i:i + n]))
+                if replacement is not None:
+                    output.extend(replacement)
+                    i += n
+                    changed = True
+                    break
+            else:
+                output.append(tokens[i])
+                i += 1
+        return ' '.join(output), changed
+
+    def resolve(self, query: str) -> Tuple[List[str], str]:
+        """
+        Resolve a query to canonical titles.
+
+        Returns:
+            (titles, rewritten_query). titles is empty when there is no alias
+            hit; rewritten_query is the abbreviation-expanded query, or the
+            original query when nothing was rewritten.
+        """
+        direct = self.aliases.get(title_key(query))
+        expanded, changed = (query, False) if direct else self.expand(query)
+        expanded_hit = None if direct or not changed else self.aliases.get(title_key(expanded))
+
+        with self._lock:
+            self._lookups += 1
+            if direct:
+                self._direct_hits += 1
+            elif expanded_hit:
+                self._expanded_hits += 1
+            elif changed:
+                self._rewrites_only += 1
+        return list(direct or expanded_hit or []), expanded if changed else query
+
+    def stats(self) -> Dict[str, float]:
+        """Table size and hit rates since startup"""
+        with self._lock:
+            lookups = self._lookups
+            hits = self._direct_hits + self._expanded_hits
+            return {
+                'aliases': len(self.aliases),
+                'curated_aliases': self.curated_count,
+                'derived_acronyms': self.derived_count,
+                'rewrite_rules': len(self.rewrites),
+                'lookups': lookups,
+                'direct_hits': self._direct_hits,
+                'expanded_hits': self._expanded_hits,
+                'rewrites_without_hit': self._rewrites_only,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            }
@@ -4,6 +4,8 @@ Loads and caches the dataset for efficient querying
 """
 
 import os
+import sys
+import numpy as np
 import pandas as pd
 import kagglehub
 from kagglehub import KaggleDatasetAdapter
@@ -11,6 +13,11 @@ from typing import Optional, Dict, Any
 import json
 from pathlib import Path
 
+from career_skyline import CareerSkyline
+from dataset_aggregates import JobMarketCube
+from facet_index import FacetIndex
+from streaming_ingest import parquet_available, read_cache, stream_ingest, write_cache
+
 # Load environment variables
 from dotenv import load_dotenv
 env_local = Path(__file__).parent.parent.parent / '.env.local'
@@ -19,16 +26,63 @@ if env_local.exists():
 else:
     load_dotenv(Path(__file__).parent.parent.parent / '.env')
 
+# Columns no endpoint reads; dropped from the in-memory frame (the cache keeps them)
+UNUSED_COLUMNS = ['Job Status', 'Remote Work Ratio (%)', 'Gender Diversity (%)']
+
+# Resilience score inputs shared by the API and batch scoring (score_workforce.py)
+EXPERIENCE_BONUSES = {
+    'recent-grad': -10,
+    'early-career': 0,
+    'mid-career': 10,
+    'veteran': 15
+}
+VALUABLE_SKILLS = ['ml', 'programming', 'automation', 'data-analysis', 'blockchain']
+
+# Quiz salary ranges -> numeric bounds and midpoint
+SALARY_RANGES = {
+    'under-30k': {'min': 0, 'max': 30000, 'mid': 15000},
+    '30k-50k': {'min': 30000, 'max': 50000, 'mid': 40000},
+    '50k-75k': {'min': 50000, 'max': 75000, 'mid': 62500},
+    '75k-100k': {'min': 75000, 'max': 100000, 'mid': 87500},
+    '100k-150k': {'min': 100000, 'max': 150000, 'mid': 125000},
+    '150k-200k': {'min': 150000, 'max': 200000, 'mid': 175000},
+    'over-200k': {'min': 200000, 'max': 1000000, 'mid': 300000},
+}
+
+# Rows per chunk when ingesting a downloaded CSV into the cache
+INGEST_CHUNKSIZE = int(os.environ.get('DATASET_INGEST_CHUNKSIZE', '100000'))
+
+# String columns with fewer distinct values than this share of rows become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
 class JobMarketDataLoader:
     """Loads and queries the Kaggle AI impact dataset"""
     
-    def __init__(self):
+    def __init__(self, compact: bool = True):
+        """
+        Args:
+            compact: Shrink the in-memory DataFrame after loading (see _compact)
+        """
         self.df: Optional[pd.DataFrame] = None
+        self.cube: Optional[JobMarketCube] = None
+        self.facets: Optional[FacetIndex] = None
+        self.skyline: Optional[CareerSkyline] = None
+        self.compact = compact
+        self._memory_before: Dict[str, Dict[str, Any]] = {}
+        self._memory_after: Dict[str, Dict[str, Any]] = {}
         self.dataset_id = "sahilislam007/ai-impact-on-job-market-20242030"
         # Store cache in the python directory for persistence
         self.cache_dir = Path(__file__).parent / "data"
         self.cache_dir.mkdir(exist_ok=True)
-        self.cache_file = str(self.cache_dir / "job_market_data_cache.csv")
+        # 'parquet' (needs pyarrow) keeps a columnar cache; CSV stays the default
+        cache_format = os.environ.get('DATASET_CACHE_FORMAT', 'csv').lower()
+        if cache_format not in ('csv', 'parquet'):
+            print(f"⚠ Unknown DATASET_CACHE_FORMAT={cache_format!r}, using csv")
+            cache_format = 'csv'
+        elif cache_format == 'parquet' and not parquet_available():
+            print("⚠ DATASET_CACHE_FORMAT=parquet needs pyarrow (pip install pyarrow), using csv")
+            cache_format = 'csv'
+        self.cache_file = str(self.cache_dir / f"job_market_data_cache.{cache_format}")
         
     def load_dataset(self, force_refresh: bool = False) -> pd.DataFrame:
         """
@@ -45,8 +99,10 @@ class JobMarketDataLoader:
             cache_age_days = (Path(self.cache_file).stat().st_mtime - Path().stat().st_mtime) / 86400
             print(f"Loading dataset from cache (cached {abs(int(cache_age_days))} days ago)...")
             print(f"   Cache location: {self.cache_file}")
-            self.df = pd.read_csv(self.cache_file)
+            self.df = read_cache(self.cache_file)
             print(f"   Loaded {len(self.df)} jobs from cache")
+            self._compact()
+            self._build_aggregates()
             return self.df
         
         print("Downloading dataset from Kaggle...")
@@ -60,16 +116,16 @@ class JobMarketDataLoader:
             csv_files = list(Path(dataset_path).glob("*.csv"))
             if csv_files:
                 print(f"   Found {len(csv_files)} CSV file(s)")
-                # Load the first CSV file
-                self.df = pd.read_csv(csv_files[0])
+                # Stream the first CSV into the cache chunk by chunk, then load the cleaned cache
+                stats = stream_ingest(str(csv_files[0]), self.cache_file, chunksize=INGEST_CHUNKSIZE)
+                self.df = read_cache(self.cache_file)
             else:
                 raise FileNotFoundError("No CSV files found in downloaded dataset")
             
-            # Cache for future use
-            self.df.to_csv(self.cache_file, index=False)
             print(f"   Dataset downloaded and cached to:")
             print(f"      {self.cache_file}")
-            print(f"   Cached {len(self.df)} jobs for future use")
+            print(f"   Cached {len(self.df)} jobs for future use "
+                  f"({stats['rows_per_sec']:,.0f} rows/s, {stats['title_variants_merged']} title variants merged)")
             
         except Exception as e:
             print(f"Error loading from Kaggle: {e}")
@@ -77,11 +133,101 @@ class JobMarketDataLoader:
             # Fallback: create sample data structure if download fails
             self.df = self._create_fallback_data()
             # Cache fallback data too
-            self.df.to_csv(self.cache_file, index=False)
+            write_cache(self.df, self.cache_file)
             print(f"   💾 Fallback data cached to {self.cache_file}")
             
+        self._compact()
+        self._build_aggregates()
         return self.df
     
+    @staticmethod
+    def _column_memory(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        usage = df.memory_usage(deep=True, index=False)
+        return {col: {'bytes': int(usage[col]), 'dtype': str(df[col].dtype)} for col in df.columns}
+    
+    def _compact(self):
+        """
+        Shrink the in-memory DataFrame: categoricals for low-cardinality strings,
+        interned strings otherwise, smaller integer types, unused columns dropped.
+        Every column keeps its kind (int stays int, float stays float64), so API
+        responses are unchanged
+        """
+        self._memory_before = self._column_memory(self.df)
+        if not self.compact:
+            self._memory_after = self._memory_before
+            return
+        
+        df = self.df.drop(columns=[c for c in UNUSED_COLUMNS if c in self.df.columns])
+        for col in df.columns:
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            if series.dtype == object or pd.api.types.is_string_dtype(series):
+                if series.nunique(dropna=False) <= CATEGORY_MAX_UNIQUE_RATIO * max(len(series), 1):
+                    df[col] = series.astype('category')
+                elif series.dtype == object:
+                    # One shared str object per distinct value
+                    df[col] = series.map(lambda v: sys.intern(v) if isinstance(v, str) else v)
+            elif pd.api.types.is_integer_dtype(series):
+                df[col] = pd.to_numeric(series, downcast='integer')
+            # Float columns stay float64: turning whole-valued ones into integers
+            # would change API output (23.0 -> 23), float32 would add noise
+        
+        self.df = df
+        self._memory_after = self._column_memory(df)
+        before = sum(c['bytes'] for c in self._memory_before.values())
+        after = sum(c['bytes'] for c in self._memory_after.values())
+        print(f"   Compacted DataFrame: {before / 1024 / 1024:.1f} MB -> {after / 1024 / 1024:.1f} MB")
+    
+    def memory_report(self) -> Dict[str, Any]:
+        """
+        Bytes per column before and after compaction
+        
+        Returns:
+            Dictionary with per-column bytes/dtypes, totals and dropped columns
+        """
+        if self.df is None:
+            self.load_dataset()
+        
+        columns = {}
+        for col, before in self._memory_before.items():
+            after = self._memory_after.get(col)
+            columns[col] = {
+                'bytes_before': before['bytes'],
+                'bytes_after': after['bytes'] if after else 0,
+                'dtype_before': before['dtype'],
+                'dtype_after': after['dtype'] if after else 'dropped',
+            }
+        total_before = sum(c['bytes_before'] for c in columns.values())
+        total_after = sum(c['bytes_after'] for c in columns.values())
+        return {
+            'rows': len(self.df),
+            'columns': columns,
+            'dropped_columns': [c for c in self._memory_before if c not in self._memory_after],
+            'total_bytes_before': total_before,
+            'total_bytes_after': total_after,
+            'reduction_percent': round((1 - total_after / total_before) * 100, 1) if total_before else 0.0,
+        }
+    
+    def _build_aggregates(self):
+        """Materialize the aggregate cube, the facet bitmaps used by filtered lookups
+        and the per-industry career skylines"""
+        self.cube = JobMarketCube(self.df)
+        print(f"   Built aggregate cube: {len(self.cube.cells)} cells in {self.cube.build_ms:.0f} ms")
+        self.facets = FacetIndex(self.df)
+        facet_stats = self.facets.stats()
+        print(f"   Built {facet_stats['masks']} facet masks ({facet_stats['memory_kb']:.0f} KB) "
+              f"in {facet_stats['build_ms']:.0f} ms")
+        try:
+            self.skyline = CareerSkyline(self.df)
+        except ValueError as e:
+            self.skyline = None
+            print(f"   ⚠ Career skylines unavailable: {e}")
+        else:
+            sizes = self.skyline.stats()['skyline_sizes']
+            print(f"   Built {len(sizes)} career skylines over {len(self.skyline.careers)} careers "
+                  f"in {self.skyline.build_ms:.0f} ms")
+    
     def _create_fallback_data(self) -> pd.DataFrame:
         """Create fallback data if Kaggle download fails"""
         print("Using fallback data structure...")
@@ -112,24 +258,19 @@ class JobMarketDataLoader:
         if self.df is None:
             self.load_dataset()
         
-        # Normalize job title for matching
-        job_title_lower = job_title.lower()
-        
-        # Handle both column name formats (with/without space)
-        job_col = 'Job Title' if 'Job Title' in self.df.columns else 'Job_Title'
-        
-        # Try exact match first
-        matches = self.df[self.df[job_col].str.lower() == job_title_lower]
+        # Exact (case-insensitive) title via the title index: its first row, whatever
+        # the industry (the industry only picks the row when no title matches)
+        matches = self.df.iloc[self.facets.title_rows(job_title)[:1]]
         
         # If no exact match, try partial match
         if matches.empty:
-            matches = self.df[self.df[job_col].str.lower().str.contains(job_title_lower, na=False)]
+            job_col = 'Job Title' if 'Job Title' in self.df.columns else 'Job_Title'
+            matches = self.df[self.df[job_col].str.lower().str.contains(job_title.lower(), regex=False, na=False)]
         
         # If still no match, find closest by industry
         if matches.empty and industry:
-            matches = self.df[self.df['Industry'].str.lower() == industry.lower()]
-            if not matches.empty:
-                matches = matches.head(1)  # Take first match in industry
+            first = np.flatnonzero(self.facets.row_mask(industry=industry))[:1]
+            matches = self.df.iloc[first]  # Take first match in industry
         
         # If still nothing, return average/default data
         if matches.empty:
@@ -147,8 +288,9 @@ class JobMarketDataLoader:
             return default
         
         # Calculate growth projection from openings
-        openings_2024 = get_value(job_data, 'Job Openings (2024)', 'Job_Openings_2024', 100)
-        openings_2030 = get_value(job_data, 'Projected Openings (2030)', 'Projected_Openings_2030', 100)
+        # float() so downcast integer columns can't overflow in the subtraction
+        openings_2024 = float(get_value(job_data, 'Job Openings (2024)', 'Job_Openings_2024', 100))
+        openings_2030 = float(get_value(job_data, 'Projected Openings (2030)', 'Projected_Openings_2030', 100))
         growth_projection = ((openings_2030 - openings_2024) / openings_2024 * 100) if openings_2024 > 0 else 0
         
         return {
@@ -206,17 +348,10 @@ class JobMarketDataLoader:
         score += growth * 0.4  # Weight: 0.4
         
         # Factor 3: Experience bonus
-        experience_bonuses = {
-            'recent-grad': -10,
-            'early-career': 0,
-            'mid-career': 10,
-            'veteran': 15
-        }
-        score += experience_bonuses.get(user_experience, 0)
+        score += EXPERIENCE_BONUSES.get(user_experience, 0)
         
         # Factor 4: Skills assessment
-        valuable_skills = ['ml', 'programming', 'automation', 'data-analysis', 'blockchain']
-        skill_matches = sum(1 for skill in user_skills if skill in valuable_skills)
+        skill_matches = sum(1 for skill in user_skills if skill in VALUABLE_SKILLS)
         score += skill_matches * 5  # 5 points per valuable skill
         
         # Clamp score to 0-100
@@ -255,17 +390,41 @@ class JobMarketDataLoader:
         }
     
     def get_dataset_summary(self) -> Dict[str, Any]:
-        """Get summary statistics of the dataset"""
-        if self.df is None:
+        """Get summary statistics of the dataset (served from the aggregate cube)"""
+        if self.cube is None:
             self.load_dataset()
         
-        return {
-            'total_jobs': len(self.df),
-            'industries': self.df['Industry'].nunique() if 'Industry' in self.df.columns else 0,
-            'avg_automation_risk': float(self.df['AI_Automation_Risk'].mean()) if 'AI_Automation_Risk' in self.df.columns else 0,
-            'highest_risk_jobs': self.df.nlargest(5, 'AI_Automation_Risk')[['Job_Title', 'AI_Automation_Risk']].to_dict('records') if 'AI_Automation_Risk' in self.df.columns else [],
-            'lowest_risk_jobs': self.df.nsmallest(5, 'AI_Automation_Risk')[['Job_Title', 'AI_Automation_Risk']].to_dict('records') if 'AI_Automation_Risk' in self.df.columns else []
-        }
+        return self.cube.summary()
+    
+    def get_aggregate(self, industry: Optional[str] = None,
+                      location: Optional[str] = None,
+                      ai_impact_level: Optional[str] = None,
+                      by: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Drill down into the aggregate cube
+        
+        Args:
+            industry: Optional industry filter
+            location: Optional location filter
+            ai_impact_level: Optional AI impact level filter
+            by: Optional dimension to break the cell down by
+            
+        Returns:
+            Aggregates for the filtered cell (plus 'breakdown' when by is given),
+            or None if a filter value doesn't exist in the dataset
+        """
+        if self.cube is None:
+            self.load_dataset()
+        
+        cell = self.cube.cell(industry, location, ai_impact_level)
+        if cell is None:
+            return None
+        if by:
+            cell = dict(cell)
+            cell['breakdown'] = self.cube.breakdown(
+                by, industry=industry, location=location, ai_impact_level=ai_impact_level
+            )
+        return cell
 
 
 # Singleton instance
@@ -284,6 +443,14 @@ if __name__ == "__main__":
     # Test the loader
     loader = get_loader()
     
+    print("\n=== Memory Report ===")
+    report = loader.memory_report()
+    for col, usage in report['columns'].items():
+        print(f"   {col:32s} {usage['bytes_before'] / 1024:9.1f} KB {usage['dtype_before']:>8s} -> "
+              f"{usage['bytes_after'] / 1024:9.1f} KB {usage['dtype_after']}")
+    print(f"   Total: {report['total_bytes_before'] / 1024 / 1024:.2f} MB -> "
+          f"{report['total_bytes_after'] / 1024 / 1024:.2f} MB ({report['reduction_percent']}% smaller)")
+    
     print("\n=== Dataset Summary ===")
     summary = loader.get_dataset_summary()
     print(json.dumps(summary, indent=2))
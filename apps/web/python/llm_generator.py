@@ -4,11 +4,14 @@ Uses OpenAI API to generate personalized career advice
 """
 
 import os
+import time
 from typing import Dict, Any, List, Optional
 from openai import OpenAI
 import json
 from pathlib import Path
 
+from prompt_templates import FortunePrompt, PromptStats
+
 # Load environment variables
 from dotenv import load_dotenv
 env_local = Path(__file__).parent.parent.parent / '.env.local'
@@ -20,14 +23,32 @@ else:
 class FortuneLLMGenerator:
     """Generate personalized fortunes using LLM"""
     
-    def __init__(self, api_key: Optional[str] = None, provider: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, provider: Optional[str] = None,
+                 base_url: Optional[str] = None, model: Optional[str] = None,
+                 prompt_variant: Optional[str] = None, timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None):
         """
         Initialize LLM generator
         
         Args:
             api_key: API key (defaults to GROK_API_KEY or OPENAI_API_KEY env var)
             provider: LLM provider - "grok" or "openai" (auto-detects from env)
+            base_url: OpenAI-compatible endpoint overriding the provider's
+                (defaults to LLM_BASE_URL, e.g. mock_llm_server.py)
+            model: Model name overriding the provider default (defaults to LLM_MODEL)
+            prompt_variant: 'full' or 'compact' fortune prompt (defaults to
+                LLM_PROMPT_VARIANT, else 'full'); see prompt_templates.py
+            timeout: Seconds per LLM request (defaults to LLM_TIMEOUT, else 60)
+            max_retries: Client-side retries (defaults to LLM_MAX_RETRIES, else 2);
+                pass 0 when a caller such as the premium job queue retries itself
         """
+        base_url = base_url or os.getenv('LLM_BASE_URL')
+        self.timeout = timeout if timeout is not None else float(os.getenv('LLM_TIMEOUT', '60'))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('LLM_MAX_RETRIES', '2'))
+        client_options = {'timeout': self.timeout, 'max_retries': self.max_retries}
+        self.prompt = FortunePrompt(prompt_variant or os.getenv('LLM_PROMPT_VARIANT', 'full'))
+        self.prompt_stats = PromptStats()
+        
         # Auto-detect provider based on available env vars
         if provider is None:
             if os.getenv('GROK_API_KEY'):
@@ -36,6 +57,10 @@ class FortuneLLMGenerator:
             elif os.getenv('OPENAI_API_KEY'):
                 provider = 'openai'
                 self.api_key = os.getenv('OPENAI_API_KEY')
+            elif base_url:
+                # Self-hosted or mock endpoints usually ignore the key
+                provider = 'openai'
+                self.api_key = os.getenv('LLM_API_KEY', 'local')
             else:
                 raise ValueError("LLM API key required. Set GROK_API_KEY or OPENAI_API_KEY environment variable.")
         else:
@@ -50,19 +75,25 @@ class FortuneLLMGenerator:
         if provider == 'grok':
             self.client = OpenAI(
                 api_key=self.api_key,
-                base_url="https://api.x.ai/v1"
+                base_url=base_url or "https://api.x.ai/v1",
+                **client_options
             )
-            self.model = "grok-3"  # Grok's latest model (updated from grok-beta)
-            print("Using Grok (xAI) for LLM generation")
+            self.model = model or os.getenv('LLM_MODEL') or "grok-3"  # Grok's latest model (updated from grok-beta)
         else:  # openai
-            self.client = OpenAI(api_key=self.api_key)
-            self.model = "gpt-4o-mini"  # Cost-effective model
-            print("Using OpenAI GPT-4o-mini for LLM generation")
+            self.client = OpenAI(api_key=self.api_key, base_url=base_url, **client_options)
+            self.model = model or os.getenv('LLM_MODEL') or "gpt-4o-mini"  # Cost-effective model
+        if base_url:
+            print(f"Using {self.model} at {base_url} for LLM generation")
+        elif provider == 'grok':
+            print(f"Using Grok (xAI) {self.model} for LLM generation")
+        else:
+            print(f"Using OpenAI {self.model} for LLM generation")
     
     def generate_premium_fortune(self, 
                                  user_profile: Dict[str, Any],
                                  job_data: Dict[str, Any],
-                                 resilience_score: Dict[str, Any]) -> Dict[str, Any]:
+                                 resilience_score: Dict[str, Any],
+                                 fallback: bool = True) -> Dict[str, Any]:
         """
         Generate comprehensive premium fortune with personalized advice
         
@@ -70,30 +101,25 @@ class FortuneLLMGenerator:
             user_profile: User's quiz answers
             job_data: Kaggle dataset job information
             resilience_score: Calculated resilience metrics
+            fallback: Return a template fortune if the LLM call fails
+                (False re-raises, so a job queue can retry)
             
         Returns:
             Dictionary with detailed fortune, strategies, and insights
         """
         
-        prompt = self._build_fortune_prompt(user_profile, job_data, resilience_score)
+        prompt = self.prompt.compile(user_profile, job_data, resilience_score)
         
         try:
+            start = time.perf_counter()
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a mystical AI fortune teller specializing in career futures. You provide insightful, actionable advice in an engaging, slightly mystical tone while being grounded in real data and trends. Format responses as JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=prompt.messages,
                 response_format={"type": "json_object"},
                 temperature=0.8,  # Creative but not random
                 max_tokens=2000
             )
+            self.prompt_stats.record(prompt, time.perf_counter() - start, getattr(response, 'usage', None))
             
             result = json.loads(response.choices[0].message.content)
             
@@ -112,69 +138,11 @@ class FortuneLLMGenerator:
             
         except Exception as e:
             print(f"Error generating fortune: {e}")
+            if not fallback:
+                raise
             # Fallback to basic fortune
             return self._generate_fallback_fortune(user_profile, job_data, resilience_score)
     
-    def _build_fortune_prompt(self, 
-                             user_profile: Dict[str, Any],
-                             job_data: Dict[str, Any],
-                             resilience_score: Dict[str, Any]) -> str:
-        """Build the prompt for the LLM"""
-        
-        return f"""As a mystical AI fortune teller, analyze this person's career future against AI disruption:
-
-**User Profile:**
-- Occupation: {user_profile.get('role', 'Unknown')}
-- Experience: {user_profile.get('experience', 'Unknown')}
-- Skills: {', '.join(user_profile.get('skills', []))}
-- Industry: {user_profile.get('industry', 'Unknown')}
-- Age Range: {user_profile.get('age', 'Unknown')}
-
-**Job Market Data (2024-2030):**
-- AI Automation Risk: {job_data.get('ai_automation_risk', 'N/A')}%
-- Job Growth Projection: {job_data.get('job_growth_projection', 'N/A')}%
-- Required Skills Adaptation: {job_data.get('required_skills_adaptation', 'Unknown')}
-- Current Avg Salary: ${job_data.get('avg_salary_2024', 'N/A'):,.0f}
-- Projected 2030 Salary: ${job_data.get('projected_salary_2030', 'N/A'):,.0f}
-
-**Calculated Resilience:**
-- Score: {resilience_score.get('score', 'N/A')}/100
-- Risk Level: {resilience_score.get('risk_level', 'Unknown')}
-- Outlook: {resilience_score.get('outlook', 'Unknown')}
-
-Generate a comprehensive fortune in JSON format with:
-
-1. **narrative** (string): A 250-word mystical prophecy that:
-   - Opens with a cosmic/mystical hook
-   - Explains their current position in the AI age
-   - Highlights both opportunities and challenges
-   - Ends with an empowering call to action
-   - Maintains a balance of mysticism and practical insight
-
-2. **strategies** (array of 3-4 objects): Actionable career strategies, each with:
-   - title: Short, compelling strategy name
-   - description: Detailed 2-3 sentence explanation
-   - timeline: Realistic timeframe (e.g., "3-6 months", "1-2 years")
-   - difficulty: "Easy", "Moderate", or "Challenging"
-   - impact: "High", "Medium", or "Low"
-
-3. **key_insights** (array of 3-5 strings): Critical insights about their career path
-
-4. **timeline** (object): Key milestones with:
-   - next_3_months: Immediate actions
-   - next_year: Medium-term goals
-   - next_3_years: Long-term vision
-
-5. **resources** (array of 5-7 strings): Specific resources (courses, certifications, communities)
-
-6. **warnings** (array of 2-3 strings): Things to watch out for or avoid
-
-7. **opportunities** (array of 3-4 strings): Emerging opportunities in their field
-
-8. **nft_description** (string): Creative 1-sentence description for their NFT artwork (e.g., "A battle-hardened accountant as a cyberpunk phoenix rising from spreadsheets")
-
-Make it personal, insightful, and actionable. Use their specific job title and industry in recommendations."""
-
     def _generate_fallback_fortune(self,
                                    user_profile: Dict[str, Any],
                                    job_data: Dict[str, Any],
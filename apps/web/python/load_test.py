@@ -0,0 +1,468 @@
+"""
+Local HTTP load-test harness for the Python API and the serverless job search.
+Starts the target on localhost (in-process or as a subprocess), replays a
+configurable mix of realistic queries and reports throughput and tail latency.
+
+Usage:
+    python load_test.py --target flask --endpoint suggestions --concurrency 8
+    python load_test.py --target flask --endpoint fortune --rate 25 --duration 20
+    python load_test.py --target serverless --mode subprocess --rate 50
+    python load_test.py --url http://localhost:5000 --endpoint suggestions
+"""
+
+import argparse
+import http.client
+import importlib.util
+import json
+import logging
+import math
+import os
+import pickle
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(PYTHON_DIR, '..', '..', '..'))
+SERVERLESS_FILE = os.path.join(REPO_ROOT, 'api', 'job-search.py')
+
+# Queries real users type: exact titles, typos, prefixes and abbreviations
+DEFAULT_QUERIES = [
+    'data scientist', 'software engineer', 'accountant', 'registered nurse',
+    'teacher', 'graphic designer', 'civil engineer', 'pharmacist',
+    'accountent', 'softwar engineer', 'data scientst', 'enginer', 'nurce',
+    'sof', 'data', 'acc', 'mech', 'teach', 'civil eng',
+    'software dev', 'ml engineer', 'rn', 'dev', 'hr manager', 'it support',
+]
+
+SALARY_RANGES = ['under-30k', '30k-50k', '50k-75k', '75k-100k', '100k-150k', '150k-200k', 'over-200k']
+EXPERIENCE_LEVELS = ['recent-grad', 'early-career', 'mid-career', 'veteran', '0-2', '3-5', '6-10', '10+']
+EDUCATION_LEVELS = ['high-school', 'associate', 'bachelor', 'master', 'phd']
+AI_SKILL_LEVELS = ['none', 'beginner', 'intermediate', 'advanced']
+
+# Endpoint name -> (target, HTTP path)
+ENDPOINTS = {
+    'suggestions': ('flask', '/api/job-suggestions'),
+    'fortune': ('flask', '/api/fortune/free'),
+    'job-search': ('serverless', '/api/job-search'),
+}
+
+
+def load_job_titles() -> List[str]:
+    """Load the job title vocabulary from the precomputed embeddings"""
+    for path in (os.path.join(PYTHON_DIR, 'job_embeddings.pkl'),
+                 os.path.join(REPO_ROOT, 'api', 'job_embeddings.pkl')):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return list(pickle.load(f)['job_titles'])
+    return []
+
+
+def _make_typo(word: str, rng: random.Random) -> str:
+    """Apply one random edit (drop, swap, replace or insert) to a word"""
+    if len(word) < 3:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(('drop', 'swap', 'replace', 'insert'))
+    letter = rng.choice('abcdefghijklmnopqrstuvwxyz')
+    if edit == 'drop':
+        return word[:i] + word[i + 1:]
+    if edit == 'swap':
+        return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]
+    if edit == 'replace':
+        return word[:i] + letter + word[i + 1:]
+    return word[:i] + letter + word[i:]
+
+
+def build_query_mix(titles: List[str], size: int, mix: Dict[str, float],
+                    seed: int = 42) -> List[str]:
+    """
+    Build a replayable list of queries from the title vocabulary.
+
+    Args:
+        titles: Job titles to derive queries from
+        size: Number of queries to generate
+        mix: Weights for 'exact', 'typo', 'prefix' and 'canned' queries
+        seed: Random seed so runs are comparable
+
+    Returns:
+        List of query strings
+    """
+    rng = random.Random(seed)
+    kinds = list(mix.keys())
+    weights = [mix[k] for k in kinds]
+    queries = []
+    for _ in range(size):
+        kind = rng.choices(kinds, weights=weights)[0]
+        if kind == 'canned' or not titles:
+            queries.append(rng.choice(DEFAULT_QUERIES))
+            continue
+        title = rng.choice(titles).lower()
+        if kind == 'exact':
+            queries.append(title)
+        elif kind == 'typo':
+            words = title.split()
+            j = rng.randrange(len(words))
+            words[j] = _make_typo(words[j], rng)
+            queries.append(' '.join(words))
+        else:  # prefix
+            queries.append(title[:rng.randint(2, max(2, min(len(title), 10)))])
+    return queries
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse a mix spec like 'exact=0.4,typo=0.3,prefix=0.2,canned=0.1'"""
+    mix = {}
+    for part in spec.split(','):
+        kind, _, weight = part.partition('=')
+        if kind.strip() not in ('exact', 'typo', 'prefix', 'canned'):
+            raise ValueError(f"Unknown query kind in mix: {kind}")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+def make_payload(endpoint: str, query: str, rng: random.Random) -> Dict[str, Any]:
+    """Build the JSON request body for an endpoint"""
+    if endpoint == 'fortune':
+        return {
+            'job_title': query,
+            'current_salary': rng.choice(SALARY_RANGES),
+            'experience': rng.choice(EXPERIENCE_LEVELS),
+            'education': rng.choice(EDUCATION_LEVELS),
+            'ai_skills': rng.choice(AI_SKILL_LEVELS),
+        }
+    return {'query': query}
+
+
+# ---------------------------------------------------------------------------
+# Targets
+# ---------------------------------------------------------------------------
+
+def load_serverless_handler():
+    """Import the handler class from api/job-search.py (not a valid module name)"""
+    spec = importlib.util.spec_from_file_location('job_search', SERVERLESS_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    class QuietHandler(module.handler):
+        def log_message(self, format, *args):
+            pass
+
+    return QuietHandler
+
+
+def _free_port() -> int:
+    import socket
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class LocalTarget:
+    """A server running on localhost, started in-process or as a subprocess"""
+
+    def __init__(self, target: str, mode: str, port: Optional[int] = None):
+        self.target = target
+        self.mode = mode
+        self.port = port or _free_port()
+        self._server = None
+        self._process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 120.0):
+        if self.mode == 'subprocess':
+            cmd = [sys.executable, os.path.abspath(__file__), '--serve', self.target, '--port', str(self.port)]
+            self._process = subprocess.Popen(cmd, cwd=PYTHON_DIR)
+        elif self.target == 'flask':
+            from werkzeug.serving import make_server
+            logging.getLogger('werkzeug').setLevel(logging.WARNING)
+            sys.path.insert(0, PYTHON_DIR)
+            import api_server
+            self._server = make_server('127.0.0.1', self.port, api_server.app, threaded=True)
+        else:
+            from http.server import ThreadingHTTPServer
+            self._server = ThreadingHTTPServer(('127.0.0.1', self.port), load_serverless_handler())
+
+        if self._server is not None:
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._wait_until_ready(timeout)
+
+    def _wait_until_ready(self, timeout: float):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._process is not None and self._process.poll() is not None:
+                raise RuntimeError(f"Target process exited with code {self._process.returncode}")
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=2)
+                conn.request('OPTIONS', '/')
+                conn.getresponse().read()
+                conn.close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise TimeoutError(f"{self.target} target did not start within {timeout:.0f}s")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+def serve(target: str, port: int):
+    """Run a target in the foreground (used for --mode subprocess)"""
+    if target == 'flask':
+        sys.path.insert(0, PYTHON_DIR)
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        import api_server
+        api_server.app.run(host='127.0.0.1', port=port, threaded=True, debug=False)
+    else:
+        from http.server import ThreadingHTTPServer
+        ThreadingHTTPServer(('127.0.0.1', port), load_serverless_handler()).serve_forever()
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+class Recorder:
+    """Thread-safe collector of (latency_seconds, status) samples"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: List[Tuple[float, int]] = []
+        self.errors: Dict[str, int] = {}
+
+    def record(self, latency: float, status: int, error: Optional[str] = None):
+        with self._lock:
+            self.samples.append((latency, status))
+            if error is not None:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+
+class HTTPWorker:
+    """Sends JSON POSTs over a per-thread keep-alive connection"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def post(self, path: str, payload: Dict[str, Any]) -> int:
+        body = json.dumps(payload)
+        conn = self._connection()
+        try:
+            conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.will_close:
+                conn.close()
+                self._local.conn = None
+            return response.status
+        except Exception:
+            conn.close()
+            self._local.conn = None
+            raise
+
+
+def _send(worker: HTTPWorker, path: str, payload: Dict[str, Any],
+          recorder: Recorder, started: float):
+    try:
+        status = worker.post(path, payload)
+        error = None if 200 <= status < 300 else f"HTTP {status}"
+    except Exception as e:
+        status, error = 0, type(e).__name__
+    recorder.record(time.perf_counter() - started, status, error)
+
+
+def run_fixed_concurrency(send: Callable[[int], Tuple[str, Dict[str, Any]]], worker: HTTPWorker,
+                          recorder: Recorder, concurrency: int, duration: float,
+                          max_requests: Optional[int]):
+    """Closed loop: each of N workers sends its next request as soon as the last returns"""
+    deadline = time.perf_counter() + duration
+    counter = iter(range(max_requests if max_requests else sys.maxsize))
+    counter_lock = threading.Lock()
+
+    def loop():
+        while time.perf_counter() < deadline:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            path, payload = send(i)
+            _send(worker, path, payload, recorder, time.perf_counter())
+
+    threads = [threading.Thread(target=loop) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def run_fixed_rate(send: Callable[[int], Tuple[str, Dict[str, Any]]], worker: HTTPWorker,
+                   recorder: Recorder, rate: float, duration: float,
+                   max_requests: Optional[int], max_workers: int):
+    """
+    Open loop: requests are issued on a fixed schedule regardless of responses.
+
+    Latency is measured from the scheduled send time, so queueing inside the
+    harness counts against the server instead of hiding it (coordinated omission).
+    """
+    total = int(rate * duration)
+    if max_requests:
+        total = min(total, max_requests)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for i in range(total):
+            scheduled = start + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            path, payload = send(i)
+            pool.submit(_send, worker, path, payload, recorder, scheduled)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Any]:
+    """Reduce raw samples to throughput, error and latency statistics"""
+    latencies = sorted(latency for latency, _ in recorder.samples)
+    total = len(latencies)
+    errors = sum(recorder.errors.values())
+    return {
+        'requests': total,
+        'errors': errors,
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        'error_breakdown': dict(recorder.errors),
+        'elapsed_s': round(elapsed, 3),
+        'requests_per_sec': round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'mean': round(sum(latencies) / total * 1000, 2) if total else 0.0,
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p95': round(percentile(latencies, 95) * 1000, 2),
+            'p99': round(percentile(latencies, 99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if total else 0.0,
+        },
+    }
+
+
+def print_report(endpoint: str, driver: str, summary: Dict[str, Any]):
+    latency = summary['latency_ms']
+    print(f"\n=== Load test: {endpoint} ({driver}) ===")
+    print(f"   Requests:     {summary['requests']} in {summary['elapsed_s']:.1f}s")
+    print(f"   Throughput:   {summary['requests_per_sec']:.1f} req/s")
+    print(f"   Errors:       {summary['errors']} ({summary['error_rate'] * 100:.2f}%)")
+    for error, count in sorted(summary['error_breakdown'].items()):
+        print(f"      {error}: {count}")
+    print(f"   Latency (ms): p50={latency['p50']:.1f}  p95={latency['p95']:.1f}  "
+          f"p99={latency['p99']:.1f}  max={latency['max']:.1f}  mean={latency['mean']:.1f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='suggestions')
+    parser.add_argument('--target', choices=['flask', 'serverless'],
+                        help='Server to start (defaults to the one serving --endpoint)')
+    parser.add_argument('--mode', choices=['inprocess', 'subprocess'], default='inprocess')
+    parser.add_argument('--url', help='Load an already running server instead of starting one')
+    parser.add_argument('--rate', type=float, help='Fixed request rate (req/s, open loop)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Workers for closed-loop mode')
+    parser.add_argument('--duration', type=float, default=15.0, help='Test length in seconds')
+    parser.add_argument('--requests', type=int, help='Stop after this many requests')
+    parser.add_argument('--warmup', type=int, default=5, help='Unrecorded requests sent first')
+    parser.add_argument('--queries', help='File with one query per line (overrides the generated mix)')
+    parser.add_argument('--mix', default='exact=0.35,typo=0.3,prefix=0.2,canned=0.15')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    parser.add_argument('--serve', choices=['flask', 'serverless'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    if args.queries:
+        with open(args.queries) as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = build_query_mix(load_job_titles(), 2000, parse_mix(args.mix), seed=args.seed)
+
+    # Every request comes from this one address, so lift the per-client rate
+    # limit of a locally started server unless the caller configured one
+    os.environ.setdefault('SEARCH_RATE_PER_SEC', '1000000')
+    os.environ.setdefault('SEARCH_BURST', '1000000')
+
+    default_target, path = ENDPOINTS[args.endpoint]
+    target = None
+    if args.url:
+        parsed = urlparse(args.url)
+        host, port = parsed.hostname, parsed.port or 80
+    else:
+        target = LocalTarget(args.target or default_target, args.mode)
+        print(f"Starting {target.target} target ({args.mode}) on {target.base_url}...")
+        target.start()
+        host, port = '127.0.0.1', target.port
+    worker = HTTPWorker(host, port, args.timeout)
+
+    payload_rng = random.Random(args.seed)
+    payload_lock = threading.Lock()
+
+    def send(i: int) -> Tuple[str, Dict[str, Any]]:
+        with payload_lock:
+            return path, make_payload(args.endpoint, queries[i % len(queries)], payload_rng)
+
+    try:
+        warmup = Recorder()
+        for i in range(args.warmup):
+            _send(worker, *send(i), warmup, time.perf_counter())
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        if args.rate:
+            driver = f"fixed rate {args.rate:g} req/s"
+            run_fixed_rate(send, worker, recorder, args.rate, args.duration, args.requests,
+                           max_workers=max(args.concurrency, 64))
+        else:
+            driver = f"concurrency {args.concurrency}"
+            run_fixed_concurrency(send, worker, recorder, args.concurrency, args.duration, args.requests)
+        summary = summarize(recorder, time.perf_counter() - started)
+    finally:
+        if target is not None:
+            target.stop()
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(args.endpoint, driver, summary)
+
+
+if __name__ == '__main__':
+    main()
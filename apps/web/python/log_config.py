@@ -0,0 +1,235 @@
+"""
+Non-blocking structured logging for the API.
+
+Records are put on an in-memory queue by a QueueHandler and formatted and
+written by a QueueListener thread, so a request never waits on stdout. Hot-path
+messages are DEBUG and cost one level check when debug is off. Every record
+carries the current request ID, and each request ends with one access record
+holding its duration and per-stage timings (see `stage()`).
+
+Repeated messages (same logger and format string) are rate limited; the next
+record let through reports how many were suppressed.
+
+Configuration (env):
+    LOG_LEVEL           Root level (default INFO)
+    LOG_LEVELS          Per-logger levels, e.g. "hybrid_job_search=DEBUG,werkzeug=WARNING"
+    LOG_FORMAT          json | text (default json)
+    LOG_RATE_LIMIT      Records per message per window (default 10; 0 disables)
+    LOG_RATE_WINDOW     Window in seconds (default 60)
+    LOG_QUEUE_SIZE      Records buffered for the writer; beyond this they are dropped (default 10000)
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, Optional
+
+from flask import Flask, g, request
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_id', default=None)
+_stages_var: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar('stages', default=None)
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+access_log = logging.getLogger('api_server.access')
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Add the block's wall time to the current request's stage timings (no-op outside a request)"""
+    stages = _stages_var.get()
+    if stages is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the request ID of the thread's current request"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets at most `limit` records per (logger, format string) through per window"""
+
+    def __init__(self, limit: int = 10, window: float = 60.0, exempt=('api_server.access',)):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.exempt = frozenset(exempt)
+        self._counts: Dict[tuple, list] = {}  # key -> [window start, seen, suppressed]
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.name in self.exempt:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                if len(self._counts) > 10000:
+                    self._counts.clear()  # Unbounded format strings; start over
+                suppressed = entry[2] if entry else 0
+                self._counts[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            entry[1] += 1
+            if entry[1] <= self.limit:
+                return True
+            entry[2] += 1
+            self.suppressed += 1
+            return False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request ID and any extra= fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and key not in entry and key != 'request_id':
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        if getattr(record, 'request_id', None):
+            text = f"[{record.request_id}] {text}"
+        if getattr(record, 'suppressed', 0):
+            text += f" (+{record.suppressed} similar suppressed)"
+        return text
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records as-is (formatting happens on the listener thread) and drops when full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: Optional[_QueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_rate_limit: Optional[RateLimitFilter] = None
+
+
+def configure_logging(stream=None) -> logging.handlers.QueueListener:
+    """
+    Route all logging through the background queue (idempotent).
+
+    Args:
+        stream: Where the listener writes (default: stdout)
+
+    Returns:
+        The running QueueListener
+    """
+    global _handler, _listener, _rate_limit
+    if _listener is not None:
+        return _listener
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(TextFormatter() if os.environ.get('LOG_FORMAT', 'json') == 'text' else JsonFormatter())
+
+    _rate_limit = RateLimitFilter(int(os.environ.get('LOG_RATE_LIMIT', '10')),
+                                  float(os.environ.get('LOG_RATE_WINDOW', '60')))
+    _handler = _QueueHandler(queue.Queue(maxsize=int(os.environ.get('LOG_QUEUE_SIZE', '10000'))))
+    # Filters run on the calling thread: they must stay cheap
+    _handler.addFilter(ContextFilter())
+    _handler.addFilter(_rate_limit)
+
+    root = logging.getLogger()
+    root.handlers = [_handler]
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    # The access record below replaces the dev server's own request lines
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    for item in filter(None, os.environ.get('LOG_LEVELS', '').split(',')):
+        name, _, level = item.partition('=')
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    _listener = logging.handlers.QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)  # Flush what is queued on shutdown
+    return _listener
+
+
+def init_app(app: Flask):
+    """Assign request IDs and log one access record with stage timings per request"""
+
+    @app.before_request
+    def _start_request():
+        incoming = request.headers.get('X-Request-ID', '')
+        g.request_id = incoming if _REQUEST_ID.match(incoming) else uuid.uuid4().hex[:16]
+        g.request_start = time.perf_counter()
+        request_id_var.set(g.request_id)
+        _stages_var.set({})
+
+    @app.after_request
+    def _log_request(response):
+        if 'request_start' in g:
+            response.headers['X-Request-ID'] = g.request_id
+            if access_log.isEnabledFor(logging.INFO):
+                access_log.info('%s %s %s', request.method, request.path, response.status_code, extra={
+                    'status': response.status_code,
+                    'duration_ms': round((time.perf_counter() - g.request_start) * 1000, 2),
+                    'stages': {name: round(ms, 2) for name, ms in (_stages_var.get() or {}).items()},
+                })
+        return response
+
+    @app.teardown_request
+    def _end_request(exc):
+        # Worker threads are reused; don't let the next request inherit these
+        request_id_var.set(None)
+        _stages_var.set(None)
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        'queued': _handler.queue.qsize() if _handler else 0,
+        'dropped': _handler.dropped if _handler else 0,
+        'suppressed': _rate_limit.suppressed if _rate_limit else 0,
+    }
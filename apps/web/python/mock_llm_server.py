@@ -0,0 +1,315 @@
+"""
+OpenAI-compatible stand-in LLM server for offline load tests and benchmarks.
+
+Serves POST /v1/chat/completions (plain and stream=true) and GET /v1/models
+with canned fortune JSON, so the premium pipeline runs without a Grok/OpenAI
+key. Each request waits for a time-to-first-token drawn from a latency
+distribution, then "generates" its completion at a fixed token rate; a
+configurable share of requests fails with 500 or 429 instead.
+
+Point the generator at it with LLM_BASE_URL=http://127.0.0.1:8001/v1.
+
+Usage:
+    python mock_llm_server.py --port 8001
+    python mock_llm_server.py --latency lognormal --latency-ms 800 --spread 0.6 \\
+        --tokens-per-sec 60 --error-rate 0.02 --rate-limit-rate 0.05
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+# Rough characters per token, for usage accounting and streaming chunk size
+CHARS_PER_TOKEN = 4
+
+_ROLE = re.compile(r"Occupation:\s*(.+)")
+
+
+@dataclass
+class MockConfig:
+    """
+    latency: Time-to-first-token distribution (LATENCY_DISTRIBUTIONS)
+    latency_ms: Median (lognormal), mean (normal/exponential), center (uniform) or value (fixed)
+    spread: lognormal sigma; normal stddev and uniform half-width as a fraction of latency_ms
+    tokens_per_sec: Completion generation speed (0 = instant)
+    prefill_tokens_per_sec: Prompt processing speed (0 = free); a system message
+        seen before counts as cached and skips prefill, like provider prompt caching
+    error_rate: Share of requests answered with 500
+    rate_limit_rate: Share of requests answered with 429 + Retry-After
+    seed: Random seed (None = nondeterministic)
+    """
+    latency: str = 'lognormal'
+    latency_ms: float = 600.0
+    spread: float = 0.5
+    tokens_per_sec: float = 80.0
+    prefill_tokens_per_sec: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+def canned_fortune(role: str, rng: random.Random) -> Dict[str, Any]:
+    """A premium fortune with every field generate_premium_fortune() reads"""
+    tone = rng.choice(['The circuits hum', 'The stars align', 'The oracle stirs'])
+    return {
+        'narrative': (f"{tone} as your path as a {role} unfolds. The age of AI reshapes "
+                      f"familiar work, yet those who learn its language bend it to their will. "
+                      f"Your skills are a lantern: tend them, and the road ahead stays lit. ") * 4,
+        'strategies': [
+            {'title': title, 'description': f"Build {title.lower()} into your weekly routine as a {role}.",
+             'timeline': timeline, 'difficulty': difficulty, 'impact': impact}
+            for title, timeline, difficulty, impact in [
+                ('AI Tool Fluency', '3-6 months', 'Easy', 'High'),
+                ('Domain Specialization', '1-2 years', 'Moderate', 'High'),
+                ('Visible Portfolio', '6-12 months', 'Moderate', 'Medium'),
+            ]
+        ],
+        'key_insights': [f"Routine {role} tasks automate first", 'Judgment and trust remain human',
+                         'Cross-skilling compounds'],
+        'timeline': {'next_3_months': 'Automate one recurring task', 'next_year': 'Lead an AI pilot',
+                     'next_3_years': 'Own a hybrid human-AI workflow'},
+        'resources': ['Intro to Machine Learning (Coursera)', 'Prompt engineering guides',
+                      'Local AI meetups', 'Industry certification', 'Open-source projects'],
+        'warnings': ['Skills that only follow checklists', 'Ignoring new tooling'],
+        'opportunities': ['AI operations roles', 'Data stewardship', 'Automation consulting'],
+        'nft_description': f"A {role} channeling neon prophecy through a crystal circuit",
+    }
+
+
+class MockLLMServer:
+    """Threaded HTTP server with configurable latency, speed and failures"""
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MockConfig()
+        if self.config.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.config.latency} "
+                             f"(expected one of {LATENCY_DISTRIBUTIONS})")
+        self._rng = random.Random(self.config.seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.counts = {'requests': 0, 'ok': 0, 'errors': 0, 'rate_limited': 0, 'streamed': 0}
+        self.in_flight = 0
+        self._cached_prefixes = set()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'MockLLMServer':
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-llm', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def first_token_delay(self) -> float:
+        """Seconds before the first token, drawn from the configured distribution"""
+        c = self.config
+        with self._rng_lock:
+            if c.latency == 'fixed':
+                ms = c.latency_ms
+            elif c.latency == 'uniform':
+                ms = self._rng.uniform(c.latency_ms * (1 - c.spread), c.latency_ms * (1 + c.spread))
+            elif c.latency == 'normal':
+                ms = self._rng.gauss(c.latency_ms, c.latency_ms * c.spread)
+            elif c.latency == 'exponential':
+                ms = self._rng.expovariate(1 / c.latency_ms) if c.latency_ms > 0 else 0.0
+            else:
+                ms = self._rng.lognormvariate(math.log(max(c.latency_ms, 1e-3)), c.spread)
+        return max(0.0, ms) / 1000
+
+    def outcome(self) -> str:
+        """'error', 'rate_limited' or 'ok' for one request"""
+        with self._rng_lock:
+            roll = self._rng.random()
+        if roll < self.config.error_rate:
+            return 'error'
+        if roll < self.config.error_rate + self.config.rate_limit_rate:
+            return 'rate_limited'
+        return 'ok'
+
+    def prompt_tokens(self, body: Dict[str, Any]) -> Dict[str, int]:
+        """Prompt and cached token counts; the system message is the cacheable prefix"""
+        messages = body.get('messages', [])
+        total = sum(len(str(m.get('content', ''))) for m in messages) // CHARS_PER_TOKEN
+        prefix = str(messages[0].get('content', '')) if messages and messages[0].get('role') == 'system' else ''
+        with self._stats_lock:
+            cached = prefix in self._cached_prefixes
+            self._cached_prefixes.add(prefix)
+        return {'prompt_tokens': total, 'cached_tokens': len(prefix) // CHARS_PER_TOKEN if cached else 0}
+
+    def completion_text(self, body: Dict[str, Any]) -> str:
+        prompt = ' '.join(str(m.get('content', '')) for m in body.get('messages', []))
+        match = _ROLE.search(prompt)
+        role = match.group(1).strip() if match else 'professional'
+        with self._rng_lock:
+            return json.dumps(canned_fortune(role, self._rng))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {**self.counts, 'in_flight': self.in_flight}
+
+    def _count(self, key: str, in_flight: int = 0):
+        with self._stats_lock:
+            self.counts[key] += 1
+            self.in_flight += in_flight
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass  # One line per request would swamp a load test
+
+            def _json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip('/') == '/v1/models':
+                    self._json(200, {'object': 'list', 'data': [{'id': 'mock-fortune', 'object': 'model'}]})
+                elif self.path == '/stats':
+                    self._json(200, server.stats())
+                else:
+                    self._json(404, {'error': {'message': 'Not found'}})
+
+            def do_POST(self):
+                if self.path.rstrip('/') != '/v1/chat/completions':
+                    self._json(404, {'error': {'message': 'Not found'}})
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                server._count('requests', in_flight=1)
+                try:
+                    self._complete(body)
+                finally:
+                    with server._stats_lock:
+                        server.in_flight -= 1
+
+            def _complete(self, body: Dict[str, Any]):
+                prompt = server.prompt_tokens(body)
+                delay = server.first_token_delay()
+                if server.config.prefill_tokens_per_sec > 0:
+                    delay += (prompt['prompt_tokens'] - prompt['cached_tokens']) / server.config.prefill_tokens_per_sec
+                time.sleep(delay)
+                outcome = server.outcome()
+                if outcome == 'error':
+                    server._count('errors')
+                    self._json(500, {'error': {'message': 'Mock upstream failure', 'type': 'server_error'}})
+                    return
+                if outcome == 'rate_limited':
+                    server._count('rate_limited')
+                    self._json(429, {'error': {'message': 'Mock rate limit', 'type': 'rate_limit_error'}},
+                               headers={'Retry-After': '1'})
+                    return
+
+                text = server.completion_text(body)
+                model = body.get('model', 'mock-fortune')
+                usage = {'prompt_tokens': prompt['prompt_tokens'],
+                         'completion_tokens': len(text) // CHARS_PER_TOKEN,
+                         'prompt_tokens_details': {'cached_tokens': prompt['cached_tokens']}}
+                usage['total_tokens'] = usage['prompt_tokens'] + usage['completion_tokens']
+                tps = server.config.tokens_per_sec
+                if body.get('stream'):
+                    server._count('streamed')
+                    self._stream(text, model, tps)
+                else:
+                    if tps > 0:
+                        time.sleep(usage['completion_tokens'] / tps)
+                    self._json(200, {
+                        'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': model,
+                        'choices': [{'index': 0, 'finish_reason': 'stop',
+                                     'message': {'role': 'assistant', 'content': text}}],
+                        'usage': usage,
+                    })
+                server._count('ok')
+
+            def _stream(self, text: str, model: str, tps: float):
+                """Server-sent events, one chunk per token"""
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+                def send(delta: Dict[str, Any], finish: Optional[str] = None):
+                    chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                             'model': model, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish}]}
+                    self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+
+                send({'role': 'assistant', 'content': ''})
+                for i in range(0, len(text), CHARS_PER_TOKEN):
+                    if tps > 0:
+                        time.sleep(1 / tps)
+                    send({'content': text[i:i + CHARS_PER_TOKEN]})
+                send({}, finish='stop')
+                self._chunk(b"data: [DONE]\n\n")
+                self._chunk(b"")
+
+            def _chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', choices=LATENCY_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--latency-ms', type=float, default=600.0, help='Time to first token (see MockConfig)')
+    parser.add_argument('--spread', type=float, default=0.5, help='Distribution spread (see MockConfig)')
+    parser.add_argument('--tokens-per-sec', type=float, default=80.0)
+    parser.add_argument('--prefill-tokens-per-sec', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int)
+    return parser.parse_args(argv)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(latency=args.latency, latency_ms=args.latency_ms, spread=args.spread,
+                      tokens_per_sec=args.tokens_per_sec,
+                      prefill_tokens_per_sec=args.prefill_tokens_per_sec, error_rate=args.error_rate,
+                      rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    server = MockLLMServer(config_from_args(args), args.host, args.port)
+    print(f"✓ Mock LLM serving {server.base_url} ({args.latency} {args.latency_ms:.0f} ms to first token, "
+          f"{args.tokens_per_sec:.0f} tok/s, {args.error_rate:.0%} errors, {args.rate_limit_rate:.0%} 429s)")
+    print(f"  LLM_BASE_URL={server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
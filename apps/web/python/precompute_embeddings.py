@@ -1,55 +1,195 @@
 """
 Precompute sentence embeddings for all job titles in the Kaggle dataset.
 This script should be run once to generate the embeddings file.
+
+Optionally fits a PCA projection (uncentered numpy SVD) that HybridJobSearch applies to
+the title embeddings at load time and to each query at search time, so vector
+search scans dim-sized instead of 384-dimensional vectors. The full vectors
+stay in the file (the related jobs index is built from them).
+
+Usage:
+    python precompute_embeddings.py                        # Encode titles, no PCA
+    python precompute_embeddings.py --pca-dim 128          # Encode titles and store a 128-d PCA
+    python precompute_embeddings.py --reuse --pca-dim 64   # Refit PCA on the existing file
+    python precompute_embeddings.py --reuse --evaluate 32,64,128,256   # Report only
 """
 
+import argparse
 import os
 import pickle
+import time
 import numpy as np
 import pandas as pd
 from sentence_transformers import SentenceTransformer
+from typing import Any, Dict, List, Optional
 from kaggle_data_loader import JobMarketDataLoader
+from related_jobs import build_related_index
+
+EMBEDDINGS_FILE = os.path.join(os.path.dirname(__file__), 'job_embeddings.pkl')
+
+
+def fit_pca(embeddings: np.ndarray, dim: int) -> Dict[str, Any]:
+    """
+    Principal components of the title embeddings.
+
+    The SVD is uncentered, like project(): centering here would pick
+    components for a transform the index never applies.
+
+    Args:
+        embeddings: (titles, 384) matrix
+        dim: Target dimension
+
+    Returns:
+        {'dim', 'components' (384 x dim), 'explained_variance'}: the share of
+        the embeddings' squared norm the projection keeps, ||XV||^2 / ||X||^2
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    dim = min(dim, embeddings.shape[0], embeddings.shape[1])
+    _, singular, vt = np.linalg.svd(embeddings, full_matrices=False)
+    variance = singular ** 2
+    return {
+        'dim': dim,
+        'components': np.ascontiguousarray(vt[:dim].T, dtype=np.float32),
+        'explained_variance': float(variance[:dim].sum() / variance.sum()),
+    }
+
+
+def project(vectors: np.ndarray, pca: Optional[Dict[str, Any]]) -> np.ndarray:
+    """Vectors in PCA space (unchanged without a PCA), L2-normalized for cosine scans"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if pca is not None:
+        # Not centered (nor is the fit): subtracting the mean would shift
+        # every cosine and reorder neighbors that full dimensionality ranks the same
+        vectors = vectors @ pca['components']
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def evaluate_pca(embeddings: np.ndarray, pca: Dict[str, Any], k: int = 10) -> Dict[str, float]:
+    """
+    Nearest-title recall and scan latency of a PCA index against full dimensionality.
+
+    Every title is used as a query against the others (itself excluded); recall@k
+    is the share of its full-dimensional top k that the reduced index also returns.
+    Latency is one query's scan over all titles, as vector_search does it.
+    """
+    full = project(embeddings, None)
+    reduced = project(embeddings, pca)
+
+    def top_k(index: np.ndarray) -> np.ndarray:
+        similarities = index @ index.T
+        np.fill_diagonal(similarities, -np.inf)
+        return np.argpartition(-similarities, k, axis=1)[:, :k]
 
-def precompute_embeddings():
+    truth, approx = top_k(full), top_k(reduced)
+    recall = np.mean([len(set(t) & set(a)) / k for t, a in zip(truth, approx)])
+
+    def scan_ms(index: np.ndarray, queries: np.ndarray) -> float:
+        start = time.perf_counter()
+        for query in queries:
+            np.argsort(index @ query)[::-1][:k]
+        return (time.perf_counter() - start) / len(queries) * 1000
+
+    queries = embeddings[:200]
+    return {
+        'dim': pca['dim'],
+        'explained_variance': round(pca['explained_variance'], 3),
+        f'recall@{k}': round(float(recall), 3),
+        'full_scan_ms': round(scan_ms(full, full[:200]), 4),
+        'pca_scan_ms': round(scan_ms(reduced, project(queries, pca)), 4),
+        'full_bytes': full.nbytes,
+        'pca_bytes': reduced.nbytes + pca['components'].nbytes,
+    }
+
+
+def print_report(reports: List[Dict[str, float]], k: int):
+    print(f"\n  {'dim':>5} {'variance':>9} {f'recall@{k}':>10} {'scan ms':>9} {'index KB':>9}")
+    full = reports[0]
+    print(f"  {'full':>5} {1.0:>9.3f} {1.0:>10.3f} {full['full_scan_ms']:>9.4f} {full['full_bytes'] / 1024:>9.0f}")
+    for r in reports:
+        print(f"  {r['dim']:>5} {r['explained_variance']:>9.3f} {r[f'recall@{k}']:>10.3f} "
+              f"{r['pca_scan_ms']:>9.4f} {r['pca_bytes'] / 1024:>9.0f}")
+
+
+def precompute_embeddings(pca_dim: int = 0, reuse: bool = False, k: int = 10):
     """
     Load the dataset, extract unique job titles, and compute embeddings.
     Save embeddings to a pickle file for fast loading.
+
+    Args:
+        pca_dim: Store a PCA projection to this many dimensions (0: none)
+        reuse: Take the embeddings from the existing file instead of re-encoding
+        k: Neighbors for the PCA recall report
     """
-    print("Loading dataset...")
-    data_loader = JobMarketDataLoader()
-    
-    # Ensure dataset is loaded
-    if data_loader.df is None:
-        data_loader.load_dataset()
-    
-    # Get unique job titles
-    job_titles = data_loader.df['Job Title'].unique()
-    print(f"Found {len(job_titles)} unique job titles")
-    
-    # Load the sentence transformer model
-    print("Loading sentence transformer model (all-MiniLM-L6-v2)...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    
-    # Compute embeddings
-    print("Computing embeddings (this may take a few minutes)...")
-    embeddings = model.encode(job_titles.tolist(), show_progress_bar=True)
-    
+    output_file = EMBEDDINGS_FILE
+    if reuse:
+        print(f"Reusing embeddings from {output_file}...")
+        with open(output_file, 'rb') as f:
+            embeddings_data = pickle.load(f)
+        embeddings_data.pop('pca', None)
+        job_titles = embeddings_data['job_titles']
+    else:
+        print("Loading dataset...")
+        data_loader = JobMarketDataLoader()
+
+        # Ensure dataset is loaded
+        if data_loader.df is None:
+            data_loader.load_dataset()
+
+        # Get unique job titles
+        job_titles = data_loader.df['Job Title'].unique().tolist()
+        print(f"Found {len(job_titles)} unique job titles")
+
+        # Load the sentence transformer model
+        print("Loading sentence transformer model (all-MiniLM-L6-v2)...")
+        model = SentenceTransformer('all-MiniLM-L6-v2')
+
+        # Compute embeddings
+        print("Computing embeddings (this may take a few minutes)...")
+        embeddings = model.encode(job_titles, show_progress_bar=True)
+
+        embeddings_data = {
+            'job_titles': job_titles,
+            'embeddings': embeddings
+        }
+
+    if pca_dim:
+        pca = fit_pca(embeddings_data['embeddings'], pca_dim)
+        embeddings_data['pca'] = pca
+        report = evaluate_pca(embeddings_data['embeddings'], pca, k=k)
+        print(f"✓ Fitted PCA to {pca['dim']} dimensions "
+              f"({pca['explained_variance']:.1%} of variance)")
+        print_report([report], k)
+
     # Save embeddings
-    embeddings_data = {
-        'job_titles': job_titles.tolist(),
-        'embeddings': embeddings
-    }
-    
-    output_file = os.path.join(os.path.dirname(__file__), 'job_embeddings.pkl')
     print(f"Saving embeddings to {output_file}...")
     with open(output_file, 'wb') as f:
         pickle.dump(embeddings_data, f)
-    
+
     print(f"✓ Successfully saved {len(job_titles)} job title embeddings!")
     print(f"  File size: {os.path.getsize(output_file) / 1024 / 1024:.2f} MB")
-    
+
+    # Neighbor lists for the related careers endpoint come from these embeddings
+    stats = build_related_index(output_file)
+    print(f"✓ Built related jobs index: {stats['titles']} titles x {stats['k']} neighbors "
+          f"in {stats['build_ms']:.0f} ms")
+
     return embeddings_data
 
 if __name__ == '__main__':
-    precompute_embeddings()
+    parser = argparse.ArgumentParser(description='Precompute job title embeddings (optionally with PCA)')
+    parser.add_argument('--pca-dim', type=int, default=0, help='Store a PCA projection to this dimension (0 = none)')
+    parser.add_argument('--reuse', action='store_true', help='Reuse the embeddings in the existing file')
+    parser.add_argument('--evaluate', default=None, help='Comma-separated PCA dimensions to report on; writes nothing')
+    parser.add_argument('--k', type=int, default=10, help='Neighbors for recall@k')
+    args = parser.parse_args()
 
+    if args.evaluate:
+        if not args.reuse:
+            parser.error('--evaluate needs --reuse (it reports on the existing file)')
+        with open(EMBEDDINGS_FILE, 'rb') as f:
+            embeddings = pickle.load(f)['embeddings']
+        print(f"PCA trade-off for {embeddings.shape[0]} titles x {embeddings.shape[1]} dimensions:")
+        print_report([evaluate_pca(embeddings, fit_pca(embeddings, int(dim)), k=args.k)
+                      for dim in args.evaluate.split(',')], args.k)
+    else:
+        precompute_embeddings(pca_dim=args.pca_dim, reuse=args.reuse, k=args.k)
@@ -0,0 +1,275 @@
+"""
+Compiled prompts for the premium fortune, with token accounting.
+
+The fortune prompt is split into a static part (persona and the JSON format
+spec) and a dynamic part (the user's profile and job data). The static part
+is rendered once per variant and sent as the system message, byte-identical
+on every call, so provider-side prompt caching can reuse it; only the short
+dynamic block changes per request. Two variants exist:
+- full: the original wording
+- compact: the same fields and constraints as a terse schema (about half the tokens)
+
+Token counts use tiktoken when it is installed and a characters/4 estimate
+otherwise. The encoding is loaded on the first count, not at import (it may be
+downloaded, which would stall server startup); PROMPT_TOKENIZER=estimate skips
+tiktoken entirely, e.g. on an offline host. PromptStats records each call's prompt size, cached tokens and
+latency so the effect of prompt size on LLM latency can be measured.
+
+Usage:
+    python prompt_templates.py    # Token counts of both variants for a sample profile
+"""
+
+import hashlib
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+PROMPT_VARIANTS = ('full', 'compact')
+
+_PERSONA = ("You are a mystical AI fortune teller specializing in career futures. You provide "
+            "insightful, actionable advice in an engaging, slightly mystical tone while being "
+            "grounded in real data and trends. Format responses as JSON.")
+
+_FULL_SPEC = """As a mystical AI fortune teller, analyze the user's career future against AI disruption, using the profile, job market data and resilience score they provide.
+
+Generate a comprehensive fortune in JSON format with:
+
+1. **narrative** (string): A 250-word mystical prophecy that:
+   - Opens with a cosmic/mystical hook
+   - Explains their current position in the AI age
+   - Highlights both opportunities and challenges
+   - Ends with an empowering call to action
+   - Maintains a balance of mysticism and practical insight
+
+2. **strategies** (array of 3-4 objects): Actionable career strategies, each with:
+   - title: Short, compelling strategy name
+   - description: Detailed 2-3 sentence explanation
+   - timeline: Realistic timeframe (e.g., "3-6 months", "1-2 years")
+   - difficulty: "Easy", "Moderate", or "Challenging"
+   - impact: "High", "Medium", or "Low"
+
+3. **key_insights** (array of 3-5 strings): Critical insights about their career path
+
+4. **timeline** (object): Key milestones with:
+   - next_3_months: Immediate actions
+   - next_year: Medium-term goals
+   - next_3_years: Long-term vision
+
+5. **resources** (array of 5-7 strings): Specific resources (courses, certifications, communities)
+
+6. **warnings** (array of 2-3 strings): Things to watch out for or avoid
+
+7. **opportunities** (array of 3-4 strings): Emerging opportunities in their field
+
+8. **nft_description** (string): Creative 1-sentence description for their NFT artwork (e.g., "A battle-hardened accountant as a cyberpunk phoenix rising from spreadsheets")
+
+Make it personal, insightful, and actionable. Use their specific job title and industry in recommendations."""
+
+_COMPACT_SPEC = """Analyze the user's career future against AI disruption from their data. Reply with one JSON object:
+narrative: str, ~250 words, mystical hook -> position in the AI age -> opportunities and challenges -> empowering call to action
+strategies: 3-4 of {title, description (2-3 sentences), timeline (e.g. "3-6 months"), difficulty: Easy|Moderate|Challenging, impact: High|Medium|Low}
+key_insights: 3-5 str
+timeline: {next_3_months, next_year, next_3_years}
+resources: 5-7 str (courses, certifications, communities)
+warnings: 2-3 str
+opportunities: 3-4 str
+nft_description: str, 1 creative sentence
+Be personal and actionable; name their job title and industry."""
+
+
+def _money(value: Any) -> str:
+    return f"${value:,.0f}" if isinstance(value, (int, float)) else 'N/A'
+
+
+def _full_profile(user_profile: Dict[str, Any], job_data: Dict[str, Any],
+                  resilience_score: Dict[str, Any]) -> str:
+    return f"""**User Profile:**
+- Occupation: {user_profile.get('role', 'Unknown')}
+- Experience: {user_profile.get('experience', 'Unknown')}
+- Skills: {', '.join(user_profile.get('skills', []))}
+- Industry: {user_profile.get('industry', 'Unknown')}
+- Age Range: {user_profile.get('age', 'Unknown')}
+
+**Job Market Data (2024-2030):**
+- AI Automation Risk: {job_data.get('ai_automation_risk', 'N/A')}%
+- Job Growth Projection: {job_data.get('job_growth_projection', 'N/A')}%
+- Required Skills Adaptation: {job_data.get('required_skills_adaptation', 'Unknown')}
+- Current Avg Salary: {_money(job_data.get('avg_salary_2024'))}
+- Projected 2030 Salary: {_money(job_data.get('projected_salary_2030'))}
+
+**Calculated Resilience:**
+- Score: {resilience_score.get('score', 'N/A')}/100
+- Risk Level: {resilience_score.get('risk_level', 'Unknown')}
+- Outlook: {resilience_score.get('outlook', 'Unknown')}"""
+
+
+def _round(value: Any, digits: int = 1) -> Any:
+    return round(value, digits) if isinstance(value, float) else value
+
+
+def _compact_profile(user_profile: Dict[str, Any], job_data: Dict[str, Any],
+                     resilience_score: Dict[str, Any]) -> str:
+    return (
+        f"Occupation: {user_profile.get('role', 'Unknown')}; industry {user_profile.get('industry', 'Unknown')}; "
+        f"experience {user_profile.get('experience', 'Unknown')}; age {user_profile.get('age', 'Unknown')}; "
+        f"skills {', '.join(user_profile.get('skills', [])) or 'none'}\n"
+        f"2024-2030: automation risk {_round(job_data.get('ai_automation_risk', 'N/A'))}%, "
+        f"growth {_round(job_data.get('job_growth_projection', 'N/A'))}%, "
+        f"education {job_data.get('required_skills_adaptation', 'Unknown')}, "
+        f"salary {_money(job_data.get('avg_salary_2024'))} -> {_money(job_data.get('projected_salary_2030'))}\n"
+        f"Resilience {resilience_score.get('score', 'N/A')}/100, risk {resilience_score.get('risk_level', 'Unknown')}, "
+        f"outlook {resilience_score.get('outlook', 'Unknown')}"
+    )
+
+
+def _get_encoding():
+    """The tiktoken encoding, loaded on first use; None if unavailable or disabled"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                if os.environ.get('PROMPT_TOKENIZER', 'tiktoken').lower() != 'estimate':
+                    try:
+                        import tiktoken
+                        _encoding = tiktoken.get_encoding('o200k_base')
+                    except Exception:  # not installed, or the encoding can't be downloaded
+                        _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def tokenizer() -> str:
+    """Name of the token counter in use"""
+    return 'tiktoken/o200k_base' if _get_encoding() is not None else 'estimate'
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text (tiktoken if available, else ~4 characters per token)"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text) // 4) if text else 0
+
+
+@dataclass
+class CompiledPrompt:
+    messages: List[Dict[str, str]]
+    variant: str
+    static_tokens: int
+    dynamic_tokens: int
+    prefix_hash: str
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self.static_tokens + self.dynamic_tokens
+
+
+class FortunePrompt:
+    """Renders the static prefix once and only the profile block per request"""
+
+    _RENDERERS = {'full': (_FULL_SPEC, _full_profile), 'compact': (_COMPACT_SPEC, _compact_profile)}
+
+    def __init__(self, variant: str = 'full'):
+        if variant not in PROMPT_VARIANTS:
+            raise ValueError(f"Unknown prompt variant: {variant} (expected one of {PROMPT_VARIANTS})")
+        self.variant = variant
+        spec, self._render_profile = self._RENDERERS[variant]
+        # Never formatted per request, so the bytes (and any provider cache key) stay fixed
+        self.static = f"{_PERSONA}\n\n{spec}"
+        self.static_tokens = count_tokens(self.static)
+        self.prefix_hash = hashlib.sha256(self.static.encode()).hexdigest()[:12]
+
+    def compile(self, user_profile: Dict[str, Any], job_data: Dict[str, Any],
+                resilience_score: Dict[str, Any]) -> CompiledPrompt:
+        dynamic = self._render_profile(user_profile, job_data, resilience_score)
+        return CompiledPrompt(
+            messages=[{'role': 'system', 'content': self.static},
+                      {'role': 'user', 'content': dynamic}],
+            variant=self.variant,
+            static_tokens=self.static_tokens,
+            dynamic_tokens=count_tokens(dynamic),
+            prefix_hash=self.prefix_hash,
+        )
+
+
+class PromptStats:
+    """Rolling record of prompt size, cache hits and LLM latency"""
+
+    # Prompt-token buckets for the latency-by-size breakdown
+    BUCKETS = (250, 500, 1000, 2000, 4000)
+
+    def __init__(self, window: int = 1000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, prompt: CompiledPrompt, latency: float, usage: Any = None):
+        """
+        Args:
+            prompt: The compiled prompt that was sent
+            latency: Seconds the LLM call took
+            usage: The response's usage object, if the provider returned one
+        """
+        prompt_tokens = getattr(usage, 'prompt_tokens', None) or prompt.prompt_tokens
+        details = getattr(usage, 'prompt_tokens_details', None)
+        sample = {
+            'variant': prompt.variant,
+            'prompt_tokens': prompt_tokens,
+            'estimated_tokens': prompt.prompt_tokens,
+            'cached_tokens': getattr(details, 'cached_tokens', None) or 0,
+            'completion_tokens': getattr(usage, 'completion_tokens', None) or 0,
+            'latency': latency,
+        }
+        with self._lock:
+            self._samples.append(sample)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples)
+        by_bucket: Dict[str, List[float]] = {}
+        for s in samples:
+            bound = next((b for b in self.BUCKETS if s['prompt_tokens'] <= b), None)
+            label = f"<={bound}" if bound else f">{self.BUCKETS[-1]}"
+            by_bucket.setdefault(label, []).append(s['latency'])
+
+        def latency_ms(values: List[float]) -> Dict[str, float]:
+            values = sorted(values)
+            return {
+                'count': len(values),
+                'mean': round(sum(values) / len(values) * 1000, 1),
+                'p50': round(values[len(values) // 2] * 1000, 1),
+                'p95': round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 1),
+            }
+
+        total_prompt = sum(s['prompt_tokens'] for s in samples)
+        return {
+            'tokenizer': tokenizer(),
+            'calls': len(samples),
+            'variants': sorted({s['variant'] for s in samples}),
+            'avg_prompt_tokens': round(total_prompt / len(samples), 1) if samples else 0.0,
+            'avg_completion_tokens': round(sum(s['completion_tokens'] for s in samples) / len(samples), 1)
+                                     if samples else 0.0,
+            'cached_token_share': round(sum(s['cached_tokens'] for s in samples) / total_prompt, 3)
+                                  if total_prompt else 0.0,
+            'latency_by_prompt_tokens': {label: latency_ms(values) for label, values in by_bucket.items()},
+        }
+
+
+if __name__ == '__main__':
+    profile = {'role': 'Accountant', 'experience': 'mid-career', 'skills': ['data-analysis'],
+               'industry': 'Finance', 'age': '36-45'}
+    job = {'ai_automation_risk': 72.4, 'job_growth_projection': -8.3,
+           'required_skills_adaptation': "Bachelor's Degree",
+           'avg_salary_2024': 78000.0, 'projected_salary_2030': 78000.0}
+    score = {'score': 41.2, 'risk_level': 'medium', 'outlook': 'neutral'}
+
+    print(f"Tokenizer: {tokenizer()}")
+    for variant in PROMPT_VARIANTS:
+        prompt = FortunePrompt(variant).compile(profile, job, score)
+        print(f"  {variant:8s} static {prompt.static_tokens:4d} + dynamic {prompt.dynamic_tokens:3d} "
+              f"= {prompt.prompt_tokens:4d} tokens (prefix {prompt.prefix_hash})")
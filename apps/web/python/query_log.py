@@ -0,0 +1,131 @@
+"""
+Sampled, append-only log of suggestion queries and free-fortune answers.
+
+Handlers call `record()`, which only samples and enqueues; a background
+thread appends the entries to a local JSON-lines file, so no request waits on
+disk. The file is rotated to `<path>.1` past a size cap. After a deploy or a
+dataset reload, `top()` returns the most frequent logged entries so they can
+be replayed to fill the search and fortune caches before readiness goes green.
+
+Environment:
+    QUERY_LOG_PATH         JSON-lines file (default data/query_log.jsonl)
+    QUERY_LOG_SAMPLE_RATE  Fraction of requests logged (default 0.1; 0 disables)
+    QUERY_LOG_MAX_BYTES    Size at which the file is rotated (default 8 MB)
+"""
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), 'data', 'query_log.jsonl')
+
+
+class QueryLog:
+    """Samples request parameters and appends them to disk off the request path"""
+
+    def __init__(self, path: str = DEFAULT_PATH, sample_rate: float = 0.1,
+                 max_bytes: int = 8 << 20, max_pending: int = 10000):
+        """
+        Args:
+            path: JSON-lines file (created if missing)
+            sample_rate: Fraction of record() calls that are kept
+            max_bytes: Rotate to path + '.1' once the file reaches this size
+            max_pending: Entries buffered for the writer; beyond this they are dropped
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.written = 0
+        self.dropped = 0
+        self._writer: Optional[threading.Thread] = None
+        if self.enabled:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._writer = threading.Thread(target=self._write_loop, name='query-log', daemon=True)
+            self._writer.start()
+
+    @classmethod
+    def from_env(cls) -> 'QueryLog':
+        return cls(
+            path=os.environ.get('QUERY_LOG_PATH', DEFAULT_PATH),
+            sample_rate=float(os.environ.get('QUERY_LOG_SAMPLE_RATE', '0.1')),
+            max_bytes=int(os.environ.get('QUERY_LOG_MAX_BYTES', str(8 << 20))),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and self.sample_rate > 0
+
+    def record(self, kind: str, params: Dict[str, Any]):
+        """Maybe log one request; never blocks"""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return
+        try:
+            self._pending.put_nowait({'ts': round(time.time(), 3), 'kind': kind, 'params': params})
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            # Drain whatever else is waiting so a burst costs one write
+            while len(batch) < 1000:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._rotate_if_full()
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(entry, sort_keys=True) + '\n' for entry in batch))
+                self.written += len(batch)
+            except OSError as e:
+                self.dropped += len(batch)
+                print(f"⚠ Could not write query log {self.path}: {e}")
+
+    def _rotate_if_full(self):
+        try:
+            if os.path.getsize(self.path) >= self.max_bytes:
+                os.replace(self.path, self.path + '.1')
+        except OSError:
+            pass  # Not created yet
+
+    def top(self, kind: str, n: int) -> List[Dict[str, Any]]:
+        """
+        Most frequently logged parameters of one kind, most frequent first.
+
+        Args:
+            kind: 'suggestions' or 'fortune'
+            n: Maximum number of distinct entries
+
+        Returns:
+            Parameter dicts as passed to record()
+        """
+        counts: Counter = Counter()
+        for path in (self.path + '.1', self.path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue  # Torn line from a crash mid-write
+                        if entry.get('kind') == kind:
+                            counts[json.dumps(entry.get('params'), sort_keys=True)] += 1
+            except OSError:
+                continue
+        return [json.loads(params) for params, _ in counts.most_common(n)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'pending': self._pending.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+        }
@@ -0,0 +1,172 @@
+"""
+Precomputed k-nearest-neighbor graph over job title embeddings.
+
+The neighbor list of every title is computed once from job_embeddings.pkl with
+blocked matrix multiplies: each block of rows is scored against all titles in
+one BLAS call (multi-threaded by NumPy's BLAS), so peak memory is
+block_size x n similarities rather than n x n. The result is stored as compact
+arrays in job_related.npz, and "related careers" is a row lookup.
+
+Usage:
+    python related_jobs.py                 # Build job_related.npz (k=10)
+    python related_jobs.py --k 20 --block-size 512
+"""
+
+import argparse
+import os
+import pickle
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_EMBEDDINGS = os.path.join(PYTHON_DIR, 'job_embeddings.pkl')
+DEFAULT_INDEX = os.path.join(PYTHON_DIR, 'job_related.npz')
+
+
+def build_knn(embeddings: np.ndarray, k: int = 10,
+              block_size: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k cosine neighbors of every row, excluding the row itself.
+
+    Args:
+        embeddings: (n, dim) matrix
+        k: Neighbors kept per row
+        block_size: Rows scored per matrix multiply; bounds peak memory
+
+    Returns:
+        (indices, scores): (n, k) neighbor row numbers, best first, and their
+        cosine similarities
+    """
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
+    n = len(vectors)
+    k = min(k, n - 1)
+
+    index_dtype = np.int16 if n <= np.iinfo(np.int16).max else np.int32
+    indices = np.empty((n, k), dtype=index_dtype)
+    scores = np.empty((n, k), dtype=np.float32)
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        sims = vectors[start:stop] @ vectors.T  # (block, n)
+        sims[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        top = np.argpartition(sims, -k, axis=1)[:, -k:]
+        top_scores = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        indices[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+    return indices, scores
+
+
+def build_related_index(embeddings_file: str = DEFAULT_EMBEDDINGS,
+                        index_file: str = DEFAULT_INDEX,
+                        k: int = 10, block_size: int = 256) -> Dict[str, float]:
+    """
+    Build the neighbor graph from precomputed embeddings and save it.
+
+    Returns:
+        Build statistics (titles, k, build_ms, file size)
+    """
+    with open(embeddings_file, 'rb') as f:
+        data = pickle.load(f)
+    titles = list(data['job_titles'])
+
+    start = time.perf_counter()
+    indices, scores = build_knn(data['embeddings'], k=k, block_size=block_size)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Written aside and renamed, so a concurrent reader never sees half a file
+    # (each snapshot build may rebuild it)
+    tmp_file = f"{index_file}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+    try:
+        np.savez_compressed(tmp_file, titles=np.array(titles, dtype=str), indices=indices,
+                            scores=scores.astype(np.float16))
+        os.replace(tmp_file, index_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    return {
+        'titles': len(titles),
+        'k': indices.shape[1],
+        'build_ms': round(build_ms, 1),
+        'file_kb': round(os.path.getsize(index_file) / 1024, 1),
+    }
+
+
+class RelatedJobs:
+    """Serves precomputed neighbor lists"""
+
+    def __init__(self, index_file: str = DEFAULT_INDEX):
+        with np.load(index_file) as data:
+            self.titles = data['titles'].tolist()
+            self.indices = data['indices']
+            self.scores = data['scores']
+        self.k = self.indices.shape[1]
+        self.row_by_title = {title.lower(): i for i, title in enumerate(self.titles)}
+
+    def related(self, job_title: str, k: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        Most similar titles to job_title (case-insensitive).
+
+        Args:
+            job_title: Title to look up
+            k: Neighbors to return (at least 1; capped at the index's k)
+
+        Returns:
+            List of {'job_title', 'similarity'} best first, or None for an unknown title
+        """
+        if k is not None and k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        row = self.row_by_title.get(job_title.strip().lower())
+        if row is None:
+            return None
+        k = self.k if k is None else min(k, self.k)
+        return [
+            {'job_title': self.titles[i], 'similarity': round(float(s) * 100, 1)}
+            for i, s in zip(self.indices[row, :k], self.scores[row, :k])
+        ]
+
+    def canonical_title(self, job_title: str) -> Optional[str]:
+        row = self.row_by_title.get(job_title.strip().lower())
+        return None if row is None else self.titles[row]
+
+
+def load_related_jobs(embeddings_file: str = DEFAULT_EMBEDDINGS,
+                      index_file: str = DEFAULT_INDEX, k: int = 10) -> Optional[RelatedJobs]:
+    """
+    Load the neighbor index, building it first if it is missing or older than
+    the embeddings. Returns None when there are no embeddings to build from.
+    """
+    if not os.path.exists(embeddings_file):
+        if not os.path.exists(index_file):
+            print("⚠ No embeddings found, related jobs unavailable. Run precompute_embeddings.py")
+            return None
+    elif (not os.path.exists(index_file) or
+          os.path.getmtime(index_file) < os.path.getmtime(embeddings_file)):
+        print("Building related jobs index...")
+        stats = build_related_index(embeddings_file, index_file, k=k)
+        print(f"✓ Built related jobs index: {stats['titles']} titles x {stats['k']} neighbors "
+              f"in {stats['build_ms']:.0f} ms ({stats['file_kb']:.0f} KB)")
+    return RelatedJobs(index_file)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the related jobs neighbor index')
+    parser.add_argument('--embeddings', default=DEFAULT_EMBEDDINGS)
+    parser.add_argument('--output', default=DEFAULT_INDEX)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--block-size', type=int, default=256)
+    args = parser.parse_args()
+
+    stats = build_related_index(args.embeddings, args.output, k=args.k, block_size=args.block_size)
+    print(f"✓ {stats['titles']} titles x {stats['k']} neighbors in {stats['build_ms']:.0f} ms "
+          f"-> {args.output} ({stats['file_kb']:.0f} KB)")
+
+    related = RelatedJobs(args.output)
+    sample = related.titles[0]
+    print(f"  Related to {sample!r}: {[r['job_title'] for r in related.related(sample, 5)]}")
@@ -0,0 +1,200 @@
+"""
+On-demand per-request profiling for the Flask API.
+
+A request is profiled when an admin asks for it (X-Profile header plus a valid
+X-Admin-Token) or when it falls in the configured sample of live traffic.
+Two profilers are available:
+- cprofile: deterministic, every call timed; writes a .pstats dump
+  (open with `python -m pstats` or snakeviz)
+- sampling: a background thread snapshots the request thread's stack every
+  few milliseconds; writes collapsed stacks (.folded) for flamegraph.pl,
+  speedscope or inferno. Overhead is low enough for sampled live traffic.
+
+Configuration (env):
+    PROFILE_DIR          Output directory (default: ./profiles)
+    PROFILE_SAMPLE_RATE  Fraction of requests profiled without asking (default 0)
+    PROFILE_MODE         Profiler for sampled traffic: sampling | cprofile
+    PROFILE_INTERVAL_MS  Sampling interval (default 5)
+    PROFILE_PATHS        Comma-separated path prefixes eligible for profiling
+"""
+
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from flask import Flask, g, request
+
+PROFILE_MODES = ('cprofile', 'sampling')
+
+
+class SamplingProfiler:
+    """Periodically records one thread's stack as collapsed frames"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """
+        Args:
+            thread_id: threading.get_ident() of the thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+            self.samples += 1
+
+    def write_folded(self, path: str):
+        """One 'frame;frame;frame count' line per distinct stack"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfiler:
+    """Decides which requests to profile and writes one output file per request"""
+
+    def __init__(self, output_dir: str, sample_rate: float = 0.0, mode: str = 'sampling',
+                 interval_ms: float = 5.0, paths: Optional[List[str]] = None):
+        """
+        Args:
+            output_dir: Directory for .pstats/.folded files (created on first write)
+            sample_rate: Fraction of eligible requests profiled without an admin header
+            mode: Profiler used for sampled requests, 'sampling' or 'cprofile'
+            interval_ms: Sampling profiler interval
+            paths: Path prefixes eligible for profiling (None = every path)
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {PROFILE_MODES})")
+        self.output_dir = Path(output_dir)
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.interval = interval_ms / 1000
+        self.paths = paths
+        # cProfile can only run one profile at a time on newer Pythons; requests
+        # that arrive while one is active are simply not profiled
+        self._cprofile_lock = threading.Lock()
+        self.profiled = 0
+        self.skipped_busy = 0
+
+    @classmethod
+    def from_env(cls) -> 'RequestProfiler':
+        paths = os.environ.get('PROFILE_PATHS', '/api/job-suggestions,/api/fortune/free')
+        return cls(
+            output_dir=os.environ.get('PROFILE_DIR', str(Path(__file__).parent / 'profiles')),
+            sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', '0')),
+            mode=os.environ.get('PROFILE_MODE', 'sampling'),
+            interval_ms=float(os.environ.get('PROFILE_INTERVAL_MS', '5')),
+            paths=[p.strip() for p in paths.split(',') if p.strip()] or None,
+        )
+
+    def choose_mode(self, requested: Optional[str], is_admin: bool) -> Optional[str]:
+        """Profiler to use for this request, or None"""
+        if self.paths is not None and not any(request.path.startswith(p) for p in self.paths):
+            return None
+        if requested and is_admin:
+            return requested if requested in PROFILE_MODES else self.mode
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+    def start(self, mode: str) -> Optional[Dict]:
+        """Begin profiling the current thread; None if cProfile is already busy"""
+        session = {'mode': mode, 'started': time.perf_counter()}
+        if mode == 'cprofile':
+            if not self._cprofile_lock.acquire(blocking=False):
+                self.skipped_busy += 1
+                return None
+            session['profiler'] = cProfile.Profile()
+            session['profiler'].enable()
+        else:
+            session['profiler'] = SamplingProfiler(threading.get_ident(), self.interval)
+            session['profiler'].start()
+        return session
+
+    def finish(self, session: Dict, label: str) -> str:
+        """Stop profiling and write the output file; returns its path"""
+        profiler = session['profiler']
+        if session['mode'] == 'cprofile':
+            profiler.disable()
+            self._cprofile_lock.release()
+        else:
+            profiler.stop()
+
+        elapsed_ms = (time.perf_counter() - session['started']) * 1000
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{elapsed_ms:.0f}ms-{uuid.uuid4().hex[:6]}"
+        if session['mode'] == 'cprofile':
+            path = self.output_dir / f"{name}.pstats"
+            profiler.dump_stats(str(path))
+        else:
+            path = self.output_dir / f"{name}.folded"
+            profiler.write_folded(str(path))
+        self.profiled += 1
+        return str(path)
+
+    def stats(self) -> Dict:
+        return {
+            'mode': self.mode,
+            'sample_rate': self.sample_rate,
+            'output_dir': str(self.output_dir),
+            'profiled': self.profiled,
+            'skipped_busy': self.skipped_busy,
+        }
+
+    def init_app(self, app: Flask, is_admin: Callable[[], bool]):
+        """
+        Register request hooks on a Flask app.
+
+        Args:
+            app: Flask application
+            is_admin: Returns True when the current request carries a valid admin token
+        """
+        @app.before_request
+        def _start_profile():
+            requested = request.headers.get('X-Profile')
+            mode = self.choose_mode(requested, bool(requested) and is_admin())
+            if mode is not None:
+                g.profile_session = self.start(mode)
+
+        @app.after_request
+        def _finish_profile(response):
+            session = g.pop('profile_session', None)
+            if session is not None:
+                label = request.path.strip('/').replace('/', '_') or 'root'
+                path = self.finish(session, label)
+                response.headers['X-Profile-Output'] = os.path.basename(path)
+            return response
+
+        @app.teardown_request
+        def _abort_profile(exc):
+            # after_request doesn't run for unhandled errors; still release the profiler
+            session = g.pop('profile_session', None)
+            if session is not None:
+                self.finish(session, 'error')
@@ -0,0 +1,198 @@
+"""
+Pre-serialized job suggestion fragments.
+
+The static part of a suggestion (title, industry, location, automation risk,
+growth projection) never changes between requests, so it is serialized once
+per row and cached as bytes. A response is assembled by splicing each cached
+fragment together with the per-query confidence and match method. orjson is
+used for the one-time serialization when installed.
+
+Usage:
+    python response_fragments.py   # Serialization CPU per request, before/after
+"""
+
+import json
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from dataset_aggregates import COLUMNS
+
+try:
+    import orjson
+
+    JSON_BACKEND = 'orjson'
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    JSON_BACKEND = 'json'
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _column(df: pd.DataFrame, field: str) -> Optional[str]:
+    for name in COLUMNS[field]:
+        if name in df.columns:
+            return name
+    return None
+
+
+def _strings(df: pd.DataFrame, field: str) -> np.ndarray:
+    name = _column(df, field)
+    if name is None:
+        return np.full(len(df), 'Unknown', dtype=object)
+    return df[name].astype(str).to_numpy(dtype=object)
+
+
+def _numbers(df: pd.DataFrame, field: str) -> Optional[np.ndarray]:
+    name = _column(df, field)
+    if name is None:
+        return None
+    return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _number(value: float) -> bytes:
+    # repr() is what json.dumps emits for finite floats
+    return repr(value).encode('ascii') if math.isfinite(value) else b'null'
+
+
+class SuggestionFragments:
+    """Per-row JSON fragments for /api/job-suggestions responses"""
+
+    def __init__(self, df: pd.DataFrame, facets):
+        """
+        Extract the suggestion fields and serialize the first row of every title.
+
+        Args:
+            df: Job market DataFrame (current or legacy column names)
+            facets: FacetIndex for the same DataFrame (title -> row positions)
+        """
+        start = time.perf_counter()
+        self.facets = facets
+        self._titles = _strings(df, 'job_title')
+        self._industry = _strings(df, 'industry')
+        self._location = _strings(df, 'location')
+
+        risk = _numbers(df, 'automation_risk')
+        self._risk = np.zeros(len(df)) if risk is None else np.nan_to_num(risk)
+        openings_2024 = _numbers(df, 'openings_2024')
+        openings_2030 = _numbers(df, 'openings_2030')
+        self._growth = np.zeros(len(df))
+        if openings_2024 is not None and openings_2030 is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                growth = (openings_2030 - openings_2024) / openings_2024 * 100
+            self._growth = np.round(np.where(openings_2024 > 0, np.nan_to_num(growth), 0.0), 2)
+
+        # Row position -> serialized static fields without the enclosing braces.
+        # Filtered searches may hydrate other rows; those are added on first use.
+        self._fragments: Dict[int, bytes] = {}
+        for title in facets.job_titles:
+            self.fragment(self.position(title))
+        self._methods: Dict[str, bytes] = {}
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    def position(self, job_title: str, row_mask: Optional[np.ndarray] = None) -> int:
+        """Row used to describe a title: its first row passing row_mask"""
+        positions = self.facets.title_rows(job_title, row_mask)
+        if len(positions) == 0:
+            positions = self.facets.title_rows(job_title)
+        return int(positions[0])
+
+    def fields(self, position: int) -> Dict[str, Any]:
+        """Static suggestion fields of one row"""
+        return {
+            'job_title': str(self._titles[position]),
+            'industry': str(self._industry[position]),
+            'location': str(self._location[position]),
+            'automation_risk': float(self._risk[position]),
+            'growth_projection': float(self._growth[position]),
+        }
+
+    def fragment(self, position: int) -> bytes:
+        """Cached serialized fields of one row, e.g. b'"job_title":"Nurse",...'"""
+        fragment = self._fragments.get(position)
+        if fragment is None:
+            fragment = dumps_bytes(self.fields(position))[1:-1]
+            self._fragments[position] = fragment
+        return fragment
+
+    def _method(self, method: str) -> bytes:
+        encoded = self._methods.get(method)
+        if encoded is None:
+            encoded = dumps_bytes(method)
+            self._methods[method] = encoded
+        return encoded
+
+    def render(self, results: List[Tuple[int, float, str]]) -> bytes:
+        """
+        Assemble a suggestions response body.
+
+        Args:
+            results: (row_position, confidence, match_method) tuples in rank order
+
+        Returns:
+            UTF-8 JSON: {"suggestions": [...], "total_matches": N}
+        """
+        items = [
+            b'{' + self.fragment(position) + b',"confidence":' + _number(float(confidence)) +
+            b',"match_method":' + self._method(method) + b'}'
+            for position, confidence, method in results
+        ]
+        return (b'{"suggestions":[' + b','.join(items) +
+                b'],"total_matches":' + str(len(items)).encode('ascii') + b'}')
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and build cost"""
+        return {
+            'backend': JSON_BACKEND,
+            'fragments': len(self._fragments),
+            'memory_kb': round(sum(len(f) for f in self._fragments.values()) / 1024, 1),
+            'build_ms': round(self.build_ms, 1),
+        }
+
+
+if __name__ == '__main__':
+    import random
+
+    from kaggle_data_loader import JobMarketDataLoader
+
+    loader = JobMarketDataLoader()
+    loader.load_dataset()
+    fragments = SuggestionFragments(loader.df, loader.facets)
+    print(f"Built {fragments.stats()['fragments']} fragments in {fragments.build_ms:.1f} ms "
+          f"(backend: {JSON_BACKEND})")
+
+    rng = random.Random(0)
+    titles = loader.facets.job_titles
+    requests = [
+        [(title, rng.uniform(40, 100), rng.choice(('fuzzy', 'vector', 'alias', 'spell')))
+         for title in rng.sample(titles, 6)]
+        for _ in range(2000)
+    ]
+
+    def baseline(results):
+        # The previous path: hydrate dicts per request, then json.dumps the payload
+        suggestions = []
+        for title, confidence, method in results:
+            row = fragments.fields(fragments.position(title))
+            row['confidence'] = float(confidence)
+            row['match_method'] = method
+            suggestions.append(row)
+        return json.dumps({'suggestions': suggestions, 'total_matches': len(suggestions)}).encode()
+
+    def spliced(results):
+        return fragments.render([(fragments.position(title), confidence, method)
+                                 for title, confidence, method in results])
+
+    assert json.loads(baseline(requests[0])) == json.loads(spliced(requests[0]))
+    for name, build in (('dicts + json.dumps', baseline), ('spliced fragments', spliced)):
+        cpu = time.process_time()
+        for results in requests:
+            build(results)
+        per_request = (time.process_time() - cpu) / len(requests) * 1e6
+        print(f"  {name:<20} {per_request:7.1f} µs CPU per request")
@@ -0,0 +1,286 @@
+"""
+Score a whole workforce CSV offline instead of one /api/fortune/free call per row.
+
+The input is read in chunks and each chunk is scored in a process pool. Every
+worker loads the dataset and search indexes once, resolves the chunk's
+distinct titles in one batch (HybridJobSearch.resolve_titles, memoized across
+chunks) and computes resilience scores and salary comparisons as array
+operations with the same weights as the API. Results are written in input
+order as chunks finish, and at most 2 x workers chunks are in memory at once.
+
+Only title resolution differs from the API. /api/fortune/free looks titles up
+with get_job_data() (exact title, then substring, then defaults); this script
+resolves them with hybrid search (aliases, spelling, fuzzy, vector). A
+verbatim dataset title scores the same in both. Anything else may resolve to a
+different job here: "Software Developer" becomes "Software engineer" through
+an alias, while the API falls back to default data. Rows whose match is below
+--min-confidence (and blank titles) get match_method 'none' and empty score
+columns instead of being scored against a guess.
+
+Input columns (same names as the quiz answers; all but job_title optional):
+    job_title, current_salary, experience, education, ai_skills
+
+Usage:
+    python score_workforce.py employees.csv scores.csv
+    python score_workforce.py employees.csv scores.jsonl --workers 8 --chunksize 5000
+    python score_workforce.py employees.csv scores.csv --workers 0   # in-process
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from kaggle_data_loader import (EXPERIENCE_BONUSES, SALARY_RANGES, VALUABLE_SKILLS,
+                                JobMarketDataLoader)
+
+INPUT_COLUMNS = ['job_title', 'current_salary', 'experience', 'education', 'ai_skills']
+
+# Vector matches score every title against something (cosine x 100); below this
+# a match is treated as no match
+DEFAULT_MIN_CONFIDENCE = 50.0
+
+
+class WorkforceScorer:
+    """Scores DataFrames of quiz answers against one loaded dataset"""
+
+    def __init__(self, fuzzy_threshold: float = 85.0, min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        from hybrid_job_search import HybridJobSearch
+
+        self.loader = JobMarketDataLoader()
+        self.loader.load_dataset()
+        self.search = HybridJobSearch(self.loader)
+        self.fuzzy_threshold = fuzzy_threshold
+        self.min_confidence = min_confidence
+        self.jobs = self._job_table(self.loader.df)
+        # Raw title -> (matched title, confidence, method); survives across chunks
+        self._resolved: Dict[str, Optional[tuple]] = {}
+
+    @staticmethod
+    def _job_table(df: pd.DataFrame) -> pd.DataFrame:
+        """Per-title metrics from the title's first row, as get_job_data() reads them"""
+        def col(*names):
+            return next(name for name in names if name in df.columns)
+
+        first = df.drop_duplicates(subset=col('Job Title', 'Job_Title'))
+        openings_2024 = first[col('Job Openings (2024)', 'Job_Openings_2024')].to_numpy(dtype=np.float64)
+        openings_2030 = first[col('Projected Openings (2030)', 'Projected_Openings_2030')].to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = np.where(openings_2024 > 0, (openings_2030 - openings_2024) / openings_2024 * 100, 0.0)
+        return pd.DataFrame({
+            'industry': first['Industry'].astype(str).to_numpy(),
+            'automation_risk': first[col('Automation Risk (%)', 'AI_Automation_Risk')].to_numpy(dtype=np.float64),
+            'growth_projection': growth,
+            'market_median': first[col('Median Salary (USD)', 'Average_Salary_2024')].to_numpy(dtype=np.float64),
+        }, index=first[col('Job Title', 'Job_Title')].astype(str).to_numpy())
+
+    def resolve(self, titles: pd.Series) -> pd.DataFrame:
+        """
+        Matched title, confidence and method per row, resolving unseen titles in one batch.
+        Matches below min_confidence keep their confidence but no title, with method 'none'.
+        """
+        unseen = [t for t in titles.unique() if t not in self._resolved]
+        if unseen:
+            # resolve_titles logs nothing, but the model load does; keep it off the output
+            with contextlib.redirect_stdout(io.StringIO()):
+                matches = self.search.resolve_titles(unseen, self.fuzzy_threshold)
+            self._resolved.update(zip(unseen, matches))
+        matches = []
+        for title in titles:
+            match = self._resolved[title]
+            if match is None:
+                match = (None, 0.0, 'none')
+            elif match[1] < self.min_confidence:
+                match = (None, match[1], 'none')
+            matches.append(match)
+        return pd.DataFrame(matches, columns=['matched_title', 'match_confidence', 'match_method'],
+                            index=titles.index)
+
+    def score(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score one chunk of employees.
+
+        Args:
+            chunk: Rows with INPUT_COLUMNS (strings; missing optional columns are blank)
+
+        Returns:
+            The input columns followed by the match and score columns (empty
+            for unmatched rows)
+        """
+        for column in INPUT_COLUMNS:
+            if column not in chunk.columns:
+                chunk[column] = ''
+        matches = self.resolve(chunk['job_title'].fillna('').astype(str))
+        matched = (matches['match_method'] != 'none').to_numpy()
+        jobs = self.jobs.reindex(matches['matched_title'].to_numpy())  # NaN where unmatched
+        jobs.index = chunk.index
+        risk = jobs['automation_risk'].to_numpy()
+        growth = jobs['growth_projection'].to_numpy()
+        median = jobs['market_median'].to_numpy()
+
+        # calculate_resilience_score(), one skill per answer as in /api/fortune/free
+        experience = chunk['experience'].map(EXPERIENCE_BONUSES).fillna(0).to_numpy(dtype=np.float64)
+        skills = chunk['ai_skills'].isin(VALUABLE_SKILLS).to_numpy(dtype=np.float64)
+        score = np.clip(50 + (50 - risk) * 0.6 + growth * 0.4 + experience + skills * 5, 0, 100)
+        risk_level = np.select([score >= 70, score >= 40], ['low', 'medium'], 'high')
+        outlook = np.select([score >= 70, score >= 40], ['positive', 'neutral'], 'concerning')
+
+        # _calculate_salary_comparison()
+        midpoints = {key: r['mid'] for key, r in SALARY_RANGES.items()}
+        user_mid = chunk['current_salary'].map(midpoints).fillna(0).to_numpy(dtype=np.float64)
+        percentile = np.select(
+            [user_mid < median * 0.5, user_mid < median * 0.75, user_mid < median * 1.25, user_mid < median * 1.5],
+            [10, 25, 50, 75], 90)
+        comparison = np.select([user_mid > median, user_mid < median * 0.8], ['above', 'below'], 'at_market')
+
+        def only_matched(values, dtype=None):
+            column = pd.Series(values, index=chunk.index, dtype=dtype)
+            return column.where(matched, None if column.dtype == object else pd.NA)
+
+        return pd.concat([chunk, matches], axis=1).assign(
+            match_confidence=matches['match_confidence'].round(1),
+            matched_industry=jobs['industry'],
+            automation_risk=risk.round(1),
+            growth_projection=growth.round(1),
+            score=score.round(1),
+            risk_level=only_matched(risk_level, object),
+            outlook=only_matched(outlook, object),
+            market_median=median,
+            salary_percentile=only_matched(percentile, 'Int64'),
+            salary_comparison=only_matched(comparison, object),
+        )
+
+
+_worker: Optional[WorkforceScorer] = None
+
+
+def _init_worker(fuzzy_threshold: float, min_confidence: float):
+    global _worker
+    # Dataset/index loading chatter from every worker would drown the progress lines
+    sys.stdout = open(os.devnull, 'w')
+    _worker = WorkforceScorer(fuzzy_threshold, min_confidence)
+
+
+def _score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    return _worker.score(chunk)
+
+
+class _Writer:
+    """Appends scored chunks to a CSV (header once) or JSONL file"""
+
+    def __init__(self, path: str, fmt: str):
+        self.fmt = fmt
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.header = True
+
+    def write(self, df: pd.DataFrame):
+        if self.fmt == 'jsonl':
+            lines = df.to_json(orient='records', lines=True, force_ascii=False)
+            self.file.write(lines if lines.endswith('\n') else lines + '\n')
+        else:
+            df.to_csv(self.file, header=self.header, index=False)
+            self.header = False
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def _chunks(source: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False):
+        if 'job_title' not in chunk.columns:
+            raise ValueError(f"{source} has no job_title column (found: {list(chunk.columns)})")
+        yield chunk
+
+
+def score_workforce(source: str, destination: str, workers: Optional[int] = None,
+                    chunksize: int = 2000, fmt: Optional[str] = None,
+                    fuzzy_threshold: float = 85.0,
+                    min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+                    verbose: bool = True) -> Dict[str, float]:
+    """
+    Score every row of source and write the results to destination.
+
+    Args:
+        source: Input CSV path
+        destination: Output path (.csv or .jsonl)
+        workers: Worker processes (default: CPU count); 0 scores in this process
+        chunksize: Rows per task
+        fmt: 'csv' or 'jsonl' (default: from destination's extension)
+        fuzzy_threshold: Fuzzy score below which titles fall back to vector search
+        min_confidence: Match confidence below which a row is left unscored
+        verbose: Print progress and throughput to stderr
+
+    Returns:
+        Stats: rows, unmatched (blank or below min_confidence), seconds, rows_per_sec
+    """
+    fmt = fmt or ('jsonl' if destination.endswith(('.jsonl', '.ndjson')) else 'csv')
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    writer = _Writer(destination, fmt)
+    start = time.perf_counter()
+    rows = unmatched = 0
+
+    def report(done: pd.DataFrame):
+        nonlocal rows, unmatched
+        writer.write(done)
+        rows += len(done)
+        unmatched += int((done['match_method'] == 'none').sum())
+        if verbose:
+            elapsed = time.perf_counter() - start
+            print(f"   {rows:,} rows scored ({rows / elapsed:,.0f} rows/s, {unmatched:,} unmatched)",
+                  file=sys.stderr)
+
+    try:
+        if workers == 0:
+            scorer = WorkforceScorer(fuzzy_threshold, min_confidence)
+            for chunk in _chunks(source, chunksize):
+                report(scorer.score(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(fuzzy_threshold, min_confidence)) as pool:
+                # Bounded window of in-flight chunks, drained in input order
+                pending = deque()
+                for chunk in _chunks(source, chunksize):
+                    pending.append(pool.submit(_score_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        report(pending.popleft().result())
+                while pending:
+                    report(pending.popleft().result())
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'unmatched': unmatched,
+        'seconds': round(seconds, 2),
+        'rows_per_sec': round(rows / seconds, 1) if seconds else 0.0,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Score a workforce CSV (job title, salary range, experience, ...)')
+    parser.add_argument('source', help='Input CSV with a job_title column')
+    parser.add_argument('destination', help='Output .csv or .jsonl')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (0 = in-process)')
+    parser.add_argument('--chunksize', type=int, default=2000, help='Rows per task')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default=None)
+    parser.add_argument('--fuzzy-threshold', type=float, default=85.0)
+    parser.add_argument('--min-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE,
+                        help='Leave rows whose title match is less confident than this unscored')
+    args = parser.parse_args()
+
+    stats = score_workforce(args.source, args.destination, workers=args.workers,
+                            chunksize=args.chunksize, fmt=args.format,
+                            fuzzy_threshold=args.fuzzy_threshold,
+                            min_confidence=args.min_confidence)
+    print(f"✓ Scored {stats['rows']:,} rows in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/s, {stats['unmatched']:,} unmatched) -> {args.destination}")
@@ -0,0 +1,145 @@
+"""
+Single-flight request coalescing.
+
+When identical requests arrive while the first one is still being computed,
+the duplicates wait for that computation and share its result instead of
+repeating it. SingleFlight serves threaded servers (Flask/werkzeug);
+AsyncSingleFlight does the same for coroutines on one asyncio event loop.
+Nothing is cached: once a call finishes, the next request computes afresh.
+"""
+
+import asyncio
+import json
+import re
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return _WHITESPACE.sub(' ', value).strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def flight_key(*parts: Any) -> str:
+    """Stable key from request parameters (whitespace-normalized, dict order ignored)"""
+    return json.dumps(_normalize(list(parts)), sort_keys=True, default=str)
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Counters:
+    def __init__(self):
+        self.executed = 0
+        self.coalesced = 0
+
+    def snapshot(self, in_flight: int) -> Dict[str, Any]:
+        total = self.executed + self.coalesced
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': in_flight,
+            'coalesce_rate': round(self.coalesced / total, 4) if total else 0.0,
+        }
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key across threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._counters = _Counters()
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Run fn(*args, **kwargs) unless a call with this key is already running.
+
+        Returns:
+            (result, shared): shared is True when the result came from another
+            thread's call. An exception raised by that call is re-raised here.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._counters.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._counters.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._counters.snapshot(len(self._calls))
+
+
+
+class AsyncSingleFlight:
+    """Coalesces concurrent coroutine calls with the same key on one event loop"""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._counters = _Counters()
+
+    async def do(self, key: str, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Await fn(*args, **kwargs) unless a call with this key is already pending.
+
+        The computation runs as its own task and every caller, the first one
+        included, awaits it through asyncio.shield: cancelling a caller only
+        stops that caller's wait, and the others still get the result.
+
+        Returns:
+            (result, shared), as for SingleFlight.do
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self._counters.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._calls[key] = task
+            self._counters.executed += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark retrieved so a failure whose callers all went away isn't logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._counters.snapshot(len(self._calls))
@@ -0,0 +1,155 @@
+"""
+Symmetric-delete spelling correction over the job title vocabulary.
+
+SymSpell-style index: every vocabulary word is stored under all the strings
+reachable by deleting up to `max_edit_distance` characters. A query token is
+corrected by generating its own deletes and looking them up, which costs a
+handful of hash probes instead of a scan over every title.
+"""
+
+import re
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from rapidfuzz.distance import DamerauLevenshtein
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split a title or query into word tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def title_key(text: str) -> str:
+    """Order-insensitive key, so 'chemical engineer' matches 'Engineer, chemical'"""
+    return ' '.join(sorted(tokenize(text)))
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings reachable from word by deleting up to max_distance characters"""
+    results = set()
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for candidate in frontier:
+            if len(candidate) <= 1:
+                continue
+            for i in range(len(candidate)):
+                next_frontier.add(candidate[:i] + candidate[i + 1:])
+        next_frontier -= results
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+class SymSpellIndex:
+    """Symmetric-delete index for correcting individual query tokens"""
+
+    def __init__(self, words: Iterable[str], max_edit_distance: int = 2,
+                 prefix_length: int = 7, min_word_length: int = 3):
+        """
+        Build the delete index.
+
+        Args:
+            words: Vocabulary tokens (repeats count as frequency for tie-breaks)
+            max_edit_distance: Largest edit distance a correction may have
+            prefix_length: Only the first N characters of a word are indexed,
+                which bounds the number of deletes per word
+            min_word_length: Shorter tokens (abbreviations like 'rn') are never corrected
+        """
+        start = time.perf_counter()
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.min_word_length = min_word_length
+        self.frequencies: Counter = Counter(words)
+        self.sorted_words: List[str] = sorted(self.frequencies)
+        self.deletes: Dict[str, List[str]] = {}
+
+        for word in self.frequencies:
+            prefix = word[:prefix_length]
+            for deleted in _deletes(prefix, max_edit_distance) | {prefix}:
+                self.deletes.setdefault(deleted, []).append(word)
+
+        self.build_ms = (time.perf_counter() - start) * 1000
+
+    def _max_distance_for(self, token: str) -> int:
+        # One edit on short words already changes their meaning too much
+        return 1 if len(token) <= 4 else self.max_edit_distance
+
+    def is_prefix(self, token: str) -> bool:
+        """True if some vocabulary word starts with token (user is still typing)"""
+        i = bisect_left(self.sorted_words, token)
+        return i < len(self.sorted_words) and self.sorted_words[i].startswith(token)
+
+    def lookup(self, token: str) -> Optional[Tuple[str, int]]:
+        """
+        Find the closest vocabulary word.
+
+        Returns:
+            (word, edit_distance), or None if nothing is within range
+        """
+        if token in self.frequencies:
+            return token, 0
+        if len(token) < self.min_word_length:
+            return None
+
+        max_distance = self._max_distance_for(token)
+        prefix = token[:self.prefix_length]
+        candidates = set()
+        for deleted in _deletes(prefix, max_distance) | {prefix}:
+            candidates.update(self.deletes.get(deleted, ()))
+
+        best: Optional[Tuple[str, int]] = None
+        for word in candidates:
+            if abs(len(word) - len(token)) > max_distance:
+                continue
+            distance = DamerauLevenshtein.distance(token, word, score_cutoff=max_distance)
+            if distance > max_distance:
+                continue
+            if (best is None or distance < best[1] or
+                    (distance == best[1] and self.frequencies[word] > self.frequencies[best[0]])):
+                best = (word, distance)
+        return best
+
+    def correct(self, query: str) -> Tuple[str, bool]:
+        """
+        Correct each token of a query.
+
+        The last token is left alone while it is a prefix of a known word,
+        since typeahead queries are usually unfinished.
+
+        Returns:
+            (corrected_query, changed)
+        """
+        tokens = tokenize(query)
+        corrected = []
+        changed = False
+        for i, token in enumerate(tokens):
+            if i == len(tokens) - 1 and token not in self.frequencies and self.is_prefix(token):
+                corrected.append(token)
+                continue
+            match = self.lookup(token)
+            if match is not None and match[0] != token:
+                corrected.append(match[0])
+                changed = True
+            else:
+                corrected.append(token)
+        return ' '.join(corrected), changed
+
+    def stats(self) -> Dict[str, float]:
+        """Index size and build cost"""
+        memory = sys.getsizeof(self.deletes) + sys.getsizeof(self.frequencies)
+        for key, words in self.deletes.items():
+            memory += sys.getsizeof(key) + sys.getsizeof(words)
+        for word in self.frequencies:
+            memory += sys.getsizeof(word)
+        return {
+            'words': len(self.frequencies),
+            'delete_entries': len(self.deletes),
+            'memory_kb': round(memory / 1024, 1),
+            'build_ms': round(self.build_ms, 1),
+        }
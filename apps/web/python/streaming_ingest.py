@@ -0,0 +1,234 @@
+"""
+Chunked streaming ingestion for large job market CSVs.
+
+Reads the source CSV in fixed-size chunks, validates and cleans each chunk,
+canonicalizes job titles across chunks and appends the result to the dataset
+cache (CSV, or Parquet when pyarrow is installed; writing Parquet without it
+fails up front). Peak memory is bounded by the chunk size rather than the file
+size. Count columns stay integers in the cache; a non-whole value in one counts
+as invalid.
+
+Usage:
+    python streaming_ingest.py path/to/source.csv
+    python streaming_ingest.py source.csv --output data/jobs.parquet --chunksize 250000
+"""
+
+import argparse
+import importlib.util
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+TITLE_COLUMN = 'Job Title'
+REQUIRED_COLUMNS = [TITLE_COLUMN]
+
+NUMERIC_COLUMNS = [
+    'Median Salary (USD)',
+    'Experience Required (Years)',
+    'Job Openings (2024)',
+    'Projected Openings (2030)',
+    'Remote Work Ratio (%)',
+    'Automation Risk (%)',
+    'Gender Diversity (%)',
+]
+PERCENT_COLUMNS = {'Remote Work Ratio (%)', 'Automation Risk (%)', 'Gender Diversity (%)'}
+# Written as (nullable) integers so a round trip through the cache doesn't turn 5 into 5.0
+INTEGER_COLUMNS = {'Experience Required (Years)', 'Job Openings (2024)', 'Projected Openings (2030)'}
+
+# Thousands separators, currency and percent signs, spaces
+_NUMERIC_NOISE = re.compile(r"[,_$%\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def parquet_available() -> bool:
+    """Whether pyarrow (needed to read and write Parquet caches) is installed"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+class _CacheWriter:
+    """Appends cleaned chunks to a CSV or Parquet file, written atomically at close"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.parquet = path.endswith('.parquet')
+        if self.parquet and not parquet_available():
+            raise ImportError(f"Writing {path} needs pyarrow (pip install pyarrow); use a .csv path instead")
+        self._writer = None
+        self._schema = None
+        self._wrote_header = False
+
+    def write(self, chunk: pd.DataFrame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                self._schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+            self._writer.write_table(pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False))
+        else:
+            chunk.to_csv(self.tmp_path, mode='a' if self._wrote_header else 'w',
+                         header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self.tmp_path):
+            os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def _clean_numeric(series: pd.Series, percent: bool, integer: bool = False) -> pd.Series:
+    cleaned = pd.to_numeric(series.str.replace(_NUMERIC_NOISE, '', regex=True), errors='coerce')
+    if percent:
+        cleaned = cleaned.where((cleaned >= 0) & (cleaned <= 100))
+    if integer:
+        cleaned = cleaned.where(cleaned == cleaned.round())
+        return cleaned.astype('Int64')
+    return cleaned.astype(np.float64)
+
+
+def stream_ingest(source: str, destination: str, chunksize: int = 100_000,
+                  dedupe_rows: bool = False, verbose: bool = True) -> Dict[str, Any]:
+    """
+    Stream a CSV into the dataset cache.
+
+    Args:
+        source: Input CSV path
+        destination: Cache path; '.parquet' writes Parquet (requires pyarrow), anything else CSV
+        chunksize: Rows per chunk; bounds peak memory
+        dedupe_rows: Also drop rows identical to an earlier row in any chunk. Keeps one
+            8-byte hash per distinct row, so memory grows with the number of unique rows.
+        verbose: Print per-chunk progress
+
+    Returns:
+        Dictionary with row counts, cleaning counters and throughput
+    """
+    stats = {
+        'rows_in': 0,
+        'rows_out': 0,
+        'dropped_missing_title': 0,
+        'dropped_duplicate_rows': 0,
+        'invalid_numeric_values': 0,
+        'title_variants_merged': 0,
+        'distinct_titles': 0,
+        'chunks': 0,
+    }
+    # Lowercased, whitespace-collapsed title -> first spelling seen
+    canonical_titles: Dict[str, str] = {}
+    # Sorted 64-bit hashes of every row written so far
+    seen_rows: Optional[np.ndarray] = np.empty(0, dtype=np.uint64) if dedupe_rows else None
+
+    writer = _CacheWriter(destination)
+    start = time.perf_counter()
+    try:
+        # dtype=str keeps every chunk's schema identical; numbers are parsed explicitly below
+        for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False,
+                                 na_values=['', 'NA', 'N/A', 'null']):
+            if stats['chunks'] == 0:
+                missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+                if missing:
+                    raise ValueError(f"Source is missing required columns: {missing}")
+            stats['chunks'] += 1
+            stats['rows_in'] += len(chunk)
+
+            titles = chunk[TITLE_COLUMN].fillna('').str.strip().str.replace(_WHITESPACE, ' ', regex=True)
+            has_title = titles != ''
+            stats['dropped_missing_title'] += int((~has_title).sum())
+            chunk = chunk[has_title].copy()
+            titles = titles[has_title]
+
+            # Merge case/spacing variants of the same title onto one spelling
+            mapping = {}
+            for title, count in titles.value_counts(sort=False).items():
+                mapping[title] = canonical_titles.setdefault(title.lower(), title)
+                if mapping[title] != title:
+                    stats['title_variants_merged'] += int(count)
+            chunk[TITLE_COLUMN] = titles.map(mapping)
+
+            for col in NUMERIC_COLUMNS:
+                if col in chunk.columns:
+                    raw = chunk[col]
+                    cleaned = _clean_numeric(raw, col in PERCENT_COLUMNS, col in INTEGER_COLUMNS)
+                    stats['invalid_numeric_values'] += int((raw.notna() & cleaned.isna()).sum())
+                    chunk[col] = cleaned
+
+            for col in chunk.columns:
+                if col != TITLE_COLUMN and col not in NUMERIC_COLUMNS:
+                    chunk[col] = chunk[col].str.strip()
+
+            if seen_rows is not None:
+                hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+                keep = ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, seen_rows)
+                seen_rows = np.union1d(seen_rows, hashes[keep])
+                stats['dropped_duplicate_rows'] += int((~keep).sum())
+                chunk = chunk[keep]
+
+            writer.write(chunk)
+            stats['rows_out'] += len(chunk)
+
+            if verbose:
+                elapsed = time.perf_counter() - start
+                print(f"   Chunk {stats['chunks']}: {stats['rows_in']:,} rows read, "
+                      f"{stats['rows_out']:,} written ({stats['rows_in'] / elapsed:,.0f} rows/s)")
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+    elapsed = time.perf_counter() - start
+    stats['distinct_titles'] = len(canonical_titles)
+    stats['seconds'] = round(elapsed, 3)
+    stats['rows_per_sec'] = round(stats['rows_in'] / elapsed, 1) if elapsed > 0 else 0.0
+    return stats
+
+
+def write_cache(df: pd.DataFrame, path: str):
+    """Write an in-memory DataFrame to the cache in the same format stream_ingest uses"""
+    writer = _CacheWriter(path)
+    try:
+        writer.write(df)
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+
+def read_cache(path: str) -> pd.DataFrame:
+    """Read a cache written by stream_ingest (CSV or Parquet)"""
+    if not path.endswith('.parquet'):
+        return pd.read_csv(path)
+    df = pd.read_parquet(path)
+    # Same dtypes as reading the CSV: int64, or float64 where values are missing
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.Int64Dtype):
+            df[col] = df[col].astype(np.float64 if df[col].isna().any() else np.int64)
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stream a job market CSV into the dataset cache')
+    parser.add_argument('source', help='Input CSV file')
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(__file__), 'data',
+                                                         'job_market_data_cache.csv'))
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--dedupe-rows', action='store_true', help='Drop exact duplicate rows across chunks')
+    args = parser.parse_args()
+
+    print(f"Ingesting {args.source} -> {args.output} ({args.chunksize:,} rows per chunk)...")
+    result = stream_ingest(args.source, args.output, chunksize=args.chunksize, dedupe_rows=args.dedupe_rows)
+    print(f"✓ Ingested {result['rows_out']:,} of {result['rows_in']:,} rows "
+          f"in {result['seconds']:.1f}s ({result['rows_per_sec']:,.0f} rows/s)")
+    print(f"  {result['distinct_titles']:,} distinct titles, {result['title_variants_merged']:,} variants merged, "
+          f"{result['invalid_numeric_values']:,} invalid numeric values, "
+          f"{result['dropped_missing_title'] + result['dropped_duplicate_rows']:,} rows dropped")